@@ -1,14 +1,17 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import secrets
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
+from batch import batch_user
 from config import settings
 from database import get_db
 from models.user import User
+from revocation import revocation_list
 from schemas.user import TokenData
 
 # Password hashing
@@ -26,8 +29,9 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create JWT access token."""
+    """Create JWT access token (pass the session id as `sid` so it can be revoked)."""
     to_encode = data.copy()
+    to_encode.setdefault("jti", secrets.token_urlsafe(12))
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -50,10 +54,18 @@ def verify_token(token: str) -> TokenData:
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(email=email, session_id=payload.get("sid"), token_id=payload.get("jti"))
     except JWTError:
         raise credentials_exception
     
+    # In-memory check, no query; tokens from before sessions existed carry no sid and expire on their own
+    if token_data.session_id and revocation_list.is_revoked(token_data.session_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     return token_data
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
@@ -71,6 +83,9 @@ def get_current_user(
 ) -> User:
     """Get current authenticated user."""
     token = credentials.credentials
+    shared = batch_user(token)
+    if shared is not None:  # Already resolved once for the whole /api/batch call
+        return shared
     token_data = verify_token(token)
     
     user = db.query(User).filter(User.email == token_data.email).first()
@@ -82,6 +97,10 @@ def get_current_user(
         )
     return user
 
+def get_current_session_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[str]:
+    """Session id of the token the request was made with."""
+    return verify_token(credentials.credentials).session_id
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user."""
     if not current_user.is_active:
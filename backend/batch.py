@@ -0,0 +1,99 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import orjson
+
+# Request headers a sub-request inherits from the batch request. Accept-Encoding is left
+# out on purpose: sub-responses are embedded in the batch body, which is compressed once.
+FORWARDED_HEADERS = (b"authorization", b"accept", b"accept-language")
+# Sub-response headers that describe the embedded transfer rather than the resource
+DROPPED_RESPONSE_HEADERS = ("content-length", "content-encoding", "vary")
+
+
+class BatchContext:
+    """What the sub-requests of one /api/batch call share: a DB session and the resolved user."""
+
+    def __init__(self, db, token: Optional[str], user):
+        self.db = db
+        self.token = token
+        self.user = user
+
+
+_current: ContextVar[Optional[BatchContext]] = ContextVar("batch_context", default=None)
+
+
+def batch_session():
+    """The batch's shared session when running inside a sub-request, else None."""
+    context = _current.get()
+    return context.db if context is not None else None
+
+
+def batch_user(token: str):
+    """The batch's already-resolved user, if this sub-request carries the same token."""
+    context = _current.get()
+    if context is None or context.user is None or context.token != token:
+        return None
+    return context.user
+
+
+def _sub_scope(parent: Dict[str, Any], path: str) -> Dict[str, Any]:
+    url = urlsplit(path)
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode("latin-1"),
+        "query_string": url.query.encode("latin-1"),
+        "headers": [(name, value) for name, value in parent["headers"] if name in FORWARDED_HEADERS],
+    }
+
+
+async def _dispatch(app, parent: Dict[str, Any], request_id: Optional[str], path: str, db) -> Dict[str, Any]:
+    """Run one GET through the full ASGI app and capture the response."""
+    response: Dict[str, Any] = {"status": 500, "headers": [], "body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await app(_sub_scope(parent, path), receive, send)
+    except Exception:
+        # ServerErrorMiddleware has already sent the 500; don't let the session stay broken
+        db.rollback()
+
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1") for name, value in response["headers"]
+        if name.decode("latin-1").lower() not in DROPPED_RESPONSE_HEADERS
+    }
+    body = response["body"]
+    if headers.get("content-type", "").startswith("application/json") and body:
+        body = orjson.loads(body)
+    else:
+        body = body.decode("utf-8", errors="replace")
+    return {"id": request_id, "status": response["status"], "headers": headers, "body": body}
+
+
+async def run_batch(app, parent: Dict[str, Any], requests: List[Dict[str, Any]], context: BatchContext) -> List[Dict[str, Any]]:
+    """Run the sub-requests concurrently, in request order in the result."""
+    token = _current.set(context)  # Tasks copy the context when created, so they all see it
+    try:
+        return await asyncio.gather(*(
+            _dispatch(app, parent, request.get("id"), request["path"], context.db) for request in requests
+        ))
+    finally:
+        _current.reset(token)
@@ -0,0 +1,11 @@
+"""
+Benchmark suite for the FitGenius API.
+
+Runs request scenarios (auth, catalog browse, search, plan generation and plan
+reads) either in-process against `main.app` or against a running server, and
+writes a JSON report that can be compared between runs:
+
+    python synthetic_data.py --users 100000 --truncate
+    python -m benchmarks --output bench_before.json
+    python -m benchmarks --output bench_after.json --compare bench_before.json
+"""
@@ -0,0 +1,123 @@
+import argparse
+import json
+import sys
+
+from benchmarks.runner import BenchmarkContext, build_report, compare_reports, run_scenario
+from benchmarks.scenarios import SCENARIOS
+
+
+def _prepare_context(client, target: str) -> BenchmarkContext:
+    from synthetic_data import SYNTHETIC_EMAIL_DOMAIN, SYNTHETIC_PASSWORD
+
+    context = BenchmarkContext(client, target)
+    context.password = SYNTHETIC_PASSWORD
+
+    if target == "in-process":
+        from database import SessionLocal
+        from models.user import User
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}")).order_by(User.id).first()
+        finally:
+            db.close()
+        if user is None:
+            sys.exit("No synthetic users found - run synthetic_data.py first")
+        context.email = user.email
+    else:
+        context.email = f"user0@{SYNTHETIC_EMAIL_DOMAIN}"
+
+    response = client.post("/api/auth/login", data={"username": context.email, "password": context.password})
+    if response.status_code != 200:
+        sys.exit(f"Benchmark login failed ({response.status_code}): {response.text[:200]}")
+    context.token = response.json()["access_token"]
+
+    context.exercise_ids = [e["id"] for e in client.get("/api/exercises/", params={"limit": 200}).json()]
+    context.recipe_ids = [r["id"] for r in client.get("/api/recipes/", params={"limit": 200}).json()]
+    context.plan_ids = [p["id"] for p in client.get("/api/plans/", headers=context.auth_headers,
+                                                       params={"limit": 50}).json()]
+    if not context.plan_ids:  # Fresh synthetic users have no plans yet; give plans.read one to fetch
+        plan = client.post("/api/plans/generate", headers=context.auth_headers,
+                           json={"plan_type": "workout", "duration_weeks": 4, "seed": 0})
+        if plan.status_code == 201:
+            context.plan_ids = [plan.json()["id"]]
+    long_plan = client.post("/api/plans/generate", headers=context.auth_headers,
+                            json={"plan_type": "workout", "duration_weeks": 52, "seed": 0})
+    context.long_plan_id = long_plan.json()["id"] if long_plan.status_code == 201 else None
+    return context
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FitGenius API benchmark suite")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Run only scenarios with this name prefix")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Print deltas against an earlier JSON report")
+    parser.add_argument("--serialization", action="store_true",
+                        help="Also time response serialization paths and compressed sizes (in-process only)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        import httpx
+        client = httpx.Client(base_url=args.base_url, timeout=60)
+        target = args.base_url
+    else:
+        from fastapi.testclient import TestClient
+        from concurrency import load_shedder
+        from main import app
+        load_shedder.limit_rate = False  # Every iteration comes from one client; measure, don't throttle
+        client = TestClient(app, raise_server_exceptions=False)
+        target = "in-process"
+
+    context = _prepare_context(client, target)
+    scenarios = [s for s in SCENARIOS if not args.only or any(s.name.startswith(p) for p in args.only)]
+
+    results = {}
+    for scenario in scenarios:
+        if not scenario.runnable(context):
+            print(f"{scenario.name:<32} skipped: no {scenario.requires} to request")
+            continue
+        result = run_scenario(scenario, context, args.iterations, args.warmup, args.concurrency)
+        results[scenario.name] = result
+        latency = result["latency_ms"]
+        print(f"{scenario.name:<32} p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+              f"{result['throughput_rps']:>8.1f} req/s  errors {result['errors']}")
+
+    serialization = None
+    if args.serialization and target == "in-process" and context.long_plan_id:
+        from benchmarks.serialization import run_serialization
+        serialization = run_serialization(context.long_plan_id)
+        for name, result in serialization.items():
+            timings = "  ".join(f"{path} {ms:.2f} ms" for path, ms in result["serialize_ms"].items())
+            sizes = "  ".join(f"{encoding} {size / 1024:.1f}KB" for encoding, size in result["wire_bytes"].items())
+            print(f"{'serialize.' + name:<32} {timings}  |  {sizes}")
+
+    database = "unknown"
+    if target == "in-process":
+        from database import engine
+        database = engine.dialect.name
+    report = build_report(results, {
+        "target": target,
+        "database": database,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+    })
+    if serialization:
+        report["serialization"] = serialization
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print("\n".join(compare_reports(report, previous)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class BenchmarkContext:
+    """State shared by all scenarios: the HTTP client, auth token and sample ids."""
+
+    def __init__(self, client, target: str):
+        self.client = client
+        self.target = target
+        self.email: Optional[str] = None
+        self.password: Optional[str] = None
+        self.token: Optional[str] = None
+        self.exercise_ids: List[int] = []
+        self.recipe_ids: List[int] = []
+        self.plan_ids: List[int] = []
+        self.long_plan_id: Optional[int] = None
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+
+class Scenario:
+    """A named request (or short request sequence) to time repeatedly.
+
+    `requires` names a context attribute (e.g. "plan_ids") that must be
+    non-empty; without it the scenario is skipped instead of timing 404s.
+    """
+
+    def __init__(self, name: str, call: Callable[[BenchmarkContext, int], Any], description: str = "",
+                 requires: Optional[str] = None):
+        self.name = name
+        self.call = call
+        self.description = description
+        self.requires = requires
+
+    def runnable(self, context: BenchmarkContext) -> bool:
+        return self.requires is None or bool(getattr(context, self.requires))
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.array(samples_ms) if samples_ms else np.zeros(1)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "min": round(float(values.min()), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def run_scenario(scenario: Scenario, context: BenchmarkContext,
+                 iterations: int, warmup: int, concurrency: int) -> Dict[str, Any]:
+    """Time `iterations` calls of a scenario after `warmup` untimed ones."""
+    for i in range(warmup):
+        scenario.call(context, i)
+
+    def timed_call(i: int):
+        started = time.perf_counter()
+        response = scenario.call(context, i)
+        return (time.perf_counter() - started) * 1000, response
+
+    wall_started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed_call, range(iterations)))
+    else:
+        results = [timed_call(i) for i in range(iterations)]
+    wall_seconds = time.perf_counter() - wall_started
+
+    latencies = [elapsed for elapsed, _ in results]
+    status_codes: Dict[str, int] = {}
+    response_bytes, wire_bytes = [], []
+    for _, response in results:
+        status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+        response_bytes.append(len(response.content))
+        # The client decompresses transparently; Content-Length is what was sent
+        wire_bytes.append(int(response.headers.get("content-length", len(response.content))))
+
+    return {
+        "description": scenario.description,
+        "requests": iterations,
+        "errors": sum(count for code, count in status_codes.items() if int(code) >= 400),
+        "status_codes": status_codes,
+        "latency_ms": _percentiles(latencies),
+        "throughput_rps": round(iterations / wall_seconds, 2) if wall_seconds else None,
+        "response_bytes_mean": round(float(np.mean(response_bytes)), 1) if response_bytes else 0,
+        "wire_bytes_mean": round(float(np.mean(wire_bytes)), 1) if wire_bytes else 0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: Dict[str, Dict[str, Any]], meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            **meta,
+        },
+        "scenarios": results,
+    }
+
+
+def compare_reports(current: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    """Render p50/p95 deltas against an earlier report as printable lines."""
+    lines = [f"{'scenario':<32} {'p50 ms':>18} {'p95 ms':>18}"]
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            lines.append(f"{name:<32} {'(new)':>18}")
+            continue
+        cells = []
+        for key in ("p50", "p95"):
+            old, new = before["latency_ms"][key], result["latency_ms"][key]
+            change = (new - old) / old * 100 if old else 0.0
+            cells.append(f"{old:.1f}→{new:.1f} ({change:+.0f}%)")
+        lines.append(f"{name:<32} {cells[0]:>18} {cells[1]:>18}")
+    return lines
@@ -0,0 +1,99 @@
+from benchmarks.runner import BenchmarkContext, Scenario
+
+SEARCH_TERMS = ["squat", "press", "row", "plank", "curl", "lunge"]
+RECIPE_SEARCH_TERMS = ["bowl", "chicken", "salmon", "tofu", "oats"]
+
+
+def _pick(values, i):
+    return values[i % len(values)]
+
+
+def login(ctx: BenchmarkContext, i: int):
+    return ctx.client.post("/api/auth/login", data={"username": ctx.email, "password": ctx.password})
+
+
+def current_user(ctx: BenchmarkContext, i: int):
+    return ctx.client.get("/api/auth/me", headers=ctx.auth_headers)
+
+
+def browse_exercises(ctx: BenchmarkContext, i: int):
+    # First page plus up to three follow-up pages via the keyset cursor
+    response = ctx.client.get("/api/exercises/", params={"limit": 50})
+    for _ in range(3):
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = ctx.client.get("/api/exercises/", params={"limit": 50, "cursor": cursor})
+    return response
+
+
+def browse_recipes_filtered(ctx: BenchmarkContext, i: int):
+    return ctx.client.get("/api/recipes/", params={
+        "limit": 50, "meal_type": "dinner", "is_vegetarian": True, "max_calories": 800,
+    })
+
+
+def exercise_detail(ctx: BenchmarkContext, i: int):
+    return ctx.client.get(f"/api/exercises/{_pick(ctx.exercise_ids, i)}")
+
+
+def search_exercises(ctx: BenchmarkContext, i: int):
+    return ctx.client.get(f"/api/exercises/search/{_pick(SEARCH_TERMS, i)}", params={"limit": 50})
+
+
+def search_recipes(ctx: BenchmarkContext, i: int):
+    return ctx.client.get(f"/api/recipes/search/{_pick(RECIPE_SEARCH_TERMS, i)}", params={"limit": 50})
+
+
+def generate_workout_plan(ctx: BenchmarkContext, i: int):
+    return ctx.client.post("/api/plans/generate", headers=ctx.auth_headers,
+                           json={"plan_type": "workout", "duration_weeks": 4})
+
+
+def generate_meal_plan(ctx: BenchmarkContext, i: int):
+    return ctx.client.post("/api/plans/generate", headers=ctx.auth_headers,
+                           json={"plan_type": "meal", "duration_weeks": 1})
+
+
+def list_plans(ctx: BenchmarkContext, i: int):
+    return ctx.client.get("/api/plans/", headers=ctx.auth_headers, params={"limit": 20})
+
+
+def read_plan(ctx: BenchmarkContext, i: int):
+    return ctx.client.get(f"/api/plans/{_pick(ctx.plan_ids, i)}", headers=ctx.auth_headers)
+
+
+def read_long_plan(ctx: BenchmarkContext, i: int):
+    return ctx.client.get(f"/api/plans/{ctx.long_plan_id}", headers=ctx.auth_headers)
+
+
+def active_plans(ctx: BenchmarkContext, i: int):
+    return ctx.client.get("/api/plans/current/active", headers=ctx.auth_headers)
+
+
+def feedback_batch(ctx: BenchmarkContext, i: int):
+    # A finished workout: twenty exercises ticked off in one request
+    events = [
+        {"item_type": "exercise", "item_id": _pick(ctx.exercise_ids, i + n), "feedback_type": "completed"}
+        for n in range(20)
+    ]
+    return ctx.client.post("/api/feedback/batch", headers=ctx.auth_headers, json={"events": events})
+
+
+SCENARIOS = [
+    Scenario("auth.login", login, "Password login (bcrypt verify + token issue)"),
+    Scenario("auth.me", current_user, "Token decode + user lookup"),
+    Scenario("catalog.browse_exercises", browse_exercises, "Four keyset pages of 50 exercises"),
+    Scenario("catalog.browse_recipes_filtered", browse_recipes_filtered, "Filtered recipe page"),
+    Scenario("catalog.exercise_detail", exercise_detail, "Single exercise by id", requires="exercise_ids"),
+    Scenario("search.exercises", search_exercises, "Exercise text search"),
+    Scenario("search.recipes", search_recipes, "Recipe text search"),
+    Scenario("plans.generate_workout", generate_workout_plan, "4-week workout plan generation"),
+    Scenario("plans.generate_meal", generate_meal_plan, "1-week meal plan generation"),
+    Scenario("plans.list", list_plans, "First page of the user's plans"),
+    Scenario("plans.read", read_plan, "Single plan by id", requires="plan_ids"),
+    Scenario("plans.read_52_weeks", read_long_plan, "52-week workout plan by id (large, compressed body)",
+             requires="long_plan_id"),
+    Scenario("plans.active", active_plans, "Active plans for the user"),
+    Scenario("feedback.batch", feedback_batch, "Batch of 20 exercise feedback events", requires="exercise_ids"),
+]
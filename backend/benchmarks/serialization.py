@@ -0,0 +1,78 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Type
+
+import numpy as np
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from compression import available_encodings, compress
+from config import settings
+from responses import orm_dict
+
+
+def _median_ms(call: Callable[[], bytes], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(float(np.median(samples)), 3)
+
+
+def measure_payload(objects: List[Any], schema: Type[BaseModel], repeats: int) -> Dict[str, Any]:
+    """Encode the same ORM objects the way each response path would and time it."""
+
+    def validated_stdlib() -> bytes:
+        # FastAPI's old default: response_model validation, jsonable_encoder, json.dumps
+        content = jsonable_encoder([schema.from_orm(obj) for obj in objects])
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def validated_orjson() -> bytes:
+        content = jsonable_encoder([schema.from_orm(obj) for obj in objects])
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    def trusted_orjson() -> bytes:
+        return orjson.dumps([orm_dict(obj, schema) for obj in objects],
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    body = trusted_orjson()
+    wire_bytes = {
+        encoding: len(compress(body, encoding, settings.compression_gzip_level, settings.compression_brotli_quality))
+        for encoding in available_encodings()
+    }
+    return {
+        "objects": len(objects),
+        "serialize_ms": {
+            "validated_stdlib": _median_ms(validated_stdlib, repeats),
+            "validated_orjson": _median_ms(validated_orjson, repeats),
+            "trusted_orjson": _median_ms(trusted_orjson, repeats),
+        },
+        "wire_bytes": wire_bytes,
+    }
+
+
+def run_serialization(plan_id: int, repeats: int = 20, page_size: int = 100) -> Dict[str, Dict[str, Any]]:
+    """Serialization time and compressed sizes for a plan and the exercise/recipe list pages."""
+    from database import SessionLocal
+    from models.exercise import Exercise
+    from models.plan import Plan
+    from models.recipe import Recipe
+    from schemas.exercise import ExerciseResponse
+    from schemas.plan import PlanResponse
+    from schemas.recipe import RecipeResponse
+
+    db = SessionLocal()
+    try:
+        payloads = {
+            "plans.read": ([db.get(Plan, plan_id)], PlanResponse),
+            "exercises.list": (db.query(Exercise).order_by(Exercise.id).limit(page_size).all(), ExerciseResponse),
+            "recipes.list": (db.query(Recipe).order_by(Recipe.id).limit(page_size).all(), RecipeResponse),
+        }
+        return {
+            name: measure_payload(objects, schema, repeats)
+            for name, (objects, schema) in payloads.items() if objects and objects[0] is not None
+        }
+    finally:
+        db.close()
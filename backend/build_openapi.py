@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Write the OpenAPI schema to a file at image build time.
+
+Workers started with OPENAPI_PREBUILT_PATH pointing at the output load it
+instead of generating the schema on startup. Also used as the cold start
+budget check in CI: generation slower than --budget-ms fails the build.
+
+Usage:
+    python build_openapi.py --output openapi.json
+    python build_openapi.py --output /tmp/openapi.json --budget-ms 250
+"""
+
+import argparse
+import sys
+import time
+
+from config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the OpenAPI schema ahead of startup")
+    parser.add_argument("--output", default="openapi.json")
+    parser.add_argument("--budget-ms", type=int, default=settings.openapi_budget_ms,
+                        help="Fail when schema generation takes longer than this")
+    args = parser.parse_args()
+
+    from main import openapi_document
+
+    started = time.perf_counter()
+    document = openapi_document()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with open(args.output, "wb") as f:
+        f.write(document)
+    print(f"📚 Wrote {args.output} ({len(document) / 1024:.0f}KB) - generated in {elapsed_ms:.0f}ms")
+
+    if elapsed_ms > args.budget_ms:
+        print(f"❌ Schema generation exceeded the {args.budget_ms}ms startup budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
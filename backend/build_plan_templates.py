@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Plan template library builder.
+
+Pre-generates plan bodies for the input combinations most common among
+active users (equipment, days per week and difficulty for workouts; dietary
+flags and calorie band for meals), one per seed variant. Plan generation
+for users without feedback of their own then instantiates a template with a
+primary-key read instead of querying and scoring the catalog.
+
+Templates are tied to the catalog version they were built from, so catalog
+edits make them miss until the next build. Run it nightly, or often with
+--if-stale to rebuild only after catalog changes.
+
+Usage:
+    python build_plan_templates.py
+    python build_plan_templates.py --if-stale --plan-type meal
+"""
+
+import argparse
+import time
+
+from config import settings
+from database import SessionLocal
+from services.plan_service import PlanService
+from services.plan_templates import DEFAULT_MAX_COMBINATIONS, DEFAULT_MIN_USERS, ITEM_TYPES, PlanTemplateStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate the plan template library")
+    parser.add_argument("--plan-type", choices=sorted(ITEM_TYPES), action="append",
+                        help="Limit to one plan type (repeatable); defaults to all")
+    parser.add_argument("--seeds", type=int, default=settings.plan_seed_variants,
+                        help="Seed variants per combination (match PLAN_SEED_VARIANTS)")
+    parser.add_argument("--weeks", type=int, default=settings.plan_template_weeks,
+                        help="Weeks per template; longer plan requests are generated directly")
+    parser.add_argument("--min-users", type=int, default=DEFAULT_MIN_USERS,
+                        help="Skip combinations shared by fewer active users")
+    parser.add_argument("--max-combinations", type=int, default=DEFAULT_MAX_COMBINATIONS)
+    parser.add_argument("--if-stale", action="store_true",
+                        help="Only build plan types with no templates for the current catalog version")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        plan_service = PlanService(db)
+        store = PlanTemplateStore(db)
+        for plan_type in args.plan_type or sorted(ITEM_TYPES):
+            started = time.perf_counter()
+            result = store.build(plan_service, plan_type, args.seeds, args.weeks,
+                                 args.min_users, args.max_combinations, args.if_stale)
+            if result.get("skipped"):
+                print(f"⏭️ {plan_type}: templates are current for catalog version {result['catalog_version']}")
+                continue
+            print(f"✅ {plan_type}: {result['templates']:,} templates for {result['combinations']:,} "
+                  f"combinations covering {result['users_covered']:,} users "
+                  f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Bulk import/export for the exercise and recipe catalogs.
+
+Uses the same chunked validation and upsert code as the
+POST /api/{exercises,recipes}/bulk endpoints, talking to DATABASE_URL
+directly. Rows match existing items by id, otherwise by name.
+
+Usage:
+    python catalog_cli.py import recipes licensed_recipes.ndjson
+    python catalog_cli.py import exercises exercises.csv --chunk-size 1000
+    python catalog_cli.py export recipes recipes.csv [--include-inactive]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from database import SessionLocal
+from services.catalog_bulk import CATALOGS, DEFAULT_CHUNK_SIZE, FORMATS, CatalogBulkService
+
+
+def _format_for(path: str, explicit: str) -> str:
+    if explicit:
+        return explicit
+    if path.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def run_import(service: CatalogBulkService, args) -> int:
+    fmt = _format_for(args.path, args.format)
+    started = time.perf_counter()
+    with open(args.path, "rb") as f:
+        report = service.import_file(f, fmt, args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {args.catalog}: {report['inserted']:,} inserted, {report['updated']:,} updated, "
+          f"{report['failed']:,} failed of {report['processed']:,} rows in {elapsed:.1f}s")
+    for error in report["errors"][:args.show_errors]:
+        print(f"❌ row {error['row']}: {json.dumps(error['errors'], default=str)}")
+    if args.errors_output:
+        with open(args.errors_output, "w") as f:
+            json.dump(report["errors"], f, indent=2, default=str)
+        print(f"📄 Row errors written to {args.errors_output}")
+    return 1 if report["failed"] else 0
+
+
+def run_export(service: CatalogBulkService, args) -> int:
+    fmt = _format_for(args.path, args.format)
+    rows = 0
+    with open(args.path, "w", encoding="utf-8", newline="") as f:
+        for line in service.iter_export(fmt, args.include_inactive):
+            f.write(line)
+            rows += 1
+    if fmt == "csv":
+        rows -= 1  # header
+    print(f"✅ Exported {rows:,} {args.catalog} to {args.path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export the exercise and recipe catalogs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Upsert rows from an NDJSON or CSV file")
+    import_parser.add_argument("catalog", choices=sorted(CATALOGS))
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    import_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                               help="Rows validated and committed per transaction")
+    import_parser.add_argument("--show-errors", type=int, default=20, help="Row errors to print")
+    import_parser.add_argument("--errors-output", help="Write all reported row errors to this JSON file")
+
+    export_parser = subparsers.add_parser("export", help="Dump the catalog to an NDJSON or CSV file")
+    export_parser.add_argument("catalog", choices=sorted(CATALOGS))
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    export_parser.add_argument("--include-inactive", action="store_true")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = CatalogBulkService(db, args.catalog)
+        if args.command == "import":
+            return run_import(service, args)
+        return run_export(service, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Plan block compaction.
+
+Rewrites plans that still store every day in full so their days reference
+the content-addressed plan_blocks table, then (with --gc) deletes blocks no
+plan references any more. Safe to run while the API is serving: plans
+edited mid-run are skipped, and recently written blocks are never collected.
+
+Usage:
+    python compact_plans.py                 # convert existing plans
+    python compact_plans.py --gc            # convert, then drop unreferenced blocks
+    python compact_plans.py --gc-only
+"""
+
+import argparse
+import time
+
+from database import SessionLocal
+from services.plan_blocks import COMPACTION_BATCH_SIZE, PlanBlockCompactor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate stored plan days into plan_blocks")
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE, help="Plans per transaction")
+    parser.add_argument("--gc", action="store_true", help="Delete unreferenced blocks afterwards")
+    parser.add_argument("--gc-only", action="store_true", help="Only delete unreferenced blocks")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        compactor = PlanBlockCompactor(db)
+        if not args.gc_only:
+            started = time.perf_counter()
+            report = compactor.compact(args.batch_size)
+            print(f"✅ Compacted {report['compacted']:,} of {report['scanned']:,} plans in "
+                  f"{time.perf_counter() - started:.1f}s")
+            if report["bytes_before"]:
+                ratio = report["bytes_before"] / max(report["bytes_after"] + report["block_bytes"], 1)
+                print(f"📦 {report['bytes_before']:,} bytes → {report['bytes_after']:,} bytes of references "
+                      f"+ {report['block_bytes']:,} bytes of blocks ({ratio:.1f}x)")
+        if args.gc or args.gc_only:
+            deleted = compactor.collect_garbage()
+            print(f"🗑️ Deleted {deleted:,} unreferenced blocks")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
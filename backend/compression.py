@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import zlib
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Precompressed assets are encoded once, so they get the slowest, smallest settings
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+def available_encodings() -> Iterable[str]:
+    return ENCODING_PREFERENCE if brotli is not None else ("gzip", "identity")
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == "gzip":
+        # mtime=0 keeps the output (and anything hashed from it) deterministic
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return body
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}; identity stays acceptable unless explicitly refused."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    accepted.setdefault("identity", accepted.get("*", 1.0))
+    return accepted
+
+
+def choose_encoding(header: Optional[str], offered: Iterable[str]) -> Optional[str]:
+    """Best encoding from `offered` the client accepts, or None if it accepts none of them."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class PrecompressedAsset:
+    """A static body held in memory in every encoding, with a content-hash ETag."""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.media_type = media_type
+        self.version = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.variants = {
+            encoding: compress(body, encoding, PRECOMPRESS_GZIP_LEVEL, PRECOMPRESS_BROTLI_QUALITY)
+            for encoding in available_encodings()
+        }
+
+    def sizes(self) -> Dict[str, int]:
+        return {encoding: len(body) for encoding, body in self.variants.items()}
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(request.headers.get("accept-encoding"), self.variants) or "identity"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class _StreamCompressor:
+    """Incremental gzip or brotli encoder with one interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses of at least `minimum_size` bytes with brotli or gzip.
+
+    Responses that already carry a Content-Encoding (the precompressed docs
+    assets) pass through untouched. Levels are tuned for per-request speed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        offered = [encoding for encoding in available_encodings() if encoding != "identity"]
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"), offered)
+        if encoding is None or encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        started = False
+        compressor: Optional[_StreamCompressor] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, started, compressor
+            if message["type"] == "http.response.start":
+                start_message = message  # Held until the first body chunk decides the headers
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not started:
+                started = True
+                already_encoded = "content-encoding" in Headers(raw=start_message["headers"])
+                if already_encoded or (len(body) < self.minimum_size and not more_body):
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.compress(body)
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,250 @@
+import math
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Pattern, Sequence, Tuple
+
+from fastapi.responses import ORJSONResponse
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from batch import batch_session
+from config import settings
+
+
+class RouteClass:
+    """A group of endpoints sharing one concurrency budget and one per-client rate."""
+
+    def __init__(self, name: str, methods: Sequence[str], pattern: str, concurrency: int,
+                 max_concurrency: int, target_latency_ms: float, rate_per_minute: float, burst: int):
+        self.name = name
+        self.methods = frozenset(methods)
+        self.pattern: Pattern[str] = re.compile(pattern)
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency_ms = target_latency_ms
+        self.rate_per_second = rate_per_minute / 60
+        self.burst = burst
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and self.pattern.match(path) is not None
+
+
+# First match wins. Paths outside /api/ (health, docs) and preflights are never limited.
+ROUTE_CLASSES = (
+    # bcrypt hashing: CPU-bound, and the rate doubles as brute force protection
+    RouteClass("auth", ("POST",), r"^/api/auth/(register|login|change-password|reset-password)/?$",
+               concurrency=4, max_concurrency=8, target_latency_ms=1000, rate_per_minute=10, burst=5),
+    # Plan generation and catalog imports hold a connection for a long time
+    RouteClass("heavy", ("POST",), r"^/api/(plans/(generate|\d+/regenerate)|exercises/bulk|recipes/bulk)/?$",
+               concurrency=8, max_concurrency=16, target_latency_ms=2000, rate_per_minute=20, burst=5),
+    RouteClass("read", ("GET", "HEAD"), r"^/api/",
+               concurrency=32, max_concurrency=128, target_latency_ms=250, rate_per_minute=600, burst=100),
+    RouteClass("read", ("POST",), r"^/api/batch/?$",
+               concurrency=32, max_concurrency=128, target_latency_ms=250, rate_per_minute=600, burst=100),
+    RouteClass("write", ("POST", "PUT", "PATCH", "DELETE"), r"^/api/",
+               concurrency=16, max_concurrency=32, target_latency_ms=500, rate_per_minute=120, burst=30),
+)
+
+
+def route_class(method: str, path: str) -> Optional[RouteClass]:
+    for candidate in ROUTE_CLASSES:
+        if candidate.matches(method, path):
+            return candidate
+    return None
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit: grows by ~1 per limit's worth of fast responses, shrinks on slow ones.
+
+    Only touched from the event loop, so no locking. A burst of slow responses
+    shrinks the limit once per target latency rather than once per response,
+    which would collapse it to the minimum.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency_ms: float, backoff: float = 0.75):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency_ms = target_latency_ms
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency_ms: float) -> None:
+        self.in_flight -= 1
+        if latency_ms > self.target_latency_ms:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.target_latency_ms / 1000:
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit * self.backoff)
+        elif self.in_flight + 1 >= self.limit / 2:  # Only grow while the limit is actually in use
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; 0 when allowed, else the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-client token buckets for each route class, least recently seen clients evicted first."""
+
+    def __init__(self, max_clients: int = 10000):
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+
+    def take(self, client: str, route: RouteClass) -> float:
+        key = (client, route.name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(route.rate_per_second, route.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take()
+        if wait:
+            self.limited += 1
+        return wait
+
+
+@lru_cache(maxsize=4096)
+def _token_subject(token: str) -> Optional[str]:
+    try:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm]).get("sub")
+    except JWTError:
+        return None
+
+
+def client_address(scope: Scope, headers: Optional[Headers] = None) -> str:
+    """The client's address, read from X-Forwarded-For when behind `trusted_proxy_hops` proxies.
+
+    Each trusted proxy appends the address it received the request from, so the
+    entry `hops` from the right is the client; anything left of it was sent by
+    the client itself and could be forged to dodge the rate limits.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        headers = headers or Headers(scope=scope)
+        forwarded = [host.strip() for host in headers.get("x-forwarded-for", "").split(",") if host.strip()]
+        if forwarded:
+            return forwarded[max(len(forwarded) - hops, 0)]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def client_key(scope: Scope) -> str:
+    """The signed-in user, or the client address for anonymous and invalid tokens."""
+    headers = Headers(scope=scope)
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        subject = _token_subject(token)
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{client_address(scope, headers)}"
+
+
+class LoadShedder:
+    """Concurrency limits per route class plus per-client rate limits, shared by the middleware and /health."""
+
+    def __init__(self, limit_concurrency: bool = True, limit_rate: bool = True, max_clients: int = 10000):
+        self.limit_concurrency = limit_concurrency
+        self.limit_rate = limit_rate
+        self.limits: Dict[str, AdaptiveLimit] = {}
+        for route in ROUTE_CLASSES:
+            self.limits.setdefault(route.name, AdaptiveLimit(
+                route.concurrency, minimum=1, maximum=route.max_concurrency,
+                target_latency_ms=route.target_latency_ms,
+            ))
+        self.rate_limiter = RateLimiter(max_clients)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrency": {
+                name: {"limit": int(limit.limit), "in_flight": limit.in_flight, "rejected": limit.rejected}
+                for name, limit in self.limits.items()
+            } if self.limit_concurrency else None,
+            "rate_limited": self.rate_limiter.limited if self.limit_rate else None,
+        }
+
+
+class LoadSheddingMiddleware:
+    """Bound concurrency per route class and rate-limit each client, rejecting fast.
+
+    Over the concurrency limit a request gets 503 straight away instead of
+    queueing for a pooled connection; over its rate a client gets 429. Both
+    carry Retry-After. Heavy endpoints have their own budgets, so a surge of
+    plan generation or logins leaves cheap reads unaffected.
+    """
+
+    def __init__(self, app: ASGIApp, shedder: LoadShedder):
+        self.app = app
+        self.shedder = shedder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Sub-requests of /api/batch were admitted with the batch request itself
+        route = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route is None or batch_session() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.shedder.limit_rate:
+            wait = self.shedder.rate_limiter.take(client_key(scope), route)
+            if wait:
+                await _reject(scope, receive, send, 429, "Too many requests, slow down", wait)
+                return
+
+        if not self.shedder.limit_concurrency:
+            await self.app(scope, receive, send)
+            return
+        limit = self.shedder.limits[route.name]
+        if not limit.try_acquire():
+            await _reject(scope, receive, send, 503, "Server busy, try again shortly", 1)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release((time.perf_counter() - started) * 1000)
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str, retry_after: float) -> None:
+    response = ORJSONResponse(
+        {"detail": detail}, status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+    await response(scope, receive, send)
+
+
+load_shedder = LoadShedder(
+    limit_concurrency=settings.concurrency_limits_enabled,
+    limit_rate=settings.rate_limits_enabled,
+    max_clients=settings.rate_limit_max_clients,
+)
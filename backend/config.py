@@ -10,11 +10,59 @@ class Settings(BaseSettings):
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Server-side sessions - lifetime of a login, and how often workers pick up each other's revocations
+    session_ttl_days: int = int(os.getenv("SESSION_TTL_DAYS", "30"))
+    session_revocation_refresh_seconds: float = float(os.getenv("SESSION_REVOCATION_REFRESH_SECONDS", "5"))
     
     # App
     app_name: str = "Smart Fitness & Nutrition Coach"
     debug: bool = os.getenv("DEBUG", "true").lower() == "true"
     
+    # Pagination - how long list totals are reused before running COUNT(*) again
+    count_cache_ttl_seconds: int = int(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+    
+    # In-memory recipe flag index - rebuilt after this long so other workers' writes show up
+    recipe_index_ttl_seconds: int = int(os.getenv("RECIPE_INDEX_TTL_SECONDS", "300"))
+    
+    # Plan generation memoization - bodies kept per process, and how many seed
+    # variants an unseeded request picks from (more variants = more variety, fewer hits)
+    plan_cache_max_entries: int = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "2048"))
+    plan_seed_variants: int = int(os.getenv("PLAN_SEED_VARIANTS", "16"))
+    # Deduplicated plan day blocks kept per process for reassembling stored plans
+    plan_block_cache_max_entries: int = int(os.getenv("PLAN_BLOCK_CACHE_MAX_ENTRIES", "20000"))
+    # Plan template library - weeks generated per template (longer requests are generated directly)
+    plan_template_weeks: int = int(os.getenv("PLAN_TEMPLATE_WEEKS", "12"))
+    
+    # Database health monitor - probe interval/timeout, and consecutive failures before
+    # DB-dependent routes start failing fast with 503
+    db_probe_interval_seconds: float = float(os.getenv("DB_PROBE_INTERVAL_SECONDS", "5"))
+    db_probe_timeout_seconds: float = float(os.getenv("DB_PROBE_TIMEOUT_SECONDS", "3"))
+    db_breaker_failure_threshold: int = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "3"))
+    
+    # OpenAPI schema - written by build_openapi.py at image build time so workers skip generating
+    # it; generation slower than the budget is logged as a cold start regression
+    openapi_prebuilt_path: str = os.getenv("OPENAPI_PREBUILT_PATH", "")
+    openapi_budget_ms: int = int(os.getenv("OPENAPI_BUDGET_MS", "250"))
+    
+    # Response compression - bodies smaller than this go out uncompressed; levels favour speed
+    compression_minimum_bytes: int = int(os.getenv("COMPRESSION_MINIMUM_BYTES", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    
+    # Load shedding - adaptive concurrency limits per route class (503 when exceeded) and
+    # per-client token buckets (429); budgets per class live in concurrency.ROUTE_CLASSES
+    concurrency_limits_enabled: bool = os.getenv("CONCURRENCY_LIMITS_ENABLED", "true").lower() == "true"
+    rate_limits_enabled: bool = os.getenv("RATE_LIMITS_ENABLED", "true").lower() == "true"
+    rate_limit_max_clients: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    # Reverse proxies in front of the app that append to X-Forwarded-For (1 on Render);
+    # anonymous clients are keyed by the address the outermost trusted one saw
+    trusted_proxy_hops: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    
+    # Idempotency-Key support - how long responses are replayed, and how long a duplicate
+    # waits for the original request to finish before getting 409
+    idempotency_ttl_hours: int = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+    idempotency_wait_seconds: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+    
     # CORS - handle as string to avoid JSON parsing issues
     allowed_origins_str: str = os.getenv("ALLOWED_ORIGINS", "")
     
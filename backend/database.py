@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from batch import batch_session
 from config import settings
+from health import db_monitor
 
 # Create engine with connection parameters to handle network issues
 connect_args = {}
@@ -12,22 +15,51 @@ if settings.database_url.startswith("postgresql"):
         "application_name": "fitnesstracker-api"
     }
 
+# SQLite (local development) uses SQLAlchemy's default pool, which rejects pool_timeout
+engine_kwargs = {}
+if settings.database_url.startswith("sqlite"):
+    connect_args = {"check_same_thread": False}
+else:
+    engine_kwargs = {
+        "pool_timeout": 30,
+        "pool_recycle": 3600,  # Recycle connections every hour
+    }
+
 engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
-    pool_timeout=30,
-    pool_recycle=3600,  # Recycle connections every hour
     pool_pre_ping=True,  # Validate connections before use
-    echo=settings.debug  # Log SQL queries in debug mode
+    echo=settings.debug,  # Log SQL queries in debug mode
+    **engine_kwargs
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def upsert_insert(db):
+    """Dialect insert() supporting ON CONFLICT clauses for a session's or connection's database."""
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    bind = db if hasattr(db, "dialect") else db.get_bind()
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"ON CONFLICT upserts are not supported on '{dialect}'")
+
 def get_db():
+    db_monitor.check_available()  # 503 right away instead of waiting on connect_timeout
+    shared = batch_session()
+    if shared is not None:  # Sub-request of /api/batch: the batch route owns and closes it
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
+    except OperationalError as e:
+        db_monitor.record_failure(str(e)[:100])
+        raise
     finally:
         db.close() 
\ No newline at end of file
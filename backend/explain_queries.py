@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Query-plan capture for the service layer.
+
+Runs every list/lookup query issued by the services against the database in
+DATABASE_URL, captures the SQL SQLAlchemy emits, runs EXPLAIN on each
+statement and reports which queries still fall back to sequential scans.
+
+Plans are only meaningful on realistic volumes - point DATABASE_URL at a
+database seeded with a large dataset before running this.
+
+Usage:
+    python explain_queries.py [--analyze] [--output report.json]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, func, text
+
+from database import SessionLocal, engine
+from models.exercise import Exercise
+from models.plan import Plan
+from models.recipe import Recipe
+from models.user import User
+from schemas.exercise import ExerciseFilter
+from schemas.recipe import RecipeFilter
+from services.exercise_service import ExerciseService
+from services.plan_service import PlanService
+from services.recipe_service import RecipeService
+from services.user_service import UserService
+
+# Below this many rows the planner will (correctly) prefer sequential scans
+MIN_ROWS_FOR_MEANINGFUL_PLANS = 10000
+
+
+def build_workload(db) -> List[Tuple[str, Callable[[], Any]]]:
+    """Representative calls for every service query, using real ids/emails when available."""
+    exercise_service = ExerciseService(db)
+    recipe_service = RecipeService(db)
+    plan_service = PlanService(db)
+    user_service = UserService(db)
+
+    sample_user = db.query(User.id, User.email).order_by(User.id).first()
+    user_id, email = sample_user if sample_user else (1, "someone@example.com")
+    sample_plan_id = db.query(Plan.id).filter(Plan.user_id == user_id).limit(1).scalar() or 1
+
+    return [
+        ("ExerciseService.get_exercises (no filter)",
+         lambda: exercise_service.get_exercises(limit=50)),
+        ("ExerciseService.get_exercises (muscle_group + difficulty)",
+         lambda: exercise_service.get_exercises(limit=50, filters=ExerciseFilter(
+             muscle_group="legs", difficulty_level="beginner", is_active=True))),
+        ("ExerciseService.get_exercise",
+         lambda: exercise_service.get_exercise(1)),
+        ("ExerciseService.search_exercises",
+         lambda: exercise_service.search_exercises("squat")),
+        ("ExerciseService.get_exercises_by_muscle_group",
+         lambda: exercise_service.get_exercises_by_muscle_group("chest")),
+        ("ExerciseService.get_exercises_by_equipment",
+         lambda: exercise_service.get_exercises_by_equipment("dumbbell")),
+        ("ExerciseService.get_exercises_for_user",
+         lambda: exercise_service.get_exercises_for_user(["dumbbell", "barbell"], "intermediate", limit=50)),
+        ("RecipeService.get_recipes (no filter)",
+         lambda: recipe_service.get_recipes(limit=50)),
+        ("RecipeService.get_recipes (meal_type + dietary)",
+         lambda: recipe_service.get_recipes(limit=50, filters=RecipeFilter(
+             meal_type="dinner", is_vegetarian=True, is_gluten_free=True, max_calories=700))),
+        ("RecipeService.get_recipe",
+         lambda: recipe_service.get_recipe(1)),
+        ("RecipeService.search_recipes",
+         lambda: recipe_service.search_recipes("chicken")),
+        ("RecipeService.get_recipes_by_meal_type",
+         lambda: recipe_service.get_recipes_by_meal_type("breakfast")),
+        ("RecipeService.get_recipes_for_user",
+         lambda: recipe_service.get_recipes_for_user(
+             {"is_vegetarian": True, "is_gluten_free": True, "allergies": ["nuts"]}, 2200, limit=100)),
+        ("PlanService.get_user_plans",
+         lambda: plan_service.get_user_plans(user_id, limit=20)),
+        ("PlanService.get_plan",
+         lambda: plan_service.get_plan(sample_plan_id, user_id)),
+        ("PlanService.get_active_user_plans",
+         lambda: plan_service.get_active_user_plans(user_id)),
+        ("UserService.get_user_by_email",
+         lambda: user_service.get_user_by_email(email)),
+    ]
+
+
+def capture_statements(db, workload) -> List[Dict[str, Any]]:
+    """Run the workload and record every SELECT it sends to the database."""
+    captured: List[Dict[str, Any]] = []
+    current_label = {"value": None}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and current_label["value"]:
+            captured.append({
+                "label": current_label["value"],
+                "statement": statement,
+                "parameters": parameters,
+            })
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for label, call in workload:
+            current_label["value"] = label
+            call()
+    finally:
+        current_label["value"] = None
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def _postgres_seq_scans(node: Dict[str, Any]) -> List[str]:
+    scans = []
+    if node.get("Node Type") == "Seq Scan":
+        scans.append(node.get("Relation Name"))
+    for child in node.get("Plans", []):
+        scans.extend(_postgres_seq_scans(child))
+    return scans
+
+
+def explain(conn, statement: str, parameters) -> Tuple[Any, List[str]]:
+    """Return (raw plan, tables read by sequential scan) for one statement."""
+    if conn.dialect.name == "postgresql":
+        rows = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).fetchall()
+        plan = rows[0][0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan, _postgres_seq_scans(plan[0]["Plan"])
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        details = [row[-1] for row in rows]
+        # "SCAN t" is a full table scan; "SCAN t USING INDEX" walks an index instead
+        scans = [d.split()[1] for d in details
+                 if d.startswith("SCAN ") and "INDEX" not in d and "CONSTANT ROW" not in d]
+        return details, scans
+
+    raise SystemExit(f"EXPLAIN capture is not supported for dialect '{conn.dialect.name}'")
+
+
+def table_sizes(db) -> Dict[str, int]:
+    return {
+        model.__tablename__: db.query(func.count(model.id)).scalar()
+        for model in (User, Exercise, Recipe, Plan)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture query plans for all service queries")
+    parser.add_argument("--analyze", action="store_true", help="Refresh planner statistics first")
+    parser.add_argument("--output", help="Write the full JSON report to this file")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.analyze:
+            db.execute(text("ANALYZE"))
+            db.commit()
+
+        sizes = table_sizes(db)
+        small = [name for name, rows in sizes.items() if rows < MIN_ROWS_FOR_MEANINGFUL_PLANS]
+        if small:
+            print(f"⚠️ Small tables ({', '.join(small)}): plans may not reflect production volumes")
+
+        captured = capture_statements(db, build_workload(db))
+        db.rollback()
+
+        report = []
+        with engine.connect() as conn:
+            for entry in captured:
+                plan, seq_scans = explain(conn, entry["statement"], entry["parameters"])
+                report.append({
+                    "label": entry["label"],
+                    "statement": entry["statement"],
+                    "seq_scans": seq_scans,
+                    "plan": plan,
+                })
+    finally:
+        db.close()
+
+    offenders = [r for r in report if r["seq_scans"]]
+    for entry in report:
+        marker = "❌ SEQ SCAN " + ", ".join(entry["seq_scans"]) if entry["seq_scans"] else "✅ index"
+        print(f"{marker:<40} {entry['label']}")
+    print(f"\n{len(offenders)} of {len(report)} queries use sequential scans")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"dialect": engine.dialect.name, "table_rows": sizes, "queries": report},
+                      f, indent=2, default=str)
+        print(f"📄 Report written to {args.output}")
+
+    return 1 if offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Sequence, Type, get_type_hints
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+# Always returned, so sparse items can still be told apart
+REQUIRED_FIELDS = ("id",)
+# Upper bound for ids= multi-get requests
+MAX_BATCH_IDS = 200
+
+FIELDS_QUERY = Query(
+    None, description="Comma-separated fields to return instead of the full object, e.g. id,name,muscle_group"
+)
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """The requested fields in schema order, or None for the full representation."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - schema.__fields__.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    requested.update(REQUIRED_FIELDS)
+    return [name for name in schema.__fields__ if name in requested]
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Comma-separated ids from an ids= parameter, deduplicated in request order."""
+    try:
+        parsed = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers"
+        )
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_BATCH_IDS} ids"
+        )
+    return parsed
+
+
+def project(query, model, fields: Optional[Sequence[str]], *needed):
+    """Load only the requested columns (plus `needed`, e.g. the keyset sort columns)."""
+    if fields is None:
+        return query
+    mapped = inspect(model).column_attrs.keys()
+    columns = {name for name in list(fields) + [c.key for c in needed] if name in mapped}
+    return query.options(load_only(*(getattr(model, name) for name in sorted(columns))))
+
+
+@lru_cache(maxsize=256)
+def _subset_model(schema: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    hints = get_type_hints(schema)
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=schema.__config__,
+        **{name: (hints[name], field.field_info) for name, field in schema.__fields__.items() if name in fields}
+    )
+
+
+def sparse_response(items: List[Any], schema: Type[BaseModel], fields: List[str]) -> ORJSONResponse:
+    """Validate and serialize only `fields` of each ORM object, as the full schema would."""
+    model = _subset_model(schema, frozenset(fields))
+    body = [model.from_orm(item).dict() for item in items]
+    return ORJSONResponse(body)
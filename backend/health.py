@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"        # Database healthy, requests go through
+OPEN = "open"            # Database down, DB-dependent requests fail fast with 503
+UNKNOWN = "unknown"      # No probe has finished yet
+
+
+class DatabaseHealthMonitor:
+    """Probes the database on an interval and keeps a circuit breaker.
+
+    Health endpoints read the cached state instead of connecting themselves.
+    The breaker opens after `failure_threshold` consecutive failed probes (or
+    request-path connection errors) and closes on the next successful probe.
+    """
+
+    def __init__(self, interval: float, timeout: float, failure_threshold: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.state = UNKNOWN
+        self.consecutive_failures = 0
+        self.last_probe_at: Optional[datetime] = None
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.opened_at: Optional[datetime] = None
+        self._engine = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # One dedicated thread, so a hanging connect can't eat the request threadpool
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-health")
+        self._pending = None
+        self._recovery_listeners: List[Callable[[], None]] = []
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.state == CLOSED
+
+    def on_recovery(self, listener: Callable[[], None]) -> None:
+        """Call `listener` (in the probe thread) whenever the database becomes reachable."""
+        self._recovery_listeners.append(listener)
+
+    def start(self, engine) -> None:
+        self._engine = engine
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    async def probe(self) -> None:
+        """Run one probe; a probe still hanging from last time counts as another failure."""
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.get_running_loop().run_in_executor(self._executor, self._select_one)
+        try:
+            latency = await asyncio.wait_for(asyncio.shield(self._pending), self.timeout)
+        except asyncio.TimeoutError:
+            self.record_failure(f"probe timed out after {self.timeout:.0f}s")
+        except Exception as e:
+            self.record_failure(str(e)[:100])
+        else:
+            self.record_success(latency)
+        self.last_probe_at = datetime.now()
+
+    def _select_one(self) -> float:
+        started = time.perf_counter()
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return (time.perf_counter() - started) * 1000
+
+    def record_success(self, latency_ms: float) -> None:
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.last_latency_ms = round(latency_ms, 2)
+            self.last_error = None
+            self.opened_at = None
+        if recovered:
+            logger.info(f"✅ Database reachable ({self.last_latency_ms}ms)")
+            for listener in self._recovery_listeners:
+                self._executor.submit(listener)
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            # A failing first probe opens right away rather than waiting out the threshold
+            opening = self.state != OPEN and (
+                self.consecutive_failures >= self.failure_threshold or self.state == UNKNOWN
+            )
+            if opening:
+                self.state = OPEN
+                self.opened_at = datetime.now()
+        if opening:
+            logger.warning(f"⚠️ Database circuit breaker opened: {error}")
+
+    def check_available(self) -> None:
+        """Fail fast with 503 while the breaker is open."""
+        if self.is_open:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database temporarily unavailable",
+                headers={"Retry-After": str(max(1, round(self.interval)))},
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": {CLOSED: "healthy", OPEN: "unhealthy", UNKNOWN: "unknown"}[self.state],
+            "circuit_breaker": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "response_time_ms": self.last_latency_ms,
+            "error": self.last_error,
+            "last_probe_at": self.last_probe_at.isoformat() if self.last_probe_at else None,
+            "open_since": self.opened_at.isoformat() if self.opened_at else None,
+        }
+
+
+db_monitor = DatabaseHealthMonitor(
+    interval=settings.db_probe_interval_seconds,
+    timeout=settings.db_probe_timeout_seconds,
+    failure_threshold=settings.db_breaker_failure_threshold,
+)
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from concurrency import client_key
+from config import settings
+from database import SessionLocal
+from health import db_monitor
+from models.idempotency import IdempotencyKey
+
+# POST endpoints whose retries must not repeat the work (plan generation, plan and account creation)
+IDEMPOTENT_ROUTES = re.compile(r"^/api/(plans|plans/generate|auth/register)/?$")
+MAX_KEY_LENGTH = 255
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+# How often a duplicate polls for a result another worker is still producing
+POLL_INTERVAL_SECONDS = 0.1
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class IdempotencyStore:
+    """Claims keys and records their outcome in idempotency_keys, one short session per call.
+
+    Methods are synchronous; the middleware runs them in the threadpool.
+    """
+
+    def __init__(self, session_factory, ttl: timedelta):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._last_purge = 0.0
+
+    def claim(self, owner: str, key: str, request_hash: str) -> Optional[Dict[str, Any]]:
+        """None when this request now owns the key, else the existing record."""
+        now = datetime.now(timezone.utc)
+        db = self.session_factory()
+        try:
+            if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now).delete(synchronize_session=False)
+            else:  # An expired key may be reused
+                db.query(IdempotencyKey).filter(
+                    IdempotencyKey.owner == owner, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+                ).delete(synchronize_session=False)
+            db.commit()
+
+            for _ in range(2):  # The row can vanish between the conflict and the read (released after a 5xx)
+                db.add(IdempotencyKey(
+                    owner=owner, key=key, request_hash=request_hash, state=IN_PROGRESS, expires_at=now + self.ttl
+                ))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+                existing = db.query(IdempotencyKey).filter(
+                    IdempotencyKey.owner == owner, IdempotencyKey.key == key
+                ).first()
+                if existing is not None:
+                    return {
+                        "request_hash": existing.request_hash,
+                        "state": existing.state,
+                        "status": existing.response_status,
+                        "headers": existing.response_headers,
+                        "body": existing.response_body,
+                    }
+            raise RuntimeError(f"Could not claim idempotency key {key!r}")
+        finally:
+            db.close()
+
+    def complete(self, owner: str, key: str, status_code: int, headers: List[List[str]], body: bytes) -> None:
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.owner == owner, IdempotencyKey.key == key).update({
+                "state": COMPLETED, "response_status": status_code,
+                "response_headers": headers, "response_body": body,
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, owner: str, key: str) -> None:
+        """Forget a key whose request failed, so a retry runs it again."""
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.owner == owner, IdempotencyKey.key == key
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+def _request_hash(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _replay(stored: Dict[str, Any]) -> Response:
+    response = Response(stored["body"] or b"", status_code=stored["status"])
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in stored["headers"] or []
+    ] + [(b"idempotent-replayed", b"true")]
+    return response
+
+
+def _error(status_code: int, detail: str, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    return ORJSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Idempotency-Key support for IDEMPOTENT_ROUTES.
+
+    The first request with a key runs; its response (unless a 5xx) is stored
+    for the key's TTL and replayed to later requests with the same key and
+    body. Duplicates arriving while it runs wait for it, in this worker via
+    a future and across workers by polling the table. Reusing a key for a
+    different request is a 422.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, wait_seconds: float = 30):
+        self.app = app
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not IDEMPOTENT_ROUTES.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None or db_monitor.is_open:  # With the database down the route answers 503 itself
+            await self.app(scope, receive, send)
+            return
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        owner = client_key(scope)
+        request_hash = _request_hash(scope, body)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            running_here = self._in_flight.get((owner, key))
+            if running_here is not None:
+                try:
+                    await asyncio.wait_for(asyncio.shield(running_here), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    break
+                continue
+            existing = await run_in_threadpool(self.store.claim, owner, key, request_hash)
+            if existing is None:
+                await self._run(scope, receive, send, owner, key, body)
+                return
+            if existing["request_hash"] != request_hash:
+                await _error(
+                    422, "Idempotency-Key was already used for a different request"
+                )(scope, receive, send)
+                return
+            if existing["state"] == COMPLETED:
+                await _replay(existing)(scope, receive, send)
+                return
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)  # Still running in another worker
+
+        await _error(
+            409, "A request with this Idempotency-Key is still in progress", {"Retry-After": "1"}
+        )(scope, receive, send)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, owner: str, key: str, body: bytes) -> None:
+        """Run the request for the first time and store its response."""
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[(owner, key)] = done
+        response: Dict[str, Any] = {"status": 500, "headers": [], "body": b""}
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()  # Disconnect notifications
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            try:
+                await self.app(scope, replay_receive, capture_send)
+            except Exception:
+                await run_in_threadpool(self.store.release, owner, key)
+                raise
+            if response["status"] >= 500:
+                await run_in_threadpool(self.store.release, owner, key)
+            else:
+                await run_in_threadpool(
+                    self.store.complete, owner, key, response["status"], response["headers"], response["body"]
+                )
+        finally:
+            del self._in_flight[(owner, key)]
+            done.set_result(None)
+
+
+idempotency_store = IdempotencyStore(SessionLocal, timedelta(hours=settings.idempotency_ttl_hours))
@@ -0,0 +1,136 @@
+import copy
+import re
+from typing import Any, Dict, List, Tuple
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+# RFC 6901 array-index: ASCII digits only, no leading zeros
+ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+
+class JsonPatchError(ValueError):
+    """A patch operation that cannot be applied to the document (RFC 6902 section 5)."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not ARRAY_INDEX.fullmatch(token):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_array_index(document, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def _parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Operation on the document root is not supported")
+    return _resolve(document, tokens[:-1]), tokens[-1]
+
+
+def _add(document: Any, pointer: str, value: Any) -> None:
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at {pointer}")
+
+
+def _remove(document: Any, pointer: str) -> Any:
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: {pointer}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Path not found: {pointer}")
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """Apply RFC 6902 operations in order and return the patched copy.
+
+    The input is never modified (plan bodies may be shared with the plan cache),
+    and a failing operation leaves no partial result behind.
+    """
+    document = copy.deepcopy(document)
+    for index, operation in enumerate(operations):
+        op = operation.get("op")
+        path = operation.get("path")
+        try:
+            if op not in OPERATIONS or path is None:
+                raise JsonPatchError(f"Unsupported operation: {op!r}")
+            if op in ("add", "replace", "test") and "value" not in operation:
+                raise JsonPatchError(f"'{op}' requires a value")
+            if op in ("move", "copy") and "from" not in operation:
+                raise JsonPatchError(f"'{op}' requires 'from'")
+
+            if op == "add":
+                _add(document, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                _remove(document, path)
+            elif op == "replace":
+                _remove(document, path)
+                _add(document, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                if path != operation["from"] and path.startswith(operation["from"] + "/"):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                _add(document, path, _remove(document, operation["from"]))
+            elif op == "copy":
+                _add(document, path, copy.deepcopy(_resolve(document, parse_pointer(operation["from"]))))
+            elif _resolve(document, parse_pointer(path)) != operation["value"]:
+                raise JsonPatchError(f"Test failed at {path}")
+        except JsonPatchError as e:
+            raise JsonPatchError(f"Operation {index}: {e}") from None
+    return document
+
+
+def simple_replacements(operations: List[Dict[str, Any]]) -> bool:
+    """True when the patch only tests/replaces and no replacement feeds a later operation.
+
+    Such patches give the same result when every operation is evaluated against
+    the stored document, so they can run as a single UPDATE instead of a
+    read-modify-write.
+    """
+    seen = []
+    for operation in operations:
+        if operation.get("op") not in ("replace", "test") or "value" not in operation:
+            return False
+        try:
+            tokens = parse_pointer(operation.get("path", ""))
+        except JsonPatchError:
+            return False
+        # Postgres reads "-1" and "01" as array indexes where RFC 6902 rejects them
+        if not tokens or any(t.startswith("-") or (t[1:2].isdigit() and t.startswith("0")) for t in tokens):
+            return False
+        for op, earlier in seen:
+            shorter = min(len(tokens), len(earlier))
+            if op == "replace" and tokens[:shorter] == earlier[:shorter]:
+                return False
+        seen.append((operation["op"], tokens))
+    return True
@@ -1,4 +1,8 @@
-from fastapi import FastAPI, Request, Response
+import time
+
+_import_started = time.perf_counter()  # Before the heavy imports, so cold start covers them
+
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import (
@@ -6,19 +10,25 @@ from fastapi.openapi.docs import (
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse
+import json
 import os
 import logging
-import time
 from datetime import datetime
-from sqlalchemy.exc import OperationalError
 
+from compression import CompressionMiddleware, PrecompressedAsset
+from concurrency import LoadSheddingMiddleware, load_shedder
+from idempotency import IdempotencyMiddleware, idempotency_store
 from config import settings
-from routers import auth, users, exercises, recipes, plans
-from database import engine, Base
+from routers import auth, users, exercises, recipes, plans, feedback, recommendations, batch
+from database import engine, SessionLocal
+from health import db_monitor
+from revocation import revocation_list
+from schema_version import check_schema
 
-# Global database availability flag
-database_available = False
+# Schema revision status, filled in whenever the health monitor first reaches the database
+schema_status = {"current": None, "expected": None, "up_to_date": None}
+startup_timings = {}
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -101,6 +111,8 @@ app = FastAPI(
     terms_of_service="https://fitgenius.com/terms",
     docs_url=None,  # Custom docs
     redoc_url=None,  # Custom redoc
+    openapi_url=None,  # Served precompressed from memory, see openapi_json()
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {
             "name": "🔐 Authentication",
@@ -122,6 +134,14 @@ app = FastAPI(
             "name": "📋 Plans",
             "description": "AI-powered workout and meal plan generation",
         },
+        {
+            "name": "👍 Feedback",
+            "description": "Batched exercise and recipe feedback with per-item totals",
+        },
+        {
+            "name": "✨ Recommendations",
+            "description": "Precomputed collaborative-filtering suggestions",
+        },
         {
             "name": "🏆 Achievements",
             "description": "Gamification system with badges and rewards",
@@ -138,6 +158,10 @@ app = FastAPI(
             "name": "🔔 Notifications",
             "description": "Smart notifications and reminders",
         },
+        {
+            "name": "🧩 Batch",
+            "description": "Several read requests in one round trip, e.g. for dashboard boot",
+        },
         {
             "name": "⚙️ Admin",
             "description": "Administrative functions and system management",
@@ -166,43 +190,54 @@ custom_css = """
 </style>
 """
 
-def create_tables_with_retry(max_retries=3, delay=2):
-    """Create database tables with graceful failure handling."""
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"🔄 Attempting to create database tables (attempt {attempt + 1}/{max_retries})")
-            Base.metadata.create_all(bind=engine)
-            logger.info("✅ Database tables created successfully")
-            return True
-        except Exception as e:
-            logger.warning(f"❌ Database connection failed on attempt {attempt + 1}: {e}")
-            if attempt < max_retries - 1:
-                logger.info(f"⏳ Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                logger.warning("⚠️ Database connection failed - API will start in limited mode")
-                logger.info("💡 Database-dependent features will be unavailable until connection is restored")
-                return False
-    return False
+def verify_schema():
+    """Check the database is migrated to this build's revision.
+
+    Tables are created and altered only by `alembic upgrade head`, run once per
+    release; workers never run DDL or seed data.
+    """
+    global schema_status
+    try:
+        schema_status = check_schema(engine)
+    except Exception as e:
+        logger.warning(f"⚠️ Schema revision check failed: {e}")
+        return
+
+    if schema_status["up_to_date"]:
+        logger.info(f"✅ Database schema at revision {schema_status['current']}")
+    else:
+        logger.error(
+            f"❌ Database schema at revision {schema_status['current']}, this build expects "
+            f"{schema_status['expected']} - run `alembic upgrade head`"
+        )
 
 @app.on_event("startup")
 async def startup_event():
-    """Graceful startup that works even without database."""
+    """Fast startup: database probing and the schema check run in the background."""
     logger.info("🚀 Starting FitGenius API...")
-    start_time = time.time()
+    start_time = time.perf_counter()
     
-    # Try to initialize database (non-blocking)
-    global database_available
-    database_available = create_tables_with_retry()
+    build_docs_assets()
     
-    # Log startup completion
-    startup_time = time.time() - start_time
-    status = "✅ fully operational" if database_available else "⚠️ running in limited mode (database unavailable)"
-    logger.info(f"🎉 FitGenius API startup completed in {startup_time:.2f}s - {status}")
+    # Re-checked after every outage, so a worker started while the database was down still verifies it
+    db_monitor.on_recovery(verify_schema)
+    db_monitor.start(engine)
+    revocation_list.start(SessionLocal)
     
-    if not database_available:
-        logger.info("📚 API documentation and basic endpoints are available")
-        logger.info("🔧 Check /health endpoint for database status")
+    # Log startup completion
+    startup_timings["import_ms"] = round((start_time - _import_started) * 1000, 1)
+    startup_timings["startup_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+    startup_timings["cold_start_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    logger.info(
+        f"🎉 FitGenius API startup completed in {startup_timings['cold_start_ms']:.0f}ms "
+        f"(imports {startup_timings['import_ms']:.0f}ms, startup hooks {startup_timings['startup_ms']:.0f}ms, "
+        f"OpenAPI schema {startup_timings['openapi_ms']:.0f}ms)"
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await db_monitor.stop()
+    await revocation_list.stop()
 
 # Enhanced CORS with production settings
 allowed_origins = [
@@ -216,13 +251,31 @@ allowed_origins = [
 if settings.allowed_origins:
     allowed_origins.extend(settings.allowed_origins)
 
+# Retried POSTs with an Idempotency-Key replay the stored response instead of running again
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    wait_seconds=settings.idempotency_wait_seconds,
+)
+
+# Inside CORS, so 429/503 rejections still carry CORS headers the browser can read
+app.add_middleware(LoadSheddingMiddleware, shedder=load_shedder)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count", "X-Page-Count"],
+    expose_headers=["X-Total-Count", "X-Page-Count", "X-Next-Cursor", "ETag", "Retry-After", "Idempotent-Replayed"],
+)
+
+# Brotli (when installed) or gzip for JSON bodies worth compressing; large plans shrink ~10x
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_bytes,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
 )
 
 # Add explicit OPTIONS handler to ensure preflight requests work
@@ -234,7 +287,7 @@ async def options_handler(request: Request, path: str):
     response_headers = {
         "Access-Control-Allow-Origin": origin,
         "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-        "Access-Control-Allow-Headers": "Accept, Accept-Language, Content-Language, Content-Type, Authorization, X-Requested-With, Origin",
+        "Access-Control-Allow-Headers": "Accept, Accept-Language, Content-Language, Content-Type, Authorization, X-Requested-With, Origin, If-Match",
         "Access-Control-Allow-Credentials": "true",
         "Access-Control-Max-Age": "3600"
     }
@@ -247,6 +300,9 @@ app.include_router(users.router, prefix="/api/users", tags=["👤 Users"])
 app.include_router(exercises.router, prefix="/api/exercises", tags=["💪 Exercises"])
 app.include_router(recipes.router, prefix="/api/recipes", tags=["🥗 Recipes"])  
 app.include_router(plans.router, prefix="/api/plans", tags=["📋 Plans"])
+app.include_router(feedback.router, prefix="/api/feedback", tags=["👍 Feedback"])
+app.include_router(recommendations.router, prefix="/api/recommendations", tags=["✨ Recommendations"])
+app.include_router(batch.router, prefix="/api/batch", tags=["🧩 Batch"])
 
 # Advanced feature routers - temporarily disabled for deployment stability
 # try:
@@ -261,22 +317,77 @@ app.include_router(plans.router, prefix="/api/plans", tags=["📋 Plans"])
 #     # Graceful degradation - core functionality still works
 logger.info("ℹ️ Advanced feature routers temporarily disabled for deployment stability")
 
+# OpenAPI schema and docs pages - built once per worker (or at image build time) and served
+# precompressed from memory; the docs load the schema from a content-hashed, immutable URL
+OPENAPI_URL = "/openapi.json"
+docs_assets = {}
+
+def openapi_document() -> bytes:
+    """The OpenAPI schema as compact JSON bytes."""
+    return json.dumps(app.openapi(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def build_docs_assets():
+    """Generate (or load the prebuilt) OpenAPI schema and precompress it with the docs pages."""
+    started = time.perf_counter()
+    prebuilt = settings.openapi_prebuilt_path
+    loaded = bool(prebuilt) and os.path.exists(prebuilt)
+    if loaded:
+        with open(prebuilt, "rb") as f:
+            document = f.read()
+        app.openapi_schema = json.loads(document)
+    else:
+        document = openapi_document()
+    
+    schema = PrecompressedAsset(document, "application/json")
+    schema_url = f"/openapi.{schema.version}.json"
+    docs_assets["openapi"] = schema
+    docs_assets["docs"] = PrecompressedAsset(
+        get_swagger_ui_html(openapi_url=schema_url, title=f"{app.title} - Documentation").body, "text/html"
+    )
+    docs_assets["redoc"] = PrecompressedAsset(
+        get_redoc_html(openapi_url=schema_url, title=f"{app.title} - ReDoc").body, "text/html"
+    )
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    startup_timings["openapi_ms"] = round(elapsed_ms, 1)
+    sizes = ", ".join(f"{encoding} {size / 1024:.0f}KB" for encoding, size in schema.sizes().items())
+    logger.info(f"📚 OpenAPI schema {'loaded' if loaded else 'generated'} in {elapsed_ms:.0f}ms ({sizes})")
+    if elapsed_ms > settings.openapi_budget_ms:
+        logger.warning(
+            f"⚠️ OpenAPI schema took {elapsed_ms:.0f}ms, over the {settings.openapi_budget_ms}ms startup budget - "
+            f"prebuild it with build_openapi.py"
+        )
+
+def docs_asset(name: str) -> PrecompressedAsset:
+    if name not in docs_assets:  # App served without running startup hooks
+        build_docs_assets()
+    return docs_assets[name]
+
+# Revalidated with the ETag on every use; the versioned URL below is the one that's cached for good
+REVALIDATE = "public, max-age=0, must-revalidate"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json(request: Request):
+    return docs_asset("openapi").response(request, REVALIDATE)
+
+@app.get("/openapi.{version}.json", include_in_schema=False)
+async def versioned_openapi_json(request: Request, version: str):
+    schema = docs_asset("openapi")
+    if version != schema.version:  # A docs page from before the last deploy
+        return RedirectResponse(OPENAPI_URL)
+    return schema.response(request, IMMUTABLE)
+
 # Default documentation endpoints  
 @app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
+async def custom_swagger_ui_html(request: Request):
     """Simple and stable Swagger UI documentation"""
-    return get_swagger_ui_html(
-        openapi_url=app.openapi_url,
-        title=f"{app.title} - Documentation"
-    )
+    return docs_asset("docs").response(request, REVALIDATE)
 
 @app.get("/redoc", include_in_schema=False)
-async def redoc_html():
+async def redoc_html(request: Request):
     """Simple ReDoc documentation"""
-    return get_redoc_html(
-        openapi_url=app.openapi_url,
-        title=f"{app.title} - ReDoc"
-    )
+    return docs_asset("redoc").response(request, REVALIDATE)
 
 @app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
 async def swagger_ui_redirect():
@@ -286,14 +397,8 @@ async def swagger_ui_redirect():
 @app.get("/", include_in_schema=False)
 async def root():
     """Simple API welcome message with database status"""
-    # Check database status for root endpoint
-    db_connected = False
-    try:
-        with engine.connect() as conn:
-            conn.execute("SELECT 1")
-        db_connected = True
-    except:
-        pass
+    # Cached by the health monitor; never connects on the request path
+    db_connected = not db_monitor.is_open
     
     return {
         "message": "🏋️ Welcome to FitGenius API",
@@ -348,28 +453,13 @@ async def api_info():
         }
     }
 
-# Graceful health check that works with or without database
+# Health check that never waits on the database: it reports the monitor's last probe
 @app.get("/health", tags=["🔧 System"])
 async def health_check():
-    """Health check with graceful database handling"""
+    """Liveness: always 200 while the process can respond, with cached database status"""
     start_time = time.time()
-    
-    # Test database connection
-    db_status = "unknown"
-    db_response_time = None
-    db_error = None
-    
-    try:
-        db_start = time.time()
-        with engine.connect() as conn:
-            result = conn.execute("SELECT 1")
-            if result:
-                db_status = "healthy"
-                db_response_time = time.time() - db_start
-    except Exception as e:
-        db_status = "unhealthy"
-        db_error = str(e)[:100]  # Truncate error message
-        logger.warning(f"⚠️ Database health check failed: {e}")
+    database = db_monitor.snapshot()
+    db_status = database["status"]
     
     # API is always healthy if it can respond
     api_status = "healthy"
@@ -384,29 +474,38 @@ async def health_check():
                 "status": api_status,
                 "response_time_ms": round((time.time() - start_time) * 1000, 2)
             },
-            "database": {
-                "status": db_status,
-                "response_time_ms": round(db_response_time * 1000, 2) if db_response_time else None,
-                "error": db_error if db_error else None
-            }
+            "database": database
         },
         "system": {
             "environment": os.getenv("ENVIRONMENT", "production"),
-            "mode": "full" if db_status == "healthy" else "limited"
+            "mode": "full" if db_status == "healthy" else "limited",
+            "schema": schema_status,
+            "startup": startup_timings,
+            "load": load_shedder.snapshot(),
+            "revoked_sessions": revocation_list.snapshot()
         },
         "message": "All systems operational" if db_status == "healthy" else "API operational, database connection issues"
     }
 
+@app.get("/ready", tags=["🔧 System"])
+async def readiness_check(response: Response):
+    """Readiness: 503 while the database circuit breaker is open"""
+    database = db_monitor.snapshot()
+    ready = not db_monitor.is_open
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        response.headers["Retry-After"] = str(max(1, round(db_monitor.interval)))
+    return {"ready": ready, "database": database, "schema": schema_status}
+
 @app.get("/database-status", tags=["🔧 System"])
 async def database_status():
-    """Check database connectivity and available features"""
-    try:
-        with engine.connect() as conn:
-            conn.execute("SELECT 1")
-        
+    """Check database connectivity and available features (as of the last health probe)"""
+    database = db_monitor.snapshot()
+    if not db_monitor.is_open:
         return {
             "database_connected": True,
             "status": "✅ Database is operational",
+            "schema_revision": schema_status,
             "available_features": [
                 "🔐 User authentication and registration",
                 "💪 Exercise library and tracking", 
@@ -416,11 +515,12 @@ async def database_status():
             ],
             "message": "All database-dependent features are available"
         }
-    except Exception as e:
+    else:
         return {
             "database_connected": False,
             "status": "⚠️ Database connection unavailable",
-            "error": str(e)[:100],
+            "error": database["error"],
+            "open_since": database["open_since"],
             "available_features": [
                 "📚 API documentation (/docs, /redoc)",
                 "🔧 System health checks (/health)",
@@ -0,0 +1,204 @@
+"""initial schema
+
+Schema as previously created by Base.metadata.create_all. Databases that
+were created that way should be marked as migrated with `alembic stamp 0001`
+before running `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 19:31:18.462253
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('exercises',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('muscle_group', sa.String(length=100), nullable=True),
+    sa.Column('secondary_muscles', sa.JSON(), nullable=True),
+    sa.Column('equipment_needed', sa.String(length=100), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=50), nullable=True),
+    sa.Column('exercise_type', sa.String(length=100), nullable=True),
+    sa.Column('is_compound', sa.Boolean(), nullable=True),
+    sa.Column('default_sets', sa.Integer(), nullable=True),
+    sa.Column('default_reps_min', sa.Integer(), nullable=True),
+    sa.Column('default_reps_max', sa.Integer(), nullable=True),
+    sa.Column('default_rest_seconds', sa.Integer(), nullable=True),
+    sa.Column('video_url', sa.String(length=255), nullable=True),
+    sa.Column('instructions', sa.Text(), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('equipment', sa.String(length=100), nullable=True),
+    sa.Column('difficulty', sa.String(length=50), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exercises_difficulty_level'), 'exercises', ['difficulty_level'], unique=False)
+    op.create_index(op.f('ix_exercises_equipment_needed'), 'exercises', ['equipment_needed'], unique=False)
+    op.create_index(op.f('ix_exercises_id'), 'exercises', ['id'], unique=False)
+    op.create_index(op.f('ix_exercises_muscle_group'), 'exercises', ['muscle_group'], unique=False)
+    op.create_index(op.f('ix_exercises_name'), 'exercises', ['name'], unique=False)
+
+    op.create_table('recipes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('calories', sa.Integer(), nullable=True),
+    sa.Column('protein_g', sa.Float(), nullable=True),
+    sa.Column('carbs_g', sa.Float(), nullable=True),
+    sa.Column('fat_g', sa.Float(), nullable=True),
+    sa.Column('meal_type', sa.String(length=50), nullable=True),
+    sa.Column('cuisine_type', sa.String(length=100), nullable=True),
+    sa.Column('difficulty', sa.String(length=50), nullable=True),
+    sa.Column('prep_time_minutes', sa.Integer(), nullable=True),
+    sa.Column('ingredients', sa.JSON(), nullable=True),
+    sa.Column('instructions', sa.Text(), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('is_vegetarian', sa.Boolean(), nullable=True),
+    sa.Column('is_vegan', sa.Boolean(), nullable=True),
+    sa.Column('is_gluten_free', sa.Boolean(), nullable=True),
+    sa.Column('is_dairy_free', sa.Boolean(), nullable=True),
+    sa.Column('is_nut_free', sa.Boolean(), nullable=True),
+    sa.Column('is_paleo', sa.Boolean(), nullable=True),
+    sa.Column('is_keto', sa.Boolean(), nullable=True),
+    sa.Column('is_low_carb', sa.Boolean(), nullable=True),
+    sa.Column('is_high_protein', sa.Boolean(), nullable=True),
+    sa.Column('is_meal_prep_friendly', sa.Boolean(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('dietary_tags', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recipes_id'), 'recipes', ['id'], unique=False)
+    op.create_index(op.f('ix_recipes_name'), 'recipes', ['name'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('is_active', sa.Integer(), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.String(length=50), nullable=True),
+    sa.Column('height_cm', sa.Integer(), nullable=True),
+    sa.Column('weight_kg', sa.Float(), nullable=True),
+    sa.Column('activity_level', sa.String(length=50), nullable=True),
+    sa.Column('goal', sa.String(length=50), nullable=True),
+    sa.Column('bmr', sa.Float(), nullable=True),
+    sa.Column('tdee', sa.Float(), nullable=True),
+    sa.Column('target_calories', sa.Float(), nullable=True),
+    sa.Column('available_equipment', sa.JSON(), nullable=True),
+    sa.Column('workout_days_per_week', sa.Integer(), nullable=True),
+    sa.Column('workout_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('is_vegetarian', sa.Boolean(), nullable=True),
+    sa.Column('is_vegan', sa.Boolean(), nullable=True),
+    sa.Column('is_gluten_free', sa.Boolean(), nullable=True),
+    sa.Column('is_paleo', sa.Boolean(), nullable=True),
+    sa.Column('is_keto', sa.Boolean(), nullable=True),
+    sa.Column('allergies', sa.String(length=500), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table('generated_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('plan_type', sa.String(length=50), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('plan_data', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_generated_plans_id'), 'generated_plans', ['id'], unique=False)
+    op.create_index(op.f('ix_generated_plans_user_id'), 'generated_plans', ['user_id'], unique=False)
+
+    op.create_table('plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('plan_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('duration_weeks', sa.Integer(), nullable=True),
+    sa.Column('plan_data', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plans_id'), 'plans', ['id'], unique=False)
+    op.create_index(op.f('ix_plans_user_id'), 'plans', ['user_id'], unique=False)
+
+    op.create_table('user_profiles',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.String(length=50), nullable=True),
+    sa.Column('height_cm', sa.Integer(), nullable=True),
+    sa.Column('weight_kg', sa.Float(), nullable=True),
+    sa.Column('activity_level', sa.String(length=50), nullable=True),
+    sa.Column('goal', sa.String(length=50), nullable=True),
+    sa.Column('preferences', sa.JSON(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_feedback_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('plan_id', sa.Integer(), nullable=True),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    sa.Column('feedback_type', sa.String(length=50), nullable=True),
+    sa.Column('feedback_value', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['generated_plans.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_feedback_log_id'), 'user_feedback_log', ['id'], unique=False)
+    op.create_index(op.f('ix_user_feedback_log_user_id'), 'user_feedback_log', ['user_id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_feedback_log_user_id'), table_name='user_feedback_log')
+    op.drop_index(op.f('ix_user_feedback_log_id'), table_name='user_feedback_log')
+
+    op.drop_table('user_feedback_log')
+    op.drop_table('user_profiles')
+    op.drop_index(op.f('ix_plans_user_id'), table_name='plans')
+    op.drop_index(op.f('ix_plans_id'), table_name='plans')
+
+    op.drop_table('plans')
+    op.drop_index(op.f('ix_generated_plans_user_id'), table_name='generated_plans')
+    op.drop_index(op.f('ix_generated_plans_id'), table_name='generated_plans')
+
+    op.drop_table('generated_plans')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
+    op.drop_index(op.f('ix_recipes_name'), table_name='recipes')
+    op.drop_index(op.f('ix_recipes_id'), table_name='recipes')
+
+    op.drop_table('recipes')
+    op.drop_index(op.f('ix_exercises_name'), table_name='exercises')
+    op.drop_index(op.f('ix_exercises_muscle_group'), table_name='exercises')
+    op.drop_index(op.f('ix_exercises_id'), table_name='exercises')
+    op.drop_index(op.f('ix_exercises_equipment_needed'), table_name='exercises')
+    op.drop_index(op.f('ix_exercises_difficulty_level'), table_name='exercises')
+
+    op.drop_table('exercises')
@@ -0,0 +1,55 @@
+"""composite and partial indexes for service query patterns
+
+Indexes match the filters used by ExerciseService, RecipeService and
+PlanService (see explain_queries.py for the plans they produce). On
+PostgreSQL they are built CONCURRENTLY so the release step does not lock
+the catalog tables.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 19:45:02.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# SQLite only matches a partial index when the predicate is spelled like the query's
+ACTIVE_ONLY = sa.text('is_active')
+SQLITE_ACTIVE_ONLY = sa.text('is_active = 1')
+
+INDEXES = [
+    # (name, table, columns, partial on is_active)
+    ('ix_exercises_name_id', 'exercises', ['name', 'id'], False),
+    ('ix_exercises_active_equipment_difficulty', 'exercises', ['equipment_needed', 'difficulty_level'], True),
+    ('ix_exercises_active_muscle_group', 'exercises', ['muscle_group'], True),
+    ('ix_recipes_name_id', 'recipes', ['name', 'id'], False),
+    ('ix_recipes_active_meal_type_calories', 'recipes', ['meal_type', 'calories'], True),
+    ('ix_recipes_active_calories', 'recipes', ['calories'], True),
+    ('ix_plans_user_active_status', 'plans', ['user_id', 'is_active', 'status'], False),
+    ('ix_plans_user_created_id', 'plans', ['user_id', 'created_at', 'id'], True),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, partial in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=ACTIVE_ONLY if partial else None,
+                sqlite_where=SQLITE_ACTIVE_ONLY if partial else None,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""recipe dietary_flags bitmask
+
+Packs the ten is_* dietary columns into one integer (bit order defined by
+models.recipe.DIETARY_FLAGS) and backfills it for existing rows.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 20:12:40.530117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of models.recipe.DIETARY_FLAGS at the time of this migration
+DIETARY_FLAGS = [
+    'is_vegetarian',
+    'is_vegan',
+    'is_gluten_free',
+    'is_dairy_free',
+    'is_nut_free',
+    'is_paleo',
+    'is_keto',
+    'is_low_carb',
+    'is_high_protein',
+    'is_meal_prep_friendly',
+]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dietary_flags', sa.Integer(), server_default='0', nullable=False))
+
+    backfill = ' + '.join(
+        f'(CASE WHEN {name} THEN {1 << position} ELSE 0 END)'
+        for position, name in enumerate(DIETARY_FLAGS)
+    )
+    op.execute(f'UPDATE recipes SET dietary_flags = {backfill}')
+
+    op.create_index(
+        'ix_recipes_active_dietary_flags_calories', 'recipes', ['dietary_flags', 'calories'],
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_active_dietary_flags_calories', table_name='recipes')
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_column('dietary_flags')
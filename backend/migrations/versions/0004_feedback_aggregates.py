@@ -0,0 +1,87 @@
+"""feedback item_type and aggregate tables
+
+Adds user_feedback_log.item_type, points plan_id at plans (feedback is
+recorded against the plans users actually work through) and creates the
+per-(user, item) and per-item counter tables maintained by FeedbackService.
+Legacy log rows have no item_type and are not aggregated.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 21:02:11.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+# Name PostgreSQL gave the unnamed FK created in 0001
+POSTGRES_OLD_PLAN_FK = 'user_feedback_log_plan_id_fkey'
+# Lets batch mode address the unnamed FK SQLite reflects from 0001
+SQLITE_NAMING = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+SQLITE_OLD_PLAN_FK = 'fk_user_feedback_log_plan_id_generated_plans'
+NEW_PLAN_FK = 'fk_user_feedback_log_plan_id_plans'
+
+
+def _counter_columns():
+    return [
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('skipped_count', sa.Integer(), nullable=False),
+        sa.Column('too_hard_count', sa.Integer(), nullable=False),
+        sa.Column('liked_count', sa.Integer(), nullable=False),
+        sa.Column('last_feedback_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _swap_plan_fk(old_name, referred_table, new_name):
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('user_feedback_log', naming_convention=SQLITE_NAMING) as batch_op:
+            batch_op.drop_constraint(old_name, type_='foreignkey')
+            batch_op.create_foreign_key(new_name, referred_table, ['plan_id'], ['id'])
+    else:
+        op.drop_constraint(old_name, 'user_feedback_log', type_='foreignkey')
+        op.create_foreign_key(new_name, 'user_feedback_log', referred_table, ['plan_id'], ['id'])
+
+
+def upgrade() -> None:
+    op.add_column('user_feedback_log', sa.Column('item_type', sa.String(length=20), nullable=True))
+    # Plan ids of the old generated_plans table mean nothing in plans
+    op.execute('UPDATE user_feedback_log SET plan_id = NULL')
+    old_fk = SQLITE_OLD_PLAN_FK if op.get_bind().dialect.name == 'sqlite' else POSTGRES_OLD_PLAN_FK
+    _swap_plan_fk(old_fk, 'plans', NEW_PLAN_FK)
+
+    op.create_table('user_item_feedback_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    *_counter_columns(),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'item_type', 'item_id')
+    )
+    op.create_table('item_feedback_stats',
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    *_counter_columns(),
+    sa.PrimaryKeyConstraint('item_type', 'item_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('item_feedback_stats')
+    op.drop_table('user_item_feedback_stats')
+
+    op.execute('UPDATE user_feedback_log SET plan_id = NULL')
+    if op.get_bind().dialect.name == 'sqlite':
+        _swap_plan_fk(NEW_PLAN_FK, 'generated_plans', SQLITE_OLD_PLAN_FK)
+    else:
+        _swap_plan_fk(NEW_PLAN_FK, 'generated_plans', POSTGRES_OLD_PLAN_FK)
+    with op.batch_alter_table('user_feedback_log', schema=None) as batch_op:
+        batch_op.drop_column('item_type')
@@ -0,0 +1,38 @@
+"""per-user preference models
+
+Packed Beta-bandit arrays per (user, item type), updated by FeedbackService
+and read by plan generation. Existing aggregates can be folded in with
+PreferenceStore.rebuild_from_stats().
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 21:37:54.201846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_preference_models',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_ids', sa.LargeBinary(), nullable=False),
+    sa.Column('alpha', sa.LargeBinary(), nullable=False),
+    sa.Column('beta', sa.LargeBinary(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'item_type')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_preference_models')
@@ -0,0 +1,52 @@
+"""collaborative-filtering recommendation tables
+
+Item factors per item type from the last full ALS run, per-user top-N
+lists served by the recommendations endpoint, and an index for finding
+users whose feedback changed since the last refresh.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 22:08:31.775902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('recommendation_models',
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('factors', sa.Integer(), nullable=False),
+    sa.Column('regularization', sa.Float(), nullable=False),
+    sa.Column('confidence_alpha', sa.Float(), nullable=False),
+    sa.Column('item_ids', sa.LargeBinary(), nullable=False),
+    sa.Column('item_factors', sa.LargeBinary(), nullable=False),
+    sa.Column('trained_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('item_type')
+    )
+    op.create_table('user_recommendations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=False),
+    sa.Column('model_version', sa.Integer(), nullable=False),
+    sa.Column('generated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'item_type')
+    )
+    op.create_index('ix_user_item_feedback_stats_type_last', 'user_item_feedback_stats',
+                    ['item_type', 'last_feedback_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_item_feedback_stats_type_last', table_name='user_item_feedback_stats')
+    op.drop_table('user_recommendations')
+    op.drop_table('recommendation_models')
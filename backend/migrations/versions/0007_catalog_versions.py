@@ -0,0 +1,33 @@
+"""catalog versions
+
+One counter per catalog, bumped with every exercise/recipe write. Plan
+generation includes it in its memoization key so catalog edits never serve
+stale plan bodies.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 22:41:06.913527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
@@ -0,0 +1,28 @@
+"""plan seed
+
+Generated plans keep their seed so any day can be rebuilt on its own by
+POST /api/plans/{id}/regenerate.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 23:18:52.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('plans', sa.Column('seed', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('plans', schema=None) as batch_op:
+        batch_op.drop_column('seed')
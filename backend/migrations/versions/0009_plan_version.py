@@ -0,0 +1,29 @@
+"""plan version
+
+Optimistic concurrency counter for plans. Every write bumps it and
+PATCH/PUT /api/plans/{id} answer 409 when the client's If-Match version
+is stale.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 23:52:37.418260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('plans', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('plans', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,36 @@
+"""plan blocks
+
+Content-addressed store for plan days. Plans written from now on reference
+blocks by hash; compact_plans.py converts existing rows.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 00:31:14.552903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('plan_blocks',
+    sa.Column('hash', sa.String(length=32), nullable=False),
+    sa.Column('body', sa.JSON(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_index(op.f('ix_plan_blocks_last_used_at'), 'plan_blocks', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_plan_blocks_last_used_at'), table_name='plan_blocks')
+    op.drop_table('plan_blocks')
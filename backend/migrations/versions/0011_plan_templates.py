@@ -0,0 +1,37 @@
+"""plan templates
+
+Pre-generated plan bodies per common input combination, built by
+build_plan_templates.py and instantiated by plan generation.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-20 01:12:48.730154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('plan_templates',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('plan_type', sa.String(length=50), nullable=False),
+    sa.Column('inputs', sa.JSON(), nullable=False),
+    sa.Column('seed', sa.Integer(), nullable=False),
+    sa.Column('catalog_version', sa.Integer(), nullable=False),
+    sa.Column('user_count', sa.Integer(), nullable=False),
+    sa.Column('plan_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('plan_templates')
@@ -0,0 +1,42 @@
+"""user sessions
+
+Server-side sessions referenced by the `sid` claim of access tokens, so
+tokens can be revoked per device.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-20 03:05:42.917364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_sessions',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('device', sa.String(length=255), nullable=True),
+    sa.Column('ip_address', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('last_active_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_sessions_user_revoked', 'user_sessions', ['user_id', 'revoked_at'], unique=False)
+    op.create_index('ix_user_sessions_revoked_at', 'user_sessions', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_sessions_revoked_at', table_name='user_sessions')
+    op.drop_index('ix_user_sessions_user_revoked', table_name='user_sessions')
+    op.drop_table('user_sessions')
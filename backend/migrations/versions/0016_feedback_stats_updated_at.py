@@ -0,0 +1,34 @@
+"""user feedback stats updated_at
+
+Server-side change marker for the incremental recommendation refresh, which
+used to select users by the client-supplied last_feedback_at.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-20 06:12:04.281377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows get the migration time, so the next refresh folds in everyone once
+    with op.batch_alter_table('user_item_feedback_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+    op.drop_index('ix_user_item_feedback_stats_type_last', table_name='user_item_feedback_stats')
+    op.create_index('ix_user_item_feedback_stats_type_updated', 'user_item_feedback_stats', ['item_type', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_item_feedback_stats_type_updated', table_name='user_item_feedback_stats')
+    op.create_index('ix_user_item_feedback_stats_type_last', 'user_item_feedback_stats', ['item_type', 'last_feedback_at'], unique=False)
+    with op.batch_alter_table('user_item_feedback_stats', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
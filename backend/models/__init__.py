@@ -1,11 +1,25 @@
 from .user import User, UserProfile
 from .exercise import Exercise
 from .recipe import Recipe
-from .plan import GeneratedPlan, UserFeedbackLog
+from .plan import GeneratedPlan, PlanBlock, PlanTemplate, UserFeedbackLog
+from .feedback import UserItemFeedbackStats, ItemFeedbackStats
+from .preference import UserPreferenceModel
+from .recommendation import RecommendationModel, UserRecommendation
+from .catalog import CatalogVersion
+from .job import JobCheckpoint
+from .idempotency import IdempotencyKey
+from .session import UserSession, RefreshToken
 
 __all__ = [
     "User", "UserProfile",
     "Exercise", 
     "Recipe",
-    "GeneratedPlan", "UserFeedbackLog"
+    "GeneratedPlan", "PlanBlock", "PlanTemplate", "UserFeedbackLog",
+    "UserItemFeedbackStats", "ItemFeedbackStats",
+    "UserPreferenceModel",
+    "RecommendationModel", "UserRecommendation",
+    "CatalogVersion",
+    "JobCheckpoint",
+    "IdempotencyKey",
+    "UserSession", "RefreshToken"
 ] 
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class CatalogVersion(Base):
+    """Monotonic version per catalog, bumped in the same transaction as every catalog write."""
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(20), primary_key=True)  # 'exercise', 'recipe'
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CatalogVersion(name='{self.name}', version={self.version})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, Index, text
 from database import Base
 from enum import Enum
 
@@ -14,6 +14,16 @@ class MuscleGroupEnum(str, Enum):
 
 class Exercise(Base):
     __tablename__ = "exercises"
+    __table_args__ = (
+        # Catalog browse: keyset pagination on (name, id)
+        Index("ix_exercises_name_id", "name", "id"),
+        # get_exercises_for_user: equipment IN (...) AND difficulty_level = ? on active rows
+        Index("ix_exercises_active_equipment_difficulty", "equipment_needed", "difficulty_level",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+        # get_exercises_by_muscle_group on active rows
+        Index("ix_exercises_active_muscle_group", "muscle_group",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
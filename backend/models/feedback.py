@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from database import Base
+
+# Counter columns shared by both aggregate tables, one per feedback type
+FEEDBACK_COUNTERS = ["completed_count", "skipped_count", "too_hard_count", "liked_count"]
+
+class UserItemFeedbackStats(Base):
+    """Running feedback totals per (user, item), maintained on every feedback batch."""
+    __tablename__ = "user_item_feedback_stats"
+    __table_args__ = (
+        # Recommendation refresh: users with feedback since the last run
+        Index("ix_user_item_feedback_stats_type_updated", "item_type", "updated_at"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_type = Column(String(20), primary_key=True)  # 'exercise', 'recipe'
+    item_id = Column(Integer, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Integer, nullable=False, default=0)  # Sum of feedback_value (+1/-1)
+    completed_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    too_hard_count = Column(Integer, nullable=False, default=0)
+    liked_count = Column(Integer, nullable=False, default=0)
+    last_feedback_at = Column(DateTime(timezone=True), nullable=True)  # Client-supplied occurred_at
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())  # Server time of the last batch
+
+    def __repr__(self):
+        return f"<UserItemFeedbackStats(user_id={self.user_id}, {self.item_type}={self.item_id})>"
+
+class ItemFeedbackStats(Base):
+    """Running feedback totals per item across all users."""
+    __tablename__ = "item_feedback_stats"
+
+    item_type = Column(String(20), primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    too_hard_count = Column(Integer, nullable=False, default=0)
+    liked_count = Column(Integer, nullable=False, default=0)
+    last_feedback_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ItemFeedbackStats({self.item_type}={self.item_id}, events={self.event_count})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class IdempotencyKey(Base):
+    """Outcome of a POST sent with an Idempotency-Key, replayed to retries until it expires."""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    owner = Column(String(255), primary_key=True)  # 'user:<email>' or 'ip:<address>', so keys can't collide across clients
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path and body
+    state = Column(String(20), nullable=False, default="in_progress")  # 'in_progress', 'completed'
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSON, nullable=True)  # [[name, value], ...]
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(owner='{self.owner}', key='{self.key}', state='{self.state}')>"
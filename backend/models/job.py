@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class JobCheckpoint(Base):
+    """Progress of a resumable batch job, committed together with each chunk it processes."""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(100), primary_key=True)  # e.g. 'user_metrics'
+    last_id = Column(Integer, nullable=False, default=0)  # Highest id fully processed
+    processed = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)  # Rows actually written
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)  # NULL while a run is unfinished
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<JobCheckpoint(name='{self.name}', last_id={self.last_id}, processed={self.processed})>"
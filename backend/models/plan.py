@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Date, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Date, Boolean, Text, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -16,6 +16,13 @@ class PlanStatusEnum(str, Enum):
 
 class Plan(Base):
     __tablename__ = "plans"
+    __table_args__ = (
+        # get_active_user_plans: user_id = ? AND is_active AND status = ?
+        Index("ix_plans_user_active_status", "user_id", "is_active", "status"),
+        # get_user_plans: keyset pagination newest first per user
+        Index("ix_plans_user_created_id", "user_id", "created_at", "id",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -25,17 +32,51 @@ class Plan(Base):
     status = Column(String(50), default="draft")  # draft, active, completed, paused
     start_date = Column(Date, nullable=True)
     duration_weeks = Column(Integer, nullable=True)
+    seed = Column(Integer, nullable=True)  # Generator seed; NULL for custom plans
     plan_data = Column(JSON, nullable=True)  # The actual plan content
+    version = Column(Integer, nullable=False, server_default=text("1"))  # Bumped on every write
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # ORM flushes check and bump `version`, so concurrent edits fail instead of clobbering
+    __mapper_args__ = {"version_id_col": version}
+
     # Relationships
     user = relationship("User", back_populates="plans")
 
     def __repr__(self):
         return f"<Plan(name='{self.name}', plan_type='{self.plan_type}', user_id={self.user_id})>"
 
+class PlanBlock(Base):
+    """Content-addressed plan day: plans.plan_data holds {"$block": hash} references to these."""
+    __tablename__ = "plan_blocks"
+
+    hash = Column(String(32), primary_key=True)  # sha256 of the canonical JSON, truncated
+    body = Column(JSON, nullable=False)
+    size = Column(Integer, nullable=False)  # Canonical JSON length in bytes
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # For garbage collection
+
+    def __repr__(self):
+        return f"<PlanBlock(hash='{self.hash}', size={self.size})>"
+
+class PlanTemplate(Base):
+    """Pre-generated plan body shared by every user whose coarse inputs match (see build_plan_templates.py)."""
+    __tablename__ = "plan_templates"
+
+    key = Column(String(64), primary_key=True)  # sha256 of plan_type, inputs, seed and catalog version
+    plan_type = Column(String(50), nullable=False)
+    inputs = Column(JSON, nullable=False)  # PlanService.template_inputs()
+    seed = Column(Integer, nullable=False)
+    catalog_version = Column(Integer, nullable=False)
+    user_count = Column(Integer, nullable=False, default=0)  # Users matching the inputs at build time
+    plan_data = Column(JSON, nullable=False)  # Days stored as plan block references
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PlanTemplate(plan_type='{self.plan_type}', seed={self.seed}, users={self.user_count})>"
+
 class GeneratedPlan(Base):
     __tablename__ = "generated_plans"
 
@@ -52,12 +93,23 @@ class GeneratedPlan(Base):
     def __repr__(self):
         return f"<GeneratedPlan(plan_type='{self.plan_type}', user_id={self.user_id})>"
 
+class FeedbackTypeEnum(str, Enum):
+    COMPLETED = "completed"
+    SKIPPED = "skipped"
+    TOO_HARD = "too_hard"
+    LIKED = "liked"
+
+class FeedbackItemTypeEnum(str, Enum):
+    EXERCISE = "exercise"
+    RECIPE = "recipe"
+
 class UserFeedbackLog(Base):
     __tablename__ = "user_feedback_log"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    plan_id = Column(Integer, ForeignKey("generated_plans.id"), nullable=True)
+    plan_id = Column(Integer, ForeignKey("plans.id", name="fk_user_feedback_log_plan_id_plans"), nullable=True)
+    item_type = Column(String(20), nullable=True)  # 'exercise', 'recipe' (NULL on legacy rows)
     item_id = Column(Integer, nullable=True)  # exercise_id or recipe_id
     feedback_type = Column(String(50), nullable=True)  # 'completed', 'skipped', 'too_hard', 'liked'
     feedback_value = Column(Integer, nullable=True)  # 1 for positive, -1 for negative
@@ -65,7 +117,7 @@ class UserFeedbackLog(Base):
 
     # Relationships
     user = relationship("User", back_populates="feedback_logs")
-    plan = relationship("GeneratedPlan")
+    plan = relationship("Plan")
 
     def __repr__(self):
         return f"<UserFeedbackLog(user_id={self.user_id}, feedback_type='{self.feedback_type}')>" 
\ No newline at end of file
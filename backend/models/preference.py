@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+from database import Base
+
+class UserPreferenceModel(Base):
+    """Per-user Beta-Bernoulli bandit over one item type, stored as packed arrays.
+
+    Only items the user has given feedback on are stored; every other item uses
+    the Beta(1, 1) prior. See services/preference_model.py for the encoding.
+    """
+    __tablename__ = "user_preference_models"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_type = Column(String(20), primary_key=True)  # 'exercise', 'recipe'
+    item_ids = Column(LargeBinary, nullable=False)  # Sorted int32 item ids
+    alpha = Column(LargeBinary, nullable=False)  # float32 positive evidence per item
+    beta = Column(LargeBinary, nullable=False)  # float32 negative evidence per item
+    version = Column(Integer, nullable=False, default=0)  # Bumped on every update
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserPreferenceModel(user_id={self.user_id}, item_type='{self.item_type}', version={self.version})>"
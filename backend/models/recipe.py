@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, JSON, Boolean, Index, text, event
 from database import Base
 from enum import Enum
 
@@ -8,8 +8,58 @@ class MealTypeEnum(str, Enum):
     DINNER = "dinner"
     SNACK = "snack"
 
+# Bit positions of Recipe.dietary_flags. Append new flags at the end - existing
+# positions are stored in the database and must never be reordered.
+DIETARY_FLAGS = [
+    "is_vegetarian",
+    "is_vegan",
+    "is_gluten_free",
+    "is_dairy_free",
+    "is_nut_free",
+    "is_paleo",
+    "is_keto",
+    "is_low_carb",
+    "is_high_protein",
+    "is_meal_prep_friendly",
+]
+DIETARY_FLAG_BITS = {name: 1 << position for position, name in enumerate(DIETARY_FLAGS)}
+
+def compute_dietary_flags(values) -> int:
+    """Pack the boolean dietary columns of a Recipe (or a dict of them) into one integer."""
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name, None)
+    flags = 0
+    for name, bit in DIETARY_FLAG_BITS.items():
+        if get(name):
+            flags |= bit
+    return flags
+
+def dietary_mask(required: dict) -> tuple:
+    """Turn {flag: True/False} requirements into (mask, value) for `flags & mask == value`."""
+    mask = value = 0
+    for name, wanted in required.items():
+        if wanted is None:
+            continue
+        bit = DIETARY_FLAG_BITS[name]
+        mask |= bit
+        if wanted:
+            value |= bit
+    return mask, value
+
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Catalog browse: keyset pagination on (name, id)
+        Index("ix_recipes_name_id", "name", "id"),
+        # get_recipes_by_meal_type / meal plan generation on active rows
+        Index("ix_recipes_active_meal_type_calories", "meal_type", "calories",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+        # get_recipes_for_user: calories <= ? on active rows
+        Index("ix_recipes_active_calories", "calories",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+        # Dietary browse/plan filters: (dietary_flags & mask) = value, checked from the index
+        Index("ix_recipes_active_dietary_flags_calories", "dietary_flags", "calories",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -42,6 +92,9 @@ class Recipe(Base):
     is_high_protein = Column(Boolean, default=False)
     is_meal_prep_friendly = Column(Boolean, default=False)
     
+    # All of the above packed into one integer (see DIETARY_FLAGS), maintained on write
+    dietary_flags = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Status
     is_active = Column(Boolean, default=True)
     
@@ -51,4 +104,10 @@ class Recipe(Base):
     # Note: embedding VECTOR(384) field will be handled by pgvector extension in PostgreSQL
 
     def __repr__(self):
-        return f"<Recipe(name='{self.name}', calories={self.calories})>" 
\ No newline at end of file
+        return f"<Recipe(name='{self.name}', calories={self.calories})>" 
+
+@event.listens_for(Recipe, "before_insert")
+@event.listens_for(Recipe, "before_update")
+def _sync_dietary_flags(mapper, connection, target):
+    """Keep dietary_flags in step with the boolean columns on every ORM write."""
+    target.dietary_flags = compute_dietary_flags(target)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, JSON, Float
+from sqlalchemy.sql import func
+from database import Base
+
+class RecommendationModel(Base):
+    """Item factors from the last full collaborative-filtering run, one row per item type."""
+    __tablename__ = "recommendation_models"
+
+    item_type = Column(String(20), primary_key=True)  # 'exercise', 'recipe'
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every full training run
+    factors = Column(Integer, nullable=False)  # Latent dimensions
+    regularization = Column(Float, nullable=False)
+    confidence_alpha = Column(Float, nullable=False)
+    item_ids = Column(LargeBinary, nullable=False)  # Sorted int32 item ids
+    item_factors = Column(LargeBinary, nullable=False)  # float32 (len(item_ids), factors), row-major
+    trained_at = Column(DateTime(timezone=True), nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)  # Feedback up to here is folded in
+
+    def __repr__(self):
+        return f"<RecommendationModel(item_type='{self.item_type}', version={self.version})>"
+
+class UserRecommendation(Base):
+    """Precomputed top-N items for one user, served as-is by the recommendations endpoint."""
+    __tablename__ = "user_recommendations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_type = Column(String(20), primary_key=True)
+    items = Column(JSON, nullable=False)  # [{'item_id': 12, 'score': 0.83}, ...] best first
+    model_version = Column(Integer, nullable=False)
+    generated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserRecommendation(user_id={self.user_id}, item_type='{self.item_type}')>"
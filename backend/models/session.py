@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class UserSession(Base):
+    """A signed-in device. Tokens carry its id as `sid`; revoking it invalidates all of them."""
+    __tablename__ = "user_sessions"
+    __table_args__ = (
+        Index("ix_user_sessions_user_revoked", "user_id", "revoked_at"),
+        Index("ix_user_sessions_revoked_at", "revoked_at"),  # Revocation list refreshes
+    )
+
+    id = Column(String(32), primary_key=True)  # Random, not guessable
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    device = Column(String(255), nullable=True)  # User-Agent at login
+    ip_address = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_active_at = Column(DateTime(timezone=True), server_default=func.now())  # Login or last token refresh
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)  # NULL while the session is valid
+
+    def __repr__(self):
+        return f"<UserSession(id='{self.id}', user_id={self.user_id}, revoked={self.revoked_at is not None})>"
+
+class RefreshToken(Base):
+    """A single-use refresh token. All tokens of a session form one rotation family."""
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_session_id", "session_id"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), unique=True, nullable=False)  # sha256; the tokens are random, so no bcrypt needed
+    session_id = Column(String(32), ForeignKey("user_sessions.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # Set when rotated; presenting it again is reuse
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, session_id='{self.session_id}', used={self.used_at is not None})>"
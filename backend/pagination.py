@@ -0,0 +1,232 @@
+import base64
+import json
+import math
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import String, and_, or_, text, type_coerce
+from sqlalchemy.orm import Query
+
+from config import settings
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query plus the cursor for the next page."""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str], total: Optional[int], limit: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.limit = limit
+
+    @property
+    def page_count(self) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(1, math.ceil(self.total / self.limit))
+
+    def apply_headers(self, response: Response) -> None:
+        """Expose pagination metadata through the X-* headers advertised by CORS."""
+        if self.total is not None:
+            response.headers["X-Total-Count"] = str(self.total)
+            response.headers["X-Page-Count"] = str(self.page_count)
+        if self.next_cursor:
+            response.headers["X-Next-Cursor"] = self.next_cursor
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any, python_type: Optional[type] = None) -> Any:
+    """Turn a cursor value back into `python_type`; ValueError when it is anything else."""
+    if isinstance(value, dict):
+        if "dt" in value:
+            value = datetime.fromisoformat(value["dt"])
+        elif "d" in value:
+            value = date.fromisoformat(value["d"])
+        else:
+            raise ValueError("Unknown cursor value")
+    elif isinstance(value, list):
+        raise ValueError("Cursor values must be scalars")
+    if value is None or python_type is None:
+        return value
+    if python_type is float and type(value) is int:
+        value = float(value)
+    if type(value) is not python_type:  # Exact: bool is not an int here, nor a datetime a date
+        raise ValueError(f"Cursor value must be a {python_type.__name__}")
+    return value
+
+
+def _column_python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the (sort_key, id) of the last row on a page into an opaque cursor."""
+    payload = json.dumps([_encode_value(sort_value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_type: Optional[type] = None) -> Tuple[Any, int]:
+    """Decode a cursor produced by encode_cursor, checking its sort value against `sort_type`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if type(row_id) is not int:
+            raise ValueError("Cursor id must be an integer")
+        return _decode_value(sort_value, sort_type), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def _bound_sort_value(query: Query, value: Any) -> Any:
+    """The cursor's sort value as it should be compared in SQL.
+
+    SQLite keeps DATETIME as text: rows from server defaults (CURRENT_TIMESTAMP)
+    have no fractional seconds, rows written by the ORM have six digits. The
+    value is compared in the form its own row has, or the row would sort before
+    itself and the same page would come back forever.
+    """
+    if isinstance(value, datetime) and query.session.get_bind().dialect.name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return type_coerce(value.strftime(fmt), String)
+    return value
+
+
+def paginate_keyset(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """Seek past the cursor on (sort_column, id_column) instead of using OFFSET.
+
+    The row comparison is spelled out with OR/AND so it can be served by a
+    composite (sort_key, id) index on both PostgreSQL and SQLite. `offset`
+    only exists for legacy `skip=` clients and is ignored once a cursor is used.
+    """
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, _column_python_type(sort_column))
+        last_value = _bound_sort_value(query, last_value)
+        if descending:
+            query = query.filter(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, id_column > last_id)
+            ))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+class CountCache:
+    """Process-local TTL cache for list totals so pages don't each run COUNT(*)."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def set(self, key: Hashable, value: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """Drop cached totals, optionally only those for one table."""
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == table_name]:
+                    del self._entries[key]
+
+
+count_cache = CountCache(settings.count_cache_ttl_seconds)
+
+
+def _estimated_table_rows(query: Query, table_name: str) -> Optional[int]:
+    """Use the planner's row estimate on PostgreSQL for unfiltered listings."""
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    estimate = query.session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+        {"name": table_name}
+    ).scalar()
+    # reltuples is -1 (or 0) until the table has been analyzed
+    if estimate is None or estimate <= 0:
+        return None
+    return int(estimate)
+
+
+def filter_signature(filters) -> Hashable:
+    """Hashable key describing a pydantic filter model; () when nothing is filtered."""
+    if filters is None:
+        return ()
+    values = filters.dict(exclude_none=True)
+    if not values:
+        return ()
+    return json.dumps(values, sort_keys=True, default=str)
+
+
+def cached_total(query: Query, table_name: str, filter_key: Hashable) -> int:
+    """Return an approximate total for a filtered query.
+
+    `filter_key` must identify the filter combination (not the page), so every
+    page of the same listing shares one count until the TTL expires.
+    """
+    key = (table_name, filter_key)
+    total = count_cache.get(key)
+    if total is not None:
+        return total
+
+    total = None
+    if filter_key == ():
+        total = _estimated_table_rows(query, table_name)
+    if total is None:
+        # Query.count() wraps the query, so an unfiltered listing still counts FROM its table
+        total = query.order_by(None).count()
+    count_cache.set(key, total)
+    return total
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Collaborative-filtering job for exercise and recipe recommendations.
+
+Factorizes the per-(user, item) feedback aggregates with implicit ALS and
+writes each user's top-N list to user_recommendations, which
+GET /api/recommendations/{item_type} serves with a primary-key read.
+
+By default only users with feedback since the last run are refreshed, by
+folding them into the stored item factors. Schedule a --full run (e.g.
+nightly) to retrain the factors and pick up new items.
+
+Usage:
+    python recommendation_job.py                  # incremental refresh
+    python recommendation_job.py --full --factors 64 --iterations 15
+"""
+
+import argparse
+import json
+import time
+
+from database import SessionLocal
+from services.recommendation_service import (
+    DEFAULT_CONFIDENCE_ALPHA, DEFAULT_FACTORS, DEFAULT_ITERATIONS, DEFAULT_REGULARIZATION,
+    DEFAULT_TOP_N, ITEM_MODELS, RecommendationService
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute collaborative-filtering recommendations")
+    parser.add_argument("--full", action="store_true", help="Retrain item factors and rewrite every user")
+    parser.add_argument("--item-type", choices=sorted(ITEM_MODELS), action="append",
+                        help="Limit to one item type (repeatable); defaults to all")
+    parser.add_argument("--factors", type=int, default=DEFAULT_FACTORS)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--regularization", type=float, default=DEFAULT_REGULARIZATION)
+    parser.add_argument("--alpha", type=float, default=DEFAULT_CONFIDENCE_ALPHA, help="Confidence scaling")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="Items stored per user")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = RecommendationService(db)
+        for item_type in args.item_type or sorted(ITEM_MODELS):
+            started = time.perf_counter()
+            if args.full:
+                result = service.train(item_type, args.factors, args.regularization, args.alpha,
+                                       args.iterations, args.top, args.seed)
+            else:
+                result = service.refresh(item_type, args.top)
+            mode = "trained" if args.full else "refreshed"
+            print(f"✅ {item_type}: {mode} in {time.perf_counter() - started:.1f}s {json.dumps(result)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
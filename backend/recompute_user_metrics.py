@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Bulk BMR / TDEE / target calorie recomputation.
+
+Run after changing the activity multipliers or goal offsets in
+services/user_metrics.py. Streams users in id order, computes each chunk
+with NumPy and writes back only the rows that change (batched
+UPDATE ... FROM (VALUES ...) on PostgreSQL). Progress is checkpointed with
+every chunk, so an interrupted run picks up where it stopped.
+
+Usage:
+    python recompute_user_metrics.py                   # start, or resume an unfinished run
+    python recompute_user_metrics.py --restart --chunk-size 20000
+"""
+
+import argparse
+import time
+
+from database import SessionLocal
+from services.user_metrics import DEFAULT_CHUNK_SIZE, UserMetricsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute BMR, TDEE and target calories for all users")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Users per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore an unfinished run and start from the first user")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    resumed = {}
+
+    def report(state):
+        if not resumed:
+            resumed["processed"] = state["processed"] - min(args.chunk_size, state["processed"])
+        elapsed = time.perf_counter() - started
+        rate = (state["processed"] - resumed["processed"]) / elapsed if elapsed else 0.0
+        eta = state["remaining"] / rate if rate else 0.0
+        print(f"⏳ {state['processed']:,} users ({state['updated']:,} updated) through id {state['last_id']} "
+              f"- {rate:,.0f} users/s, {state['remaining']:,} left, ETA {eta:.0f}s", flush=True)
+
+    db = SessionLocal()
+    try:
+        result = UserMetricsService(db).recompute_all(args.chunk_size, args.restart, report)
+    finally:
+        db.close()
+    print(f"✅ Recomputed metrics for {result['processed']:,} users, {result['updated']:,} changed, "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
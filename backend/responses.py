@@ -0,0 +1,33 @@
+from typing import Any, Dict, Iterable, List, Optional, Type, Union
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def orm_dict(obj: Any, schema: Type[BaseModel], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """The schema's fields (or just `fields`) read straight off an ORM object, without validation."""
+    if fields is None:
+        return {name: getattr(obj, name, field.default) for name, field in schema.__fields__.items()}
+    return {name: getattr(obj, name, schema.__fields__[name].default) for name in fields}
+
+
+def trusted_response(content: Union[Any, Iterable[Any]], schema: Type[BaseModel],
+                     status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+                     fields: Optional[Iterable[str]] = None,
+                     extras: Optional[List[Dict[str, Any]]] = None) -> ORJSONResponse:
+    """Serialize service output with orjson, skipping response_model validation.
+
+    Only for ORM objects whose columns already satisfy the schema: FastAPI's
+    validate-then-jsonable_encoder pass walks every value of large plan_data
+    bodies twice more. The route keeps its response_model for the docs.
+    `extras` holds additional keys per object, in content order.
+    """
+    if isinstance(content, (list, tuple)):
+        body = [orm_dict(obj, schema, fields) for obj in content]
+        for item, extra in zip(body, extras or []):
+            item.update(extra)
+    else:
+        body = orm_dict(content, schema, fields)
+        if extras:
+            body.update(extras[0])
+    return ORJSONResponse(body, status_code=status_code, headers=headers)
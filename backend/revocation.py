@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from config import settings
+from models.session import UserSession
+
+logger = logging.getLogger(__name__)
+
+MIN_BLOOM_CAPACITY = 1024
+BLOOM_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: never a false negative, ~`error_rate` false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """In-process set of revoked session ids, checked on every authenticated request.
+
+    A Bloom filter answers the common "not revoked" case without touching the
+    exact set; only its rare positives are confirmed there. Revocations made
+    in this worker apply immediately; other workers' are picked up by an
+    incremental refresh every `interval` seconds. A periodic full rebuild
+    drops sessions that have expired anyway.
+    """
+
+    def __init__(self, interval: float, rebuild_every: int = 720):
+        self.interval = interval
+        self.rebuild_every = rebuild_every
+        self.loaded = False
+        self.last_refresh_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._state: Tuple[BloomFilter, Set[str]] = (BloomFilter(MIN_BLOOM_CAPACITY), set())
+        self._watermark: Optional[datetime] = None
+        self._refreshes = 0
+        self._session_factory = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="revocations")
+
+    def is_revoked(self, session_id: str) -> bool:
+        bloom, revoked = self._state  # Swapped as one tuple, so a rebuild never splits the pair
+        return session_id in bloom and session_id in revoked
+
+    def add(self, session_ids: Iterable[str]) -> None:
+        bloom, revoked = self._state
+        for session_id in session_ids:
+            bloom.add(session_id)
+            revoked.add(session_id)
+
+    def start(self, session_factory) -> None:
+        self._session_factory = session_factory
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(self._executor, self.refresh)
+            except Exception as e:  # Keep serving from what we have; the next refresh retries
+                if self.last_error is None:
+                    logger.warning(f"⚠️ Could not refresh revoked sessions: {str(e)[:100]}")
+                self.last_error = str(e)[:100]
+            await asyncio.sleep(self.interval)
+
+    def refresh(self) -> None:
+        now = datetime.now(timezone.utc)
+        bloom, revoked = self._state
+        full = not self.loaded or self._refreshes % self.rebuild_every == 0 or len(revoked) > bloom.capacity
+        db = self._session_factory()
+        try:
+            query = db.query(UserSession.id, UserSession.revoked_at).filter(
+                UserSession.revoked_at.isnot(None), UserSession.expires_at > now
+            )
+            if not full and self._watermark is not None:
+                # Overlap the previous window so revocations committed late aren't skipped
+                query = query.filter(UserSession.revoked_at >= self._watermark - timedelta(seconds=2 * self.interval + 5))
+            rows = query.all()
+        finally:
+            db.close()
+
+        if rows:
+            newest = max(revoked_at for _, revoked_at in rows)
+            if self._watermark is None or newest > self._watermark:
+                self._watermark = newest
+        if full:
+            revoked = {session_id for session_id, _ in rows}
+            bloom = BloomFilter(max(MIN_BLOOM_CAPACITY, 2 * len(revoked)))
+            for session_id in revoked:
+                bloom.add(session_id)
+            self._state = (bloom, revoked)
+            if not self.loaded:
+                logger.info(f"✅ Loaded {len(revoked)} revoked sessions")
+            self.loaded = True
+        else:
+            self.add(session_id for session_id, _ in rows)
+        self._refreshes += 1
+        self.last_refresh_at = datetime.now()
+        self.last_error = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "revoked_sessions": len(self._state[1]),
+            "bloom_bytes": len(self._state[0].bits),
+            "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            "error": self.last_error,
+        }
+
+
+revocation_list = RevocationList(interval=settings.session_revocation_refresh_seconds)
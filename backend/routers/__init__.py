@@ -1,3 +1,3 @@
-from . import auth, users, exercises, recipes, plans
+from . import auth, users, exercises, recipes, plans, feedback, recommendations
 
-__all__ = ["auth", "users", "exercises", "recipes", "plans"] 
\ No newline at end of file
+__all__ = ["auth", "users", "exercises", "recipes", "plans", "feedback", "recommendations"] 
\ No newline at end of file
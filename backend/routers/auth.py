@@ -1,6 +1,6 @@
 from datetime import timedelta, datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer
+from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 import secrets
@@ -9,18 +9,44 @@ from pydantic import BaseModel, EmailStr
 
 from database import get_db
 from models.user import User
-from schemas.user import UserCreate, UserResponse, Token
+from schemas.user import UserCreate, UserResponse, Token, RefreshRequest
 from auth import (
     get_password_hash,
     authenticate_user,
     create_access_token,
     get_current_active_user,
-    verify_password
+    get_current_session_id,
+    verify_password,
+    verify_token
 )
 from config import settings
+from concurrency import client_address
+from services.session_service import SessionService, InvalidRefreshToken
 
 router = APIRouter()
 
+# /refresh also accepts just an access token, from clients that predate refresh tokens
+optional_bearer = HTTPBearer(auto_error=False)
+
+def _token_response(email: str, session_id: Optional[str], refresh_token: Optional[str] = None) -> dict:
+    claims = {"sub": email}
+    if session_id:
+        claims["sid"] = session_id
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    return {
+        "access_token": create_access_token(data=claims, expires_delta=access_token_expires),
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token
+    }
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 @router.post(
     "/register",
     response_model=UserResponse,
@@ -76,7 +102,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login and get access token."""
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
@@ -86,12 +112,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+    session_service = SessionService(db)
+    session = session_service.create_session(
+        user.id,
+        device=request.headers.get("user-agent"),
+        ip_address=client_address(request.scope)
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _token_response(user.email, session.id, session_service.issue_refresh_token(session))
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
@@ -99,14 +127,42 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
     return current_user
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_active_user)):
-    """Refresh access token."""
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": current_user.email}, expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+async def refresh_token(
+    refresh_request: Optional[RefreshRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+    db: Session = Depends(get_db)
+):
+    """Exchange a refresh token for a new access token and the next refresh token.
+    
+    Never verifies a password, so idle clients don't log in again. Each refresh
+    token works once; presenting a used one signs its session out everywhere.
+    """
+    session_service = SessionService(db)
+    if refresh_request is not None:
+        try:
+            session, next_refresh_token = session_service.rotate_refresh_token(refresh_request.refresh_token)
+        except InvalidRefreshToken as e:
+            raise _unauthorized(str(e))
+        user = db.query(User).filter(User.id == session.user_id).first()
+        if not user or not user.is_active:
+            raise _unauthorized("User not found or inactive")
+        return _token_response(user.email, session.id, next_refresh_token)
+    
+    # Legacy: a still-valid access token buys another one (no refresh token, which would outlive it)
+    if credentials is None:
+        raise _unauthorized("Send a refresh_token")
+    token_data = verify_token(credentials.credentials)
+    user = db.query(User).filter(User.email == token_data.email).first()
+    if not user or not user.is_active:
+        raise _unauthorized("User not found or inactive")
+    if not token_data.session_id:
+        # Pre-session tokens can't be revoked, so they must expire rather than be renewed
+        raise _unauthorized("Token has no session, please log in again")
+    session = session_service.get_active_session(token_data.session_id, user.id)
+    if not session:
+        raise _unauthorized("Session has expired or been revoked")
+    session_service.touch(session)
+    return _token_response(user.email, token_data.session_id)
 
 # Enhanced Authentication Features
 
@@ -178,6 +234,7 @@ async def reset_password(
 async def change_password(
     change_data: ChangePassword,
     current_user: User = Depends(get_current_active_user),
+    session_id: Optional[str] = Depends(get_current_session_id),
     db: Session = Depends(get_db)
 ):
     """Change password for authenticated user"""
@@ -200,6 +257,9 @@ async def change_password(
     current_user.hashed_password = get_password_hash(change_data.new_password)
     db.commit()
     
+    # Sign out every other device
+    SessionService(db).revoke_all_sessions(current_user.id, except_session_id=session_id)
+    
     return {"message": "Password changed successfully"}
 
 @router.post("/verify-email")
@@ -267,30 +327,26 @@ async def get_security_info(
 @router.get("/sessions")
 async def get_active_sessions(
     current_user: User = Depends(get_current_active_user),
+    session_id: Optional[str] = Depends(get_current_session_id),
     db: Session = Depends(get_db)
 ):
     """Get user's active sessions across devices"""
     
+    sessions = SessionService(db).get_active_sessions(current_user.id)
     return {
         "active_sessions": [
             {
-                "session_id": "sess_123",
-                "device": "Chrome on Windows",
-                "ip_address": "192.168.1.100",
-                "location": "Chicago, IL",
-                "last_active": "2024-01-15T18:30:00Z",
-                "is_current": True
-            },
-            {
-                "session_id": "sess_124",
-                "device": "Mobile App on iOS",
-                "ip_address": "192.168.1.101",
-                "location": "Chicago, IL",
-                "last_active": "2024-01-15T12:15:00Z",
-                "is_current": False
+                "session_id": session.id,
+                "device": session.device,
+                "ip_address": session.ip_address,
+                "created_at": session.created_at,
+                "last_active": session.last_active_at,
+                "expires_at": session.expires_at,
+                "is_current": session.id == session_id
             }
+            for session in sessions
         ],
-        "total_sessions": 2,
+        "total_sessions": len(sessions),
         "security_tips": [
             "🔒 Log out from devices you don't recognize",
             "📱 Keep your mobile app updated",
@@ -298,30 +354,50 @@ async def get_active_sessions(
         ]
     }
 
-@router.delete("/sessions/{session_id}")
-async def revoke_session(
-    session_id: str,
+@router.post("/logout")
+async def logout(
     current_user: User = Depends(get_current_active_user),
+    session_id: Optional[str] = Depends(get_current_session_id),
     db: Session = Depends(get_db)
 ):
-    """Revoke a specific session"""
+    """Revoke the session of the token used for this request"""
     
-    return {
-        "message": f"Session {session_id} revoked successfully",
-        "session_id": session_id
-    }
+    if session_id:
+        SessionService(db).revoke_session(session_id, current_user.id)
+    return {"message": "Logged out successfully"}
 
+# Declared before /sessions/{session_id}, which would otherwise capture "all"
 @router.delete("/sessions/all")
 async def revoke_all_sessions(
     current_user: User = Depends(get_current_active_user),
+    session_id: Optional[str] = Depends(get_current_session_id),
     db: Session = Depends(get_db)
 ):
     """Revoke all sessions except current one"""
     
+    revoked_count = SessionService(db).revoke_all_sessions(current_user.id, except_session_id=session_id)
     return {
         "message": "All other sessions revoked successfully",
-        "revoked_count": 1,
-        "current_session_maintained": True
+        "revoked_count": revoked_count,
+        "current_session_maintained": session_id is not None
+    }
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke a specific session"""
+    
+    if not SessionService(db).revoke_session(session_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return {
+        "message": f"Session {session_id} revoked successfully",
+        "session_id": session_id
     }
 
 @router.get("/password-strength")
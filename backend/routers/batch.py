@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+
+from auth import verify_token
+from batch import BatchContext, run_batch
+from database import get_db
+from models.user import User
+from schemas.batch import BatchRequest, BatchResponse
+
+router = APIRouter()
+
+def _resolve_user(request: Request, db: Session):
+    """The caller's token and user, or (token, None) when it is missing or invalid.
+
+    Sub-requests still see the original Authorization header, so protected
+    paths answer 401 in their own slot instead of failing the whole batch.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, None
+    try:
+        token_data = verify_token(token)
+    except HTTPException:
+        return token, None
+    return token, db.query(User).filter(User.email == token_data.email).first()
+
+@router.post("/", response_model=BatchResponse)
+async def batch_requests(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Run several GET requests in one round trip and return every response.
+
+    The sub-requests go through the full app (routing, validation, caching
+    headers) but share this request's authentication and database session.
+    """
+    for sub_request in batch.requests:
+        if sub_request.path.split("?", 1)[0].rstrip("/") == "/api/batch":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch requests cannot be nested"
+            )
+
+    token, user = _resolve_user(request, db)
+    responses = await run_batch(
+        request.app, request.scope, [sub_request.dict() for sub_request in batch.requests],
+        BatchContext(db, token, user)
+    )
+    return ORJSONResponse({"responses": responses})
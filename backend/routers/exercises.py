@@ -1,26 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from database import get_db
 from models.exercise import Exercise
-from schemas.exercise import ExerciseCreate, ExerciseUpdate, ExerciseResponse, ExerciseFilter
+from schemas.exercise import ExerciseCreate, ExerciseUpdate, ExerciseResponse, ExerciseBatchResponse, ExerciseFilter
+from schemas.bulk import BulkImportResponse
 from auth import get_current_active_user
+from fieldsets import FIELDS_QUERY, parse_fields, parse_ids, sparse_response
 from services.exercise_service import ExerciseService
+from services.catalog_bulk import (
+    CatalogBulkService, CONTENT_TYPES, DEFAULT_CHUNK_SIZE, format_from_content_type, spool_request_body
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ExerciseResponse])
 async def get_exercises(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=1000),
     filters: ExerciseFilter = Depends(),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
-    """Get list of exercises with optional filtering."""
+    """Get a page of exercises with optional filtering (`fields=` returns only those fields)."""
+    selected = parse_fields(fields, ExerciseResponse)
     exercise_service = ExerciseService(db)
-    exercises = exercise_service.get_exercises(skip=skip, limit=limit, filters=filters)
-    return exercises
+    page = exercise_service.get_exercises(skip=skip, limit=limit, filters=filters, cursor=cursor, fields=selected)
+    if selected is not None:
+        sparse = sparse_response(page.items, ExerciseResponse, selected)
+        page.apply_headers(sparse)
+        return sparse
+    page.apply_headers(response)
+    return page.items
+
+@router.get("/export")
+async def export_exercises(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    include_inactive: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Stream the whole exercise catalog as NDJSON or CSV."""
+    bulk_service = CatalogBulkService(db, "exercises")
+    return StreamingResponse(
+        bulk_service.iter_export(format, include_inactive),
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="exercises.{format}"'}
+    )
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_import_exercises(
+    request: Request,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)  # Admin only in production
+):
+    """Upsert exercises from an NDJSON (application/x-ndjson) or CSV (text/csv) body."""
+    fmt = format_from_content_type(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
+        )
+    body = await spool_request_body(request)
+    try:
+        bulk_service = CatalogBulkService(db, "exercises")
+        return await run_in_threadpool(bulk_service.import_file, body, fmt, chunk_size)
+    finally:
+        body.close()
+
+# Declared before /{exercise_id} so "batch" isn't parsed as an id
+@router.get("/batch", response_model=ExerciseBatchResponse)
+async def get_exercises_batch(
+    ids: str = Query(..., description="Comma-separated exercise ids, up to 200"),
+    db: Session = Depends(get_db)
+):
+    """Get many exercises by ID in one request, keyed by id."""
+    requested = parse_ids(ids)
+    exercise_service = ExerciseService(db)
+    found = exercise_service.get_exercises_by_ids(requested)
+    return {"items": found, "missing": [i for i in requested if i not in found]}
 
 @router.get("/{exercise_id}", response_model=ExerciseResponse)
 async def get_exercise(exercise_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database import get_db
+from models.user import User
+from schemas.feedback import FeedbackBatch, FeedbackBatchResponse, FeedbackStatsResponse
+from auth import get_current_active_user
+from services.feedback_service import FeedbackService
+
+router = APIRouter()
+
+@router.post("/batch", response_model=FeedbackBatchResponse, status_code=status.HTTP_201_CREATED)
+async def record_feedback_batch(
+    batch: FeedbackBatch,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Record many feedback events (completed, skipped, too_hard, liked) in one call."""
+    feedback_service = FeedbackService(db)
+    try:
+        return feedback_service.record_batch(current_user.id, batch.events)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+@router.get("/me/stats", response_model=List[FeedbackStatsResponse])
+async def get_my_feedback_stats(
+    item_type: Optional[str] = Query(None, regex="^(exercise|recipe)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current user's per-item feedback totals."""
+    feedback_service = FeedbackService(db)
+    return feedback_service.get_user_stats(current_user.id, item_type, limit)
+
+@router.get("/items/{item_type}/{item_id}/stats", response_model=FeedbackStatsResponse)
+async def get_item_feedback_stats(
+    item_type: str,
+    item_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get feedback totals for one exercise or recipe across all users."""
+    feedback_service = FeedbackService(db)
+    stats = feedback_service.get_item_stats(item_type, item_id)
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No feedback for this item"
+        )
+    return stats
@@ -1,31 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
 
 from database import get_db
 from models.plan import Plan
 from models.user import User
-from schemas.plan import PlanCreate, PlanUpdate, PlanResponse, PlanGenerationRequest
+from schemas.plan import (
+    PlanCreate, PlanUpdate, PlanResponse, PlanGenerationRequest, PlanRegenerateRequest, JsonPatchOperation
+)
 from auth import get_current_active_user
-from services.plan_service import PlanService
+from fieldsets import FIELDS_QUERY, parse_fields
+from responses import trusted_response
+from json_patch import JsonPatchError
+from services.plan_service import PlanService, PlanVersionConflict
+from services.plan_cache import plan_cache
+from services.plan_blocks import block_cache
+from services.loaders import PlanItemLoader
 
 router = APIRouter()
 
+def _expected_version(if_match: Optional[str]) -> Optional[int]:
+    """Read the plan version from an If-Match header ("3", W/"3" or 3)."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be a plan version"
+        )
+
+EXPAND_QUERY = Query(
+    None, regex="^items$",
+    description="items: embed full exercise/recipe details as `included`, keyed by id"
+)
+
+def _included(db: Session, plans: List[Plan], expand: Optional[str]) -> Optional[List[dict]]:
+    """Per-plan `included` entries for ?expand=items, loaded in one query per item type."""
+    if expand != "items":
+        return None
+    return [{"included": included} for included in PlanItemLoader(db).included(plans)]
+
+def _version_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Plan was modified by another request; reload it and retry"
+    )
+
 @router.get("/", response_model=List[PlanResponse])
 async def get_user_plans(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = FIELDS_QUERY,
+    expand: Optional[str] = EXPAND_QUERY,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's plans."""
+    """Get a page of the user's plans, newest first (`fields=id,name,status` skips loading plan_data)."""
+    selected = parse_fields(fields, PlanResponse)
+    loaded = selected + ["plan_data"] if selected is not None and expand else selected
     plan_service = PlanService(db)
-    plans = plan_service.get_user_plans(current_user.id, skip=skip, limit=limit)
-    return plans
+    page = plan_service.get_user_plans(current_user.id, skip=skip, limit=limit, cursor=cursor, fields=loaded)
+    response = trusted_response(page.items, PlanResponse, fields=selected,
+                                extras=_included(db, page.items, expand))
+    page.apply_headers(response)
+    return response
 
 @router.get("/{plan_id}", response_model=PlanResponse)
 async def get_plan(
     plan_id: int,
+    expand: Optional[str] = EXPAND_QUERY,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -37,7 +87,8 @@ async def get_plan(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Plan not found"
         )
-    return plan
+    return trusted_response(plan, PlanResponse, headers={"ETag": f'"{plan.version}"'},
+                            extras=_included(db, [plan], expand))
 
 @router.post("/generate", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 async def generate_plan(
@@ -48,7 +99,36 @@ async def generate_plan(
     """Generate a new workout or meal plan."""
     plan_service = PlanService(db)
     plan = plan_service.generate_plan(current_user.id, plan_request)
-    return plan
+    return trusted_response(plan, PlanResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post("/{plan_id}/regenerate", response_model=PlanResponse)
+async def regenerate_plan(
+    plan_id: int,
+    regenerate_request: PlanRegenerateRequest,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Regenerate a plan's days from a date onwards using the current profile."""
+    plan_service = PlanService(db)
+    try:
+        plan = plan_service.regenerate_plan(
+            plan_id, current_user.id, regenerate_request.from_date or date.today(),
+            _expected_version(if_match)
+        )
+    except PlanVersionConflict:
+        raise _version_conflict()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found"
+        )
+    return trusted_response(plan, PlanResponse, headers={"ETag": f'"{plan.version}"'})
 
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_plan(
@@ -59,24 +139,58 @@ async def create_plan(
     """Create a custom plan."""
     plan_service = PlanService(db)
     plan = plan_service.create_plan(current_user.id, plan_data)
-    return plan
+    return trusted_response(plan, PlanResponse, status_code=status.HTTP_201_CREATED)
 
 @router.put("/{plan_id}", response_model=PlanResponse)
 async def update_plan(
     plan_id: int,
     plan_data: PlanUpdate,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Update an existing plan."""
     plan_service = PlanService(db)
-    plan = plan_service.update_plan(plan_id, current_user.id, plan_data)
+    try:
+        plan = plan_service.update_plan(plan_id, current_user.id, plan_data, _expected_version(if_match))
+    except PlanVersionConflict:
+        raise _version_conflict()
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found"
+        )
+    return trusted_response(plan, PlanResponse, headers={"ETag": f'"{plan.version}"'})
+
+@router.patch("/{plan_id}", response_model=PlanResponse)
+async def patch_plan(
+    plan_id: int,
+    operations: List[JsonPatchOperation],
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Apply an RFC 6902 JSON Patch to plan_data (send If-Match: "<version>" to guard against lost updates)."""
+    plan_service = PlanService(db)
+    try:
+        plan = plan_service.patch_plan(
+            plan_id, current_user.id,
+            [operation.dict(by_alias=True, exclude_unset=True) for operation in operations],
+            _expected_version(if_match)
+        )
+    except PlanVersionConflict:
+        raise _version_conflict()
+    except JsonPatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Plan not found"
         )
-    return plan
+    return trusted_response(plan, PlanResponse, headers={"ETag": f'"{plan.version}"'})
 
 @router.delete("/{plan_id}")
 async def delete_plan(
@@ -96,10 +210,18 @@ async def delete_plan(
 
 @router.get("/current/active", response_model=List[PlanResponse])
 async def get_active_plans(
+    expand: Optional[str] = EXPAND_QUERY,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get user's currently active plans."""
     plan_service = PlanService(db)
     plans = plan_service.get_active_user_plans(current_user.id)
-    return plans 
\ No newline at end of file
+    return trusted_response(plans, PlanResponse, extras=_included(db, plans, expand))
+
+@router.get("/cache/stats")
+async def get_plan_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get plan generation and plan block cache sizes and hit rates for this worker."""
+    return dict(plan_cache.stats(), blocks=block_cache.stats())
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models.user import User
+from schemas.recommendation import RecommendationResponse
+from auth import get_current_active_user
+from services.recommendation_service import RecommendationService
+
+router = APIRouter()
+
+@router.get("/{item_type}", response_model=RecommendationResponse)
+async def get_recommendations(
+    item_type: str = Path(..., regex="^(exercise|recipe)$"),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get precomputed "users like you also liked" exercises or recipes."""
+    recommendation_service = RecommendationService(db)
+    recommendations = recommendation_service.get_recommendations(current_user.id, item_type)
+    if not recommendations:
+        return RecommendationResponse(item_type=item_type)
+    return RecommendationResponse(
+        item_type=item_type,
+        items=recommendations.items[:limit],
+        model_version=recommendations.model_version,
+        generated_at=recommendations.generated_at
+    )
@@ -0,0 +1,33 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+@lru_cache(maxsize=1)
+def expected_revision() -> Optional[str]:
+    """Head revision of the migrations shipped with this build."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """Revision recorded in the database's alembic_version table (None if never migrated)."""
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def check_schema(engine: Engine) -> Dict[str, Any]:
+    """Compare the database revision with the code's; never creates or alters tables."""
+    current = current_revision(engine)
+    expected = expected_revision()
+    return {"current": current, "expected": expected, "up_to_date": current == expected}
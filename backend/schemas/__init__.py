@@ -1,7 +1,7 @@
 from .user import (
     UserBase, UserCreate, UserLogin, 
     UserProfileBase, UserProfileCreate, UserProfileUpdate, UserProfileResponse,
-    UserResponse, Token, TokenData
+    UserResponse, Token, TokenData, RefreshRequest
 )
 from .exercise import (
     ExerciseBase, ExerciseCreate, ExerciseUpdate, ExerciseResponse,
@@ -16,12 +16,15 @@ from .plan import (
     UserFeedbackLogBase, UserFeedbackLogCreate, UserFeedbackLogResponse,
     PlanGenerationRequest
 )
+from .bulk import BulkImportError, BulkImportResponse
+from .feedback import FeedbackEvent, FeedbackBatch, FeedbackBatchResponse, FeedbackStatsResponse
+from .recommendation import RecommendedItem, RecommendationResponse
 
 __all__ = [
     # User schemas
     "UserBase", "UserCreate", "UserLogin",
     "UserProfileBase", "UserProfileCreate", "UserProfileUpdate", "UserProfileResponse", 
-    "UserResponse", "Token", "TokenData",
+    "UserResponse", "Token", "TokenData", "RefreshRequest",
     
     # Exercise schemas
     "ExerciseBase", "ExerciseCreate", "ExerciseUpdate", "ExerciseResponse",
@@ -34,5 +37,14 @@ __all__ = [
     # Plan schemas
     "GeneratedPlanBase", "GeneratedPlanCreate", "GeneratedPlanUpdate", "GeneratedPlanResponse",
     "UserFeedbackLogBase", "UserFeedbackLogCreate", "UserFeedbackLogResponse",
-    "PlanGenerationRequest"
+    "PlanGenerationRequest",
+
+    # Bulk catalog schemas
+    "BulkImportError", "BulkImportResponse",
+
+    # Feedback schemas
+    "FeedbackEvent", "FeedbackBatch", "FeedbackBatchResponse", "FeedbackStatsResponse",
+
+    # Recommendation schemas
+    "RecommendedItem", "RecommendationResponse"
 ] 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+MAX_BATCH_REQUESTS = 20
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None  # Echoed back so clients can match responses
+    method: str = Field("GET", regex="^GET$")  # Read-only; writes keep their own requests
+    path: str = Field(..., regex="^/api/", max_length=2048)  # Path plus query string
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_items=1, max_items=MAX_BATCH_REQUESTS)
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Any
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Any, List
+
+class BulkImportError(BaseModel):
+    row: int  # NDJSON line / CSV line number
+    errors: Any  # Parse message or pydantic error list
+
+class BulkImportResponse(BaseModel):
+    processed: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[BulkImportError] = []  # Capped; `failed` has the full count
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class ExerciseBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -61,6 +61,10 @@ class ExerciseResponse(ExerciseBase):
     class Config:
         orm_mode = True
 
+class ExerciseBatchResponse(BaseModel):
+    items: Dict[int, ExerciseResponse]  # Keyed by id
+    missing: List[int] = []  # Requested ids that don't exist or are inactive
+
 class ExerciseFilter(BaseModel):
     muscle_group: Optional[str] = None
     equipment_needed: Optional[str] = None
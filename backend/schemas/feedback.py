@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+
+# Default feedback_value per feedback type when the client does not send one
+DEFAULT_FEEDBACK_VALUES = {"completed": 1, "liked": 1, "skipped": -1, "too_hard": -1}
+# Leeway for client clocks running slightly ahead of the server
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+class FeedbackEvent(BaseModel):
+    item_type: str = Field(..., regex="^(exercise|recipe)$")
+    item_id: int = Field(..., ge=1)
+    feedback_type: str = Field(..., regex="^(completed|skipped|too_hard|liked)$")
+    feedback_value: Optional[int] = Field(None, ge=-1, le=1)  # Defaults from feedback_type
+    plan_id: Optional[int] = None
+    occurred_at: Optional[datetime] = None  # Client-side timestamp; defaults to now
+
+    @validator("feedback_value", always=True)
+    def default_feedback_value(cls, value, values):
+        if value is None and "feedback_type" in values:
+            return DEFAULT_FEEDBACK_VALUES[values["feedback_type"]]
+        return value
+
+    @validator("occurred_at")
+    def occurred_at_utc(cls, value):
+        if value is None:
+            return value
+        # Naive timestamps are taken as UTC, so they compare with the server's aware ones
+        value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        if value > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+            raise ValueError("occurred_at cannot be in the future")
+        return value
+
+class FeedbackBatch(BaseModel):
+    events: List[FeedbackEvent] = Field(..., min_items=1, max_items=500)
+
+class FeedbackBatchResponse(BaseModel):
+    accepted: int
+    items_updated: int  # Distinct (item_type, item_id) aggregates touched
+
+class FeedbackStatsResponse(BaseModel):
+    item_type: str
+    item_id: int
+    event_count: int
+    value_sum: int
+    completed_count: int
+    skipped_count: int
+    too_hard_count: int
+    liked_count: int
+    last_feedback_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
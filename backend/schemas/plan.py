@@ -23,10 +23,19 @@ class PlanUpdate(BaseModel):
     start_date: Optional[date] = None
     plan_data: Optional[Dict[str, Any]] = None
 
+class JsonPatchOperation(BaseModel):
+    """One RFC 6902 operation; `value` and `from` are required by the ops that use them."""
+    op: str = Field(..., regex="^(add|remove|replace|move|copy|test)$")
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+
 class PlanResponse(PlanBase):
     id: int
     user_id: int
     status: str
+    seed: Optional[int] = None
+    version: int
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -59,6 +68,7 @@ class GeneratedPlanResponse(GeneratedPlanBase):
 
 class UserFeedbackLogBase(BaseModel):
     plan_id: Optional[int] = None
+    item_type: Optional[str] = None  # 'exercise', 'recipe'
     item_id: Optional[int] = None  # exercise_id or recipe_id
     feedback_type: Optional[str] = None  # 'completed', 'skipped', 'too_hard', 'liked'
     feedback_value: Optional[int] = None  # 1 for positive, -1 for negative
@@ -78,4 +88,8 @@ class PlanGenerationRequest(BaseModel):
     plan_type: str  # 'workout', 'meal'
     duration_weeks: int = Field(1, ge=1, le=52)
     start_date: Optional[date] = None
-    preferences: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+    seed: Optional[int] = Field(None, ge=0, le=2**31 - 1)  # Same seed + same inputs = same plan; fits plans.seed (int4)
+    preferences: Optional[Dict[str, Any]] = None
+
+class PlanRegenerateRequest(BaseModel):
+    from_date: Optional[date] = None  # Defaults to (and is clamped to) today; earlier days are kept 
\ No newline at end of file
@@ -79,6 +79,10 @@ class RecipeResponse(RecipeBase):
     class Config:
         orm_mode = True
 
+class RecipeBatchResponse(BaseModel):
+    items: Dict[int, RecipeResponse]  # Keyed by id
+    missing: List[int] = []  # Requested ids that don't exist or are inactive
+
 class RecipeFilter(BaseModel):
     meal_type: Optional[str] = None
     cuisine_type: Optional[str] = None
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class RecommendedItem(BaseModel):
+    item_id: int
+    score: float
+
+class RecommendationResponse(BaseModel):
+    item_type: str  # 'exercise', 'recipe'
+    items: List[RecommendedItem] = []  # Best first; empty until the job has covered the user
+    model_version: Optional[int] = None
+    generated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
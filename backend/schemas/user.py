@@ -54,6 +54,13 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+    refresh_token: Optional[str] = None  # Single use; each refresh returns the next one
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
-    email: Optional[str] = None 
\ No newline at end of file
+    email: Optional[str] = None
+    session_id: Optional[str] = None  # `sid` claim
+    token_id: Optional[str] = None  # `jti` claim 
\ No newline at end of file
@@ -2,18 +2,16 @@
 """
 Data seeder for the Smart Fitness & Nutrition Coach application.
 Run this script to populate the database with sample exercises and recipes.
+The schema must already exist: run `alembic upgrade head` first.
 """
 
 import json
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine
-from models import Exercise, Recipe, Base
+from database import SessionLocal
+from models import Exercise, Recipe
 from models.exercise import MuscleGroupEnum, EquipmentEnum, DifficultyEnum, ExerciseTypeEnum
 from models.recipe import MealTypeEnum, CuisineEnum, DifficultyEnum as RecipeDifficultyEnum
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 def get_db():
     db = SessionLocal()
     try:
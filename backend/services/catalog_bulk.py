@@ -0,0 +1,293 @@
+import csv
+import io
+import json
+import tempfile
+from typing import IO, Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, get_origin
+
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.exercise import Exercise
+from models.recipe import DIETARY_FLAG_BITS, Recipe, compute_dietary_flags
+from pagination import count_cache
+from schemas.exercise import ExerciseCreate, ExerciseResponse
+from schemas.recipe import RecipeCreate, RecipeResponse
+from services.catalog_version import bump_catalog_version
+from services.recipe_index import invalidate_recipe_index
+
+# catalog name -> (model, row schema, export schema)
+CATALOGS = {
+    "exercises": (Exercise, ExerciseCreate, ExerciseResponse),
+    "recipes": (Recipe, RecipeCreate, RecipeResponse),
+}
+
+# catalog name -> catalog_versions row
+CATALOG_VERSION_NAMES = {"exercises": "exercise", "recipes": "recipe"}
+
+FORMATS = ("ndjson", "csv")
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+EXPORT_BATCH_SIZE = 1000
+# Uploads larger than this are spooled to disk instead of memory
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type onto an import format."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    return None
+
+
+async def spool_request_body(request: Request) -> IO[bytes]:
+    """Copy a streamed request body into a temporary file without buffering it all in memory."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+def json_columns(schema) -> FrozenSet[str]:
+    """Fields holding lists or objects (tags, ingredients, ...), which CSV carries as JSON text."""
+    return frozenset(name for name, field in schema.__fields__.items() if get_origin(field.outer_type_) in (list, dict))
+
+
+def parse_records(
+    lines: Iterable[str], fmt: str, json_fields: FrozenSet[str] = frozenset()
+) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, parse error) for every non-blank NDJSON line or CSV row.
+
+    Only the CSV columns in `json_fields` are JSON-decoded; every other cell
+    stays text, even when it starts with "[" or "{".
+    """
+    if fmt == "ndjson":
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, record, None
+    elif fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Header is line 1; empty cells mean "not provided"
+            row_no = reader.line_num
+            try:
+                yield row_no, {
+                    k: json.loads(v) if k in json_fields else v
+                    for k, v in record.items() if k and v not in (None, "")
+                }, None
+            except ValueError as e:
+                yield row_no, None, f"Invalid JSON cell: {e}"
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+
+class CatalogBulkService:
+    """Chunked bulk upsert and streaming export for the exercise and recipe catalogs."""
+
+    def __init__(self, db: Session, catalog: str):
+        if catalog not in CATALOGS:
+            raise ValueError(f"Unknown catalog '{catalog}'")
+        self.db = db
+        self.catalog = catalog
+        self.model, self.schema, self.response_schema = CATALOGS[catalog]
+
+    def import_file(self, binary_file: IO[bytes], fmt: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """Import an NDJSON/CSV file object (utf-8, optional BOM)."""
+        lines = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+        try:
+            return self.import_records(parse_records(lines, fmt, json_columns(self.schema)), chunk_size)
+        finally:
+            lines.detach()
+
+    def import_records(
+        self,
+        records: Iterable[Tuple[int, Optional[dict], Optional[str]]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """Validate and upsert records chunk by chunk, one transaction per chunk.
+
+        Rows match existing items by `id` when given, otherwise by exact name.
+        Invalid rows are reported and skipped; a chunk that fails in the database
+        is rolled back as a whole and its rows are reported as failed.
+        """
+        report = {"processed": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+        self._explicit_ids = False
+        chunk: List[Tuple[int, dict, dict]] = []
+
+        for row_no, record, error in records:
+            report["processed"] += 1
+            if error:
+                self._record_error(report, row_no, error)
+                continue
+            try:
+                item = self.schema(**record)
+            except ValidationError as e:
+                self._record_error(report, row_no, e.errors())
+                continue
+            # Full row for inserts; only the given columns for updates
+            values, given = item.dict(), item.dict(exclude_unset=True)
+            if record.get("id") is not None:
+                try:
+                    values["id"] = given["id"] = int(record["id"])
+                except (TypeError, ValueError):
+                    self._record_error(report, row_no, "id must be an integer")
+                    continue
+            chunk.append((row_no, values, given))
+            if len(chunk) >= chunk_size:
+                self._flush(chunk, report)
+                chunk = []
+
+        if chunk:
+            self._flush(chunk, report)
+
+        if self._explicit_ids:
+            self._sync_id_sequence()
+        if report["inserted"] or report["updated"]:
+            count_cache.invalidate(self.model.__tablename__)
+            if self.model is Recipe:
+                invalidate_recipe_index()
+        return report
+
+    def _flush(self, chunk: List[Tuple[int, dict, dict]], report: Dict[str, Any]) -> None:
+        try:
+            inserts, updates = self._split_upserts(chunk)
+            if inserts:
+                self.db.bulk_insert_mappings(self.model, inserts)
+            if updates:
+                self.db.bulk_update_mappings(self.model, updates)
+            if inserts or updates:
+                bump_catalog_version(self.db, CATALOG_VERSION_NAMES[self.catalog])
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            message = f"Chunk rolled back: {e.__class__.__name__}: {getattr(e, 'orig', e)}"
+            for row_no, _, _ in chunk:
+                self._record_error(report, row_no, message)
+            return
+        report["inserted"] += len(inserts)
+        self._explicit_ids |= any("id" in values for values in inserts)
+        report["updated"] += len(updates)
+
+    def _split_upserts(self, chunk: List[Tuple[int, dict, dict]]) -> Tuple[List[dict], List[dict]]:
+        """Resolve each row to an existing id (by id, then name) with two lookups per chunk.
+
+        Inserts get the schema defaults and is_active; updates only touch the
+        columns the row actually provided.
+        """
+        model = self.model
+        ids = {values["id"] for _, values, _ in chunk if "id" in values}
+        names = {values["name"] for _, values, _ in chunk if "id" not in values}
+
+        existing_ids = set()
+        if ids:
+            existing_ids = set(self.db.execute(select(model.id).where(model.id.in_(ids))).scalars())
+        ids_by_name = {}
+        if names:
+            for item_id, name in self.db.execute(
+                select(model.id, model.name).where(model.name.in_(names)).order_by(model.id)
+            ):
+                ids_by_name.setdefault(name, item_id)
+
+        # Later rows for the same item win, as they would with one-by-one updates
+        inserts_by_key: Dict[Any, dict] = {}
+        updates_by_id: Dict[int, dict] = {}
+        for _, values, given in chunk:
+            item_id = values.get("id")
+            if item_id is None:
+                item_id = ids_by_name.get(values["name"])
+            if item_id is not None and (item_id in existing_ids or "id" not in values):
+                updates_by_id[item_id] = {**updates_by_id.get(item_id, {}), **given, "id": item_id}
+            else:
+                inserts_by_key[values.get("id") or ("name", values["name"])] = self._prepare_insert(values)
+        updates = list(updates_by_id.values())
+        if self.model is Recipe:
+            self._set_update_flags(updates)
+        return list(inserts_by_key.values()), updates
+
+    def _prepare_insert(self, values: dict) -> dict:
+        values = dict(values, is_active=True)
+        if self.model is Recipe:
+            # Bulk mappings skip ORM events, so the packed flags are set here
+            values["dietary_flags"] = compute_dietary_flags(values)
+        return values
+
+    def _set_update_flags(self, updates: List[dict]) -> None:
+        """Repack dietary_flags for updates that change some of the boolean columns, merged with the stored ones."""
+        flag_updates = {values["id"]: values for values in updates if DIETARY_FLAG_BITS.keys() & values.keys()}
+        if not flag_updates:
+            return
+        columns = [getattr(Recipe, name) for name in DIETARY_FLAG_BITS]
+        for item_id, *stored in self.db.execute(
+            select(Recipe.id, *columns).where(Recipe.id.in_(flag_updates))
+        ):
+            values = flag_updates[item_id]
+            values["dietary_flags"] = compute_dietary_flags({**dict(zip(DIETARY_FLAG_BITS, stored)), **values})
+
+    def _sync_id_sequence(self) -> None:
+        # Rows inserted with explicit ids (e.g. re-importing an export) do not advance the serial
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        table = self.model.__tablename__
+        self.db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+        self.db.commit()
+
+    @staticmethod
+    def _record_error(report: Dict[str, Any], row_no: int, error: Any) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row_no, "errors": error})
+
+    def iter_export(self, fmt: str, include_inactive: bool = False) -> Iterator[str]:
+        """Stream the catalog as NDJSON lines or CSV rows, reading it in id order batches."""
+        fields = list(self.response_schema.__fields__)
+        if fmt == "csv":
+            yield self._csv_line(fields)
+        for item in self._iter_items(include_inactive):
+            data = self.response_schema.from_orm(item).dict()
+            if fmt == "ndjson":
+                yield json.dumps(data, default=str) + "\n"
+            else:
+                yield self._csv_line([
+                    json.dumps(data[f]) if isinstance(data[f], (list, dict)) else data[f]
+                    for f in fields
+                ])
+
+    def _iter_items(self, include_inactive: bool) -> Iterator[Any]:
+        model = self.model
+        last_id = 0
+        while True:
+            query = self.db.query(model).filter(model.id > last_id)
+            if not include_inactive:
+                query = query.filter(model.is_active == True)
+            batch = query.order_by(model.id).limit(EXPORT_BATCH_SIZE).all()
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1].id
+            # Keep memory flat on large catalogs
+            self.db.expunge_all()
+
+    @staticmethod
+    def _csv_line(values: List[Any]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(["" if v is None else v for v in values])
+        return buffer.getvalue()
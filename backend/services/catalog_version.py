@@ -0,0 +1,25 @@
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from models.catalog import CatalogVersion
+
+CATALOGS = ("exercise", "recipe")
+
+
+def bump_catalog_version(db: Session, catalog: str) -> None:
+    """Increment a catalog's version inside the caller's transaction (commit is up to the caller)."""
+    table = CatalogVersion.__table__
+    stmt = upsert_insert(db)(table).values(name=catalog, version=1)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"version": table.c.version + 1}
+    ))
+
+
+def get_catalog_versions(db: Session) -> Dict[str, int]:
+    """Current version of every catalog (0 for catalogs never written through the API)."""
+    versions = dict.fromkeys(CATALOGS, 0)
+    versions.update(db.execute(select(CatalogVersion.name, CatalogVersion.version)).all())
+    return versions
@@ -1,18 +1,22 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from typing import List, Optional
+from typing import Dict, List, Optional
 import json
 from datetime import datetime, timedelta
 
 from models.exercise import Exercise
+from services.catalog_version import bump_catalog_version
+from fieldsets import project
+from services.loaders import BatchLoader
+from pagination import KeysetPage, paginate_keyset, cached_total, count_cache, filter_signature
 from schemas.exercise import ExerciseCreate, ExerciseUpdate, ExerciseFilter
 
 class ExerciseService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_exercises(self, skip: int = 0, limit: int = 100, filters: ExerciseFilter = None) -> List[Exercise]:
-        """Get list of exercises with optional filtering."""
+    def _filtered_query(self, filters: ExerciseFilter = None):
+        """Build the exercise query for the given filters."""
         query = self.db.query(Exercise)
         
         if filters:
@@ -29,12 +33,24 @@ class ExerciseService:
             if filters.is_active is not None:
                 query = query.filter(Exercise.is_active == filters.is_active)
         
-        return query.offset(skip).limit(limit).all()
+        return query
+    
+    def get_exercises(self, skip: int = 0, limit: int = 100, filters: ExerciseFilter = None,
+                      cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> KeysetPage:
+        """Get a page of exercises ordered by (name, id) with optional filtering."""
+        query = project(self._filtered_query(filters), Exercise, fields, Exercise.name, Exercise.id)
+        total = cached_total(query, Exercise.__tablename__, filter_signature(filters))
+        items, next_cursor = paginate_keyset(query, Exercise.name, Exercise.id, limit, cursor, offset=skip)
+        return KeysetPage(items, next_cursor, total, limit)
     
     def get_exercise(self, exercise_id: int) -> Optional[Exercise]:
         """Get exercise by ID."""
         return self.db.query(Exercise).filter(Exercise.id == exercise_id, Exercise.is_active == True).first()
     
+    def get_exercises_by_ids(self, exercise_ids: List[int]) -> Dict[int, Exercise]:
+        """Get active exercises by ID in one IN query, keyed by id."""
+        return BatchLoader(self.db, Exercise).load_many(exercise_ids)
+    
     def create_exercise(self, exercise_data: ExerciseCreate) -> Exercise:
         """Create a new exercise."""
         # Convert lists to JSON strings
@@ -46,8 +62,10 @@ class ExerciseService:
         
         exercise = Exercise(**exercise_dict)
         self.db.add(exercise)
+        bump_catalog_version(self.db, "exercise")
         self.db.commit()
         self.db.refresh(exercise)
+        count_cache.invalidate(Exercise.__tablename__)
         return exercise
     
     def update_exercise(self, exercise_id: int, exercise_data: ExerciseUpdate) -> Optional[Exercise]:
@@ -67,8 +85,10 @@ class ExerciseService:
         for field, value in update_data.items():
             setattr(exercise, field, value)
         
+        bump_catalog_version(self.db, "exercise")
         self.db.commit()
         self.db.refresh(exercise)
+        count_cache.invalidate(Exercise.__tablename__)
         return exercise
     
     def delete_exercise(self, exercise_id: int) -> bool:
@@ -78,7 +98,9 @@ class ExerciseService:
             return False
         
         exercise.is_active = False
+        bump_catalog_version(self.db, "exercise")
         self.db.commit()
+        count_cache.invalidate(Exercise.__tablename__)
         return True
     
     def search_exercises(self, query: str, limit: int = 50) -> List[Exercise]:
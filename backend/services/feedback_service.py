@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from models.exercise import Exercise
+from models.feedback import FEEDBACK_COUNTERS, ItemFeedbackStats, UserItemFeedbackStats
+from models.plan import Plan, UserFeedbackLog
+from models.recipe import Recipe
+from schemas.feedback import FeedbackEvent
+from services.preference_model import PreferenceStore
+
+ITEM_MODELS = {"exercise": Exercise, "recipe": Recipe}
+
+
+class FeedbackService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_batch(self, user_id: int, events: List[FeedbackEvent]) -> Dict[str, int]:
+        """Store a batch of events with one multi-row insert and fold them into the aggregates.
+
+        The raw log insert, both counter upserts and the user's preference
+        model update share one transaction.
+        """
+        self._check_references(user_id, events)
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": user_id,
+                "plan_id": event.plan_id,
+                "item_type": event.item_type,
+                "item_id": event.item_id,
+                "feedback_type": event.feedback_type,
+                "feedback_value": event.feedback_value,
+                "created_at": event.occurred_at or now,
+            }
+            for event in events
+        ]
+        self.db.execute(insert(UserFeedbackLog.__table__).values(rows))
+
+        user_deltas = self._deltas(rows, ("user_id", "item_type", "item_id"))
+        for delta in user_deltas:
+            delta["updated_at"] = now  # Server-side change marker for the recommendation refresh
+        item_deltas = self._deltas(rows, ("item_type", "item_id"))
+        self._increment(UserItemFeedbackStats, ["user_id", "item_type", "item_id"], user_deltas)
+        self._increment(ItemFeedbackStats, ["item_type", "item_id"], item_deltas)
+        PreferenceStore(self.db).apply_feedback(user_id, rows)
+        self.db.commit()
+
+        return {"accepted": len(rows), "items_updated": len(item_deltas)}
+
+    def _check_references(self, user_id: int, events: List[FeedbackEvent]) -> None:
+        """Reject the batch if it names unknown items or plans the user does not own."""
+        for item_type, model in ITEM_MODELS.items():
+            wanted = {e.item_id for e in events if e.item_type == item_type}
+            if not wanted:
+                continue
+            found = set(self.db.execute(select(model.id).where(model.id.in_(wanted))).scalars())
+            missing = sorted(wanted - found)
+            if missing:
+                raise ValueError(f"Unknown {item_type} ids: {missing}")
+
+        plan_ids = {e.plan_id for e in events if e.plan_id is not None}
+        if plan_ids:
+            found = set(self.db.execute(
+                select(Plan.id).where(Plan.id.in_(plan_ids), Plan.user_id == user_id)
+            ).scalars())
+            missing = sorted(plan_ids - found)
+            if missing:
+                raise ValueError(f"Unknown plan ids: {missing}")
+
+    @staticmethod
+    def _deltas(rows: List[Dict[str, Any]], key_columns: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Collapse events into one counter delta per aggregate key."""
+        deltas: Dict[tuple, Dict[str, Any]] = defaultdict(
+            lambda: dict({c: 0 for c in FEEDBACK_COUNTERS}, event_count=0, value_sum=0, last_feedback_at=None)
+        )
+        for row in rows:
+            delta = deltas[tuple(row[c] for c in key_columns)]
+            delta["event_count"] += 1
+            delta["value_sum"] += row["feedback_value"] or 0
+            delta[f"{row['feedback_type']}_count"] += 1
+            if delta["last_feedback_at"] is None or row["created_at"] > delta["last_feedback_at"]:
+                delta["last_feedback_at"] = row["created_at"]
+        # Sorted keys give concurrent batches the same lock order
+        return [dict(zip(key_columns, key), **delta) for key, delta in sorted(deltas.items())]
+
+    def _increment(self, model, key_columns: List[str], deltas: List[Dict[str, Any]]) -> None:
+        """INSERT ... ON CONFLICT DO UPDATE SET counter = counter + excluded.counter."""
+        table = model.__table__
+        stmt = upsert_insert(self.db)(table).values(deltas)
+        excluded = stmt.excluded
+        latest = func.greatest if self.db.get_bind().dialect.name == "postgresql" else func.max
+        updates = {
+            column: table.c[column] + excluded[column]
+            for column in ["event_count", "value_sum"] + FEEDBACK_COUNTERS
+        }
+        updates["last_feedback_at"] = latest(
+            func.coalesce(table.c.last_feedback_at, excluded.last_feedback_at), excluded.last_feedback_at
+        )
+        if "updated_at" in table.c:
+            updates["updated_at"] = excluded.updated_at
+        self.db.execute(stmt.on_conflict_do_update(index_elements=key_columns, set_=updates))
+
+    def rebuild_aggregates(self) -> None:
+        """Recompute both aggregate tables from the raw log (backfills and repairs only)."""
+        log = UserFeedbackLog.__table__
+        counters = [
+            func.sum(case((log.c.feedback_type == column[:-len("_count")], 1), else_=0)).label(column)
+            for column in FEEDBACK_COUNTERS
+        ]
+        aggregates = [
+            func.count().label("event_count"),
+            func.coalesce(func.sum(log.c.feedback_value), 0).label("value_sum"),
+            *counters,
+            func.max(log.c.created_at).label("last_feedback_at"),
+        ]
+        value_columns = ["event_count", "value_sum"] + FEEDBACK_COUNTERS + ["last_feedback_at"]
+
+        for model, keys in (
+            (UserItemFeedbackStats, [log.c.user_id, log.c.item_type, log.c.item_id]),
+            (ItemFeedbackStats, [log.c.item_type, log.c.item_id]),
+        ):
+            source = (
+                select(*keys, *aggregates)
+                .where(log.c.item_type.isnot(None), log.c.item_id.isnot(None), log.c.user_id.isnot(None))
+                .group_by(*keys)
+            )
+            self.db.execute(delete(model.__table__))
+            self.db.execute(insert(model.__table__).from_select([k.name for k in keys] + value_columns, source))
+        self.db.commit()
+
+    def get_user_stats(
+        self, user_id: int, item_type: Optional[str] = None, limit: int = 100
+    ) -> List[UserItemFeedbackStats]:
+        """Get a user's per-item aggregates, most recently rated first."""
+        query = self.db.query(UserItemFeedbackStats).filter(UserItemFeedbackStats.user_id == user_id)
+        if item_type:
+            query = query.filter(UserItemFeedbackStats.item_type == item_type)
+        return query.order_by(UserItemFeedbackStats.last_feedback_at.desc()).limit(limit).all()
+
+    def get_item_stats(self, item_type: str, item_id: int) -> Optional[ItemFeedbackStats]:
+        """Get the all-users aggregate for one item."""
+        return self.db.get(ItemFeedbackStats, (item_type, item_id))
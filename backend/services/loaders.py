@@ -0,0 +1,92 @@
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy.orm import Session
+
+from models.exercise import Exercise
+from models.recipe import Recipe
+from schemas.exercise import ExerciseResponse
+from schemas.recipe import RecipeResponse
+
+# Ids per IN (...) list, well under SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+
+class BatchLoader:
+    """Request-scoped dataloader: queue ids from anywhere, then fetch them in one IN query.
+
+    Loaded rows (and ids that turned out not to exist) are remembered, so
+    repeated lookups within the request cost nothing.
+    """
+
+    def __init__(self, db: Session, model):
+        self.db = db
+        self.model = model
+        self._cache: Dict[int, Any] = {}
+        self._queued: Set[int] = set()
+
+    def queue(self, ids: Iterable[int]) -> None:
+        self._queued.update(int(i) for i in ids)
+
+    def load_many(self, ids: Iterable[int]) -> Dict[int, Any]:
+        """Active rows for `ids` (plus anything queued before), keyed by id; unknown ids are left out."""
+        ids = [int(i) for i in ids]
+        self.queue(ids)
+        self._flush()
+        return {i: self._cache[i] for i in ids if self._cache.get(i) is not None}
+
+    def _flush(self) -> None:
+        pending = sorted(self._queued - self._cache.keys())
+        self._queued.clear()
+        for start in range(0, len(pending), IN_CHUNK_SIZE):
+            chunk = pending[start:start + IN_CHUNK_SIZE]
+            for row in self.db.query(self.model).filter(
+                self.model.id.in_(chunk), self.model.is_active == True
+            ):
+                self._cache[row.id] = row
+            for missing in set(chunk) - self._cache.keys():
+                self._cache[missing] = None
+
+
+def plan_item_ids(plan_data: Any) -> Dict[str, Set[int]]:
+    """Exercise and recipe ids referenced by a generated plan body."""
+    found = {"exercises": set(), "recipes": set()}
+    if not isinstance(plan_data, dict):
+        return found
+    for days in (plan_data.get("weekly_plan") or {}).values():
+        for day in (days or {}).values():
+            for exercise in (day or {}).get("exercises") or []:
+                if isinstance(exercise, dict) and isinstance(exercise.get("id"), int):
+                    found["exercises"].add(exercise["id"])
+    for day in (plan_data.get("daily_plans") or {}).values():
+        for meal in ((day or {}).get("meals") or {}).values():
+            if isinstance(meal, dict) and isinstance(meal.get("id"), int):
+                found["recipes"].add(meal["id"])
+    return found
+
+
+class PlanItemLoader:
+    """Full exercise/recipe details for any number of plans, one query per item type."""
+
+    def __init__(self, db: Session):
+        self.loaders = {"exercises": BatchLoader(db, Exercise), "recipes": BatchLoader(db, Recipe)}
+        self.schemas = {"exercises": ExerciseResponse, "recipes": RecipeResponse}
+
+    def included(self, plans: List[Any]) -> List[Dict[str, Dict[int, Dict[str, Any]]]]:
+        """Per plan, {"exercises": {id: item}, "recipes": {id: item}} for the items it references."""
+        referenced = [plan_item_ids(plan.plan_data) for plan in plans]
+        for ids in referenced:  # Queue everything first so each type is one query for the whole page
+            for kind, loader in self.loaders.items():
+                loader.queue(ids[kind])
+        serialized = {kind: {} for kind in self.loaders}
+        result = []
+        for ids in referenced:
+            included = {}
+            for kind, loader in self.loaders.items():
+                items = {}
+                for item_id, row in loader.load_many(ids[kind]).items():
+                    if item_id not in serialized[kind]:
+                        serialized[kind][item_id] = self.schemas[kind].from_orm(row).dict()
+                    items[item_id] = serialized[kind][item_id]
+                included[kind] = items
+            result.append(included)
+        return result
@@ -0,0 +1,267 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config import settings
+from database import upsert_insert
+from models.plan import Plan, PlanBlock, PlanTemplate
+from services.plan_cache import PlanCache
+
+BLOCK_REF = "$block"
+# Per-plan fields kept next to the reference instead of inside the shared block
+LOCAL_KEYS = ("date",)
+COMPACTION_BATCH_SIZE = 500
+BLOCK_INSERT_CHUNK_SIZE = 1000
+# Blocks touched this recently survive garbage collection even when unreferenced,
+# covering writers whose plan rows weren't committed when the scan ran
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+block_cache = PlanCache(settings.plan_block_cache_max_entries)
+
+
+def block_hash(body: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (hash, canonical JSON) for a block body."""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32], canonical
+
+
+def _day_slots(plan_data: Any) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield (container, key) for every day in a generated plan body."""
+    if not isinstance(plan_data, dict):
+        return
+    daily_plans = plan_data.get("daily_plans")
+    if isinstance(daily_plans, dict):
+        for key in daily_plans:
+            yield daily_plans, key
+    weekly_plan = plan_data.get("weekly_plan")
+    if isinstance(weekly_plan, dict):
+        for days in weekly_plan.values():
+            if isinstance(days, dict):
+                for key in days:
+                    yield days, key
+
+
+def _copy_containers(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the plan down to the day containers so days can be swapped without touching the input."""
+    copied = dict(plan_data)
+    if isinstance(copied.get("daily_plans"), dict):
+        copied["daily_plans"] = dict(copied["daily_plans"])
+    if isinstance(copied.get("weekly_plan"), dict):
+        copied["weekly_plan"] = {
+            week: dict(days) if isinstance(days, dict) else days
+            for week, days in copied["weekly_plan"].items()
+        }
+    return copied
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and BLOCK_REF in value
+
+
+def dehydrate(plan_data: Any) -> Tuple[Any, Dict[str, Tuple[Dict[str, Any], str]]]:
+    """Swap every day for a block reference.
+
+    Returns the compact plan and {hash: (body, canonical JSON)} for the blocks it
+    references. Days that are already references are left as they are.
+    """
+    if not isinstance(plan_data, dict):
+        return plan_data, {}
+    compact = _copy_containers(plan_data)
+    blocks = {}
+    for container, key in _day_slots(compact):
+        day = container[key]
+        if not isinstance(day, dict) or is_reference(day):
+            continue
+        body = {k: v for k, v in day.items() if k not in LOCAL_KEYS}
+        digest, canonical = block_hash(body)
+        blocks[digest] = (body, canonical)
+        container[key] = dict({BLOCK_REF: digest}, **{k: day[k] for k in LOCAL_KEYS if k in day})
+    return compact, blocks
+
+
+def hydrate(session: Session, plan_data: Any) -> Any:
+    """Reassemble a compact plan from the block cache, fetching misses in one query.
+
+    Days in the result share their nested values with the cache, so callers must
+    copy before mutating (json_patch.apply_patch does).
+    """
+    slots = [(container, key) for container, key in _day_slots(plan_data) if is_reference(container[key])]
+    if not slots:
+        return plan_data
+
+    wanted = {container[key][BLOCK_REF] for container, key in slots}
+    bodies = {}
+    for digest in wanted:
+        body = block_cache.get(digest)
+        if body is not None:
+            bodies[digest] = body
+    missing = wanted - bodies.keys()
+    if missing:
+        for digest, body in session.execute(
+            select(PlanBlock.hash, PlanBlock.body).where(PlanBlock.hash.in_(missing))
+        ):
+            block_cache.put(digest, body)
+            bodies[digest] = body
+
+    full = _copy_containers(plan_data)
+    for container, key in _day_slots(full):
+        ref = container[key]
+        if is_reference(ref) and ref[BLOCK_REF] in bodies:
+            container[key] = dict(bodies[ref[BLOCK_REF]], **{k: v for k, v in ref.items() if k != BLOCK_REF})
+    return full
+
+
+def store_blocks(connection, blocks: Dict[str, Tuple[Dict[str, Any], str]]) -> None:
+    """Insert new blocks and mark existing ones as still in use."""
+    if not blocks:
+        return
+    insert = upsert_insert(connection)
+    rows = [
+        {"hash": digest, "body": body, "size": len(canonical)}
+        for digest, (body, canonical) in sorted(blocks.items())
+    ]
+    for start in range(0, len(rows), BLOCK_INSERT_CHUNK_SIZE):
+        stmt = insert(PlanBlock.__table__).values(rows[start:start + BLOCK_INSERT_CHUNK_SIZE])
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=["hash"], set_={"last_used_at": func.now()}
+        ))
+    for digest, (body, _) in blocks.items():
+        block_cache.put(digest, body)
+
+
+# Plans are stored compact and loaded whole; the rest of the code only ever sees full plan_data.
+
+def _hydrate_loaded(target: Plan, context, attrs: Optional[List[str]] = None) -> None:
+    if "plan_data" not in target.__dict__ or (attrs is not None and "plan_data" not in attrs):
+        return
+    full = hydrate(context.session, target.__dict__["plan_data"])
+    if full is not target.__dict__["plan_data"]:
+        set_committed_value(target, "plan_data", full)
+
+
+@event.listens_for(Plan, "load")
+def _on_load(target, context):
+    _hydrate_loaded(target, context)
+
+
+@event.listens_for(Plan, "refresh")
+def _on_refresh(target, context, attrs):
+    _hydrate_loaded(target, context, attrs)
+
+
+@event.listens_for(Plan, "before_insert")
+@event.listens_for(Plan, "before_update")
+def _compact_before_write(mapper, connection, target):
+    if not inspect(target).attrs.plan_data.history.has_changes():
+        return
+    full = target.plan_data
+    compact, blocks = dehydrate(full)
+    if not blocks:
+        return
+    store_blocks(connection, blocks)
+    target.plan_data = compact
+    target.__dict__["_full_plan_data"] = full
+
+
+@event.listens_for(Plan, "after_insert")
+@event.listens_for(Plan, "after_update")
+def _restore_after_write(mapper, connection, target):
+    full = target.__dict__.pop("_full_plan_data", None)
+    if full is not None:
+        set_committed_value(target, "plan_data", full)
+
+
+class PlanBlockCompactor:
+    """Converts stored plans to block references and drops blocks nothing references."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compact(self, batch_size: int = COMPACTION_BATCH_SIZE) -> Dict[str, int]:
+        """Rewrite every plan that still stores full days. Returns before/after byte counts.
+
+        block_bytes counts each distinct block the compacted plans reference
+        once, leaving out blocks only other plans or templates use. Only
+        plan_data changes; the version check skips plans edited mid-run
+        (their edit already stored them compact) without bumping the version.
+        """
+        plans = Plan.__table__
+        report = {"scanned": 0, "compacted": 0, "bytes_before": 0, "bytes_after": 0}
+        block_sizes: Dict[str, int] = {}
+        last_id = 0
+        while True:
+            rows = self.db.execute(
+                select(plans.c.id, plans.c.version, plans.c.plan_data)
+                .where(plans.c.id > last_id).order_by(plans.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            report["scanned"] += len(rows)
+            batch_blocks, updates = {}, []
+            for row in rows:
+                compact, blocks = dehydrate(row.plan_data)
+                if not blocks:
+                    continue
+                report["bytes_before"] += len(json.dumps(row.plan_data, separators=(",", ":"), default=str))
+                report["bytes_after"] += len(json.dumps(compact, separators=(",", ":"), default=str))
+                batch_blocks.update(blocks)
+                updates.append((row, compact, blocks))
+            store_blocks(self.db.connection(), batch_blocks)
+            for row, compact, blocks in updates:
+                compacted = self.db.execute(
+                    update(plans).where(plans.c.id == row.id, plans.c.version == row.version)
+                    .values(plan_data=compact)
+                ).rowcount
+                report["compacted"] += compacted
+                if compacted:
+                    block_sizes.update((digest, len(canonical)) for digest, (_, canonical) in blocks.items())
+            self.db.commit()
+        report["block_bytes"] = sum(block_sizes.values())
+        return report
+
+    def _referenced(self) -> Set[str]:
+        """Every block referenced by a plan or a plan template."""
+        referenced = set()
+        for table, key_column in ((Plan.__table__, "id"), (PlanTemplate.__table__, "key")):
+            key = table.c[key_column]
+            last_key = None
+            while True:
+                query = select(key, table.c.plan_data).order_by(key).limit(COMPACTION_BATCH_SIZE)
+                if last_key is not None:
+                    query = query.where(key > last_key)
+                rows = self.db.execute(query).all()
+                if not rows:
+                    break
+                last_key = rows[-1][0]
+                for row in rows:
+                    referenced.update(
+                        container[slot][BLOCK_REF] for container, slot in _day_slots(row.plan_data)
+                        if is_reference(container[slot])
+                    )
+        return referenced
+
+    def collect_garbage(self) -> int:
+        """Delete blocks no plan references that haven't been written within the grace period."""
+        cutoff = self.db.execute(select(func.now())).scalar() - GC_GRACE_PERIOD
+        self.db.commit()
+        referenced = self._referenced()
+        candidates = [
+            digest for digest in self.db.execute(
+                select(PlanBlock.hash).where(PlanBlock.last_used_at < cutoff)
+            ).scalars()
+            if digest not in referenced
+        ]
+        for start in range(0, len(candidates), COMPACTION_BATCH_SIZE):
+            self.db.execute(delete(PlanBlock.__table__).where(
+                PlanBlock.hash.in_(candidates[start:start + COMPACTION_BATCH_SIZE]),
+                PlanBlock.last_used_at < cutoff
+            ))
+        self.db.commit()
+        block_cache.clear()
+        return len(candidates)
@@ -1,15 +1,38 @@
+from sqlalchemy import JSON, Text, bindparam, cast, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import json
+import logging
 import random
 
+import numpy as np
+
 from models.plan import Plan, PlanTypeEnum, PlanStatusEnum
 from models.user import User, GoalEnum
 from schemas.plan import PlanCreate, PlanUpdate, PlanGenerationRequest
 from services.exercise_service import ExerciseService
 from services.recipe_service import RecipeService
 from services.user_service import UserService
+from services.preference_model import PreferenceModel, PreferenceStore, weighted_sample
+from services.catalog_version import get_catalog_versions
+from services.plan_cache import plan_cache, plan_cache_key
+from services import plan_blocks  # noqa: F401 - stores plan days as deduplicated blocks
+from services.plan_templates import PlanTemplateStore, plan_template_key
+from config import settings
+from fieldsets import project
+from json_patch import apply_patch, parse_pointer, simple_replacements
+from pagination import KeysetPage, paginate_keyset, cached_total, count_cache
+
+logger = logging.getLogger(__name__)
+
+# Meal templates are generated per calorie band; users get their exact target on top
+TEMPLATE_CALORIE_STEP = 100
+
+class PlanVersionConflict(Exception):
+    """The plan changed since the version the client last read."""
 
 class PlanService:
     def __init__(self, db: Session):
@@ -17,13 +40,20 @@ class PlanService:
         self.exercise_service = ExerciseService(db)
         self.recipe_service = RecipeService(db)
         self.user_service = UserService(db)
+        self.preference_store = PreferenceStore(db)
     
-    def get_user_plans(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Plan]:
-        """Get user's plans."""
-        return self.db.query(Plan).filter(
+    def get_user_plans(self, user_id: int, skip: int = 0, limit: int = 100,
+                       cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> KeysetPage:
+        """Get a page of the user's plans, newest first."""
+        query = project(self.db.query(Plan), Plan, fields, Plan.created_at, Plan.id).filter(
             Plan.user_id == user_id,
             Plan.is_active == True
-        ).offset(skip).limit(limit).all()
+        )
+        total = cached_total(query, Plan.__tablename__, ("user", user_id))
+        items, next_cursor = paginate_keyset(
+            query, Plan.created_at, Plan.id, limit, cursor, descending=True, offset=skip
+        )
+        return KeysetPage(items, next_cursor, total, limit)
     
     def get_plan(self, plan_id: int, user_id: int) -> Optional[Plan]:
         """Get a specific plan by ID."""
@@ -42,32 +72,102 @@ class PlanService:
             plan_type=plan_data.plan_type,
             start_date=plan_data.start_date,
             duration_weeks=plan_data.duration_weeks,
-            plan_data=json.dumps(plan_data.plan_data)
+            plan_data=plan_data.plan_data
         )
         
         self.db.add(plan)
         self.db.commit()
         self.db.refresh(plan)
+        count_cache.invalidate(Plan.__tablename__)
         return plan
     
-    def update_plan(self, plan_id: int, user_id: int, plan_data: PlanUpdate) -> Optional[Plan]:
+    def update_plan(self, plan_id: int, user_id: int, plan_data: PlanUpdate,
+                    expected_version: Optional[int] = None) -> Optional[Plan]:
         """Update an existing plan."""
         plan = self.get_plan(plan_id, user_id)
         if not plan:
             return None
         
-        update_data = plan_data.dict(exclude_unset=True)
+        if expected_version is not None and plan.version != expected_version:
+            raise PlanVersionConflict()
         
-        if 'plan_data' in update_data:
-            update_data['plan_data'] = json.dumps(update_data['plan_data'])
+        update_data = plan_data.dict(exclude_unset=True)
         
         for field, value in update_data.items():
             setattr(plan, field, value)
         
-        self.db.commit()
+        self._commit_versioned()
+        self.db.refresh(plan)
+        return plan
+    
+    def patch_plan(self, plan_id: int, user_id: int, operations: List[Dict[str, Any]],
+                   expected_version: Optional[int] = None) -> Optional[Plan]:
+        """Apply RFC 6902 operations to plan_data.
+        
+        Raises JsonPatchError for operations that don't apply and
+        PlanVersionConflict when expected_version is stale.
+        """
+        if self.db.get_bind().dialect.name == "postgresql" and simple_replacements(operations):
+            if self._patch_in_place(plan_id, user_id, operations, expected_version):
+                return self.get_plan(plan_id, user_id)
+            # Nothing matched: the read-modify-write path reports why
+        
+        plan = self.get_plan(plan_id, user_id)
+        if not plan:
+            return None
+        if expected_version is not None and plan.version != expected_version:
+            raise PlanVersionConflict()
+        
+        plan.plan_data = apply_patch(plan.plan_data or {}, operations)
+        self._commit_versioned()
         self.db.refresh(plan)
         return plan
     
+    def _patch_in_place(self, plan_id: int, user_id: int, operations: List[Dict[str, Any]],
+                        expected_version: Optional[int]) -> bool:
+        """Run test/replace operations as one jsonb_set UPDATE, without loading plan_data.
+        
+        Tests and path existence checks become WHERE conditions, so a failing
+        patch updates nothing and returns False.
+        """
+        plans = Plan.__table__
+        document = cast(plans.c.plan_data, JSONB)
+        patched = document
+        conditions = [plans.c.id == plan_id, plans.c.user_id == user_id, plans.c.is_active == True]
+        if expected_version is not None:
+            conditions.append(plans.c.version == expected_version)
+        
+        for operation in operations:
+            path = parse_pointer(operation["path"])
+            value = bindparam(None, operation["value"], type_=JSONB)
+            if operation["op"] == "test":
+                conditions.append(document[tuple(path)] == value)
+            else:  # replace
+                conditions.append(document[tuple(path)].isnot(None))
+                patched = func.jsonb_set(patched, bindparam(None, path, type_=ARRAY(Text)), value, False,
+                                         type_=JSONB)
+        
+        updated = self.db.execute(
+            update(plans).where(*conditions).values(
+                plan_data=cast(patched, JSON),
+                version=plans.c.version + 1,
+                updated_at=func.now()
+            )
+        ).rowcount
+        if not updated:
+            self.db.rollback()
+            return False
+        self.db.commit()
+        return True
+    
+    def _commit_versioned(self) -> None:
+        """Commit ORM changes to a plan, translating a lost version race into a conflict."""
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise PlanVersionConflict()
+    
     def delete_plan(self, plan_id: int, user_id: int) -> bool:
         """Delete a plan."""
         plan = self.get_plan(plan_id, user_id)
@@ -76,6 +176,7 @@ class PlanService:
         
         plan.is_active = False
         self.db.commit()
+        count_cache.invalidate(Plan.__tablename__)
         return True
     
     def get_active_user_plans(self, user_id: int) -> List[Plan]:
@@ -92,58 +193,318 @@ class PlanService:
         if not user:
             raise ValueError("User not found")
         
-        if plan_request.plan_type == PlanTypeEnum.WORKOUT:
-            plan_data = self._generate_workout_plan(user, plan_request)
-        else:  # MEAL
-            plan_data = self._generate_meal_plan(user, plan_request)
+        plan_type = plan_request.plan_type
+        item_type = 'exercise' if plan_type == PlanTypeEnum.WORKOUT else 'recipe'
+        preferences = self.preference_store.load(user.id, item_type)
+        # Unseeded requests share a small pool of variants so identical profiles hit the cache
+        seed = plan_request.seed
+        if seed is None:
+            seed = random.randrange(max(settings.plan_seed_variants, 1))
+        
+        catalog_version = get_catalog_versions(self.db)[item_type]
+        cache_key = plan_cache_key(
+            plan_type=plan_type,
+            duration_weeks=plan_request.duration_weeks,
+            profile=self._profile_signature(user, plan_type),
+            catalog=catalog_version,
+            seed=seed,
+            # A user's own feedback makes the body theirs alone
+            preferences=[user.id, preferences.version] if len(preferences) else None
+        )
+        body = plan_cache.get(cache_key)
+        if body is None:
+            # Users without feedback of their own can start from the pre-generated library
+            if not len(preferences):
+                body = self._body_from_template(user, plan_request, seed, catalog_version)
+            if body is None:
+                if plan_type == PlanTypeEnum.WORKOUT:
+                    body = self._generate_workout_plan(user, plan_request, seed, preferences)
+                else:  # MEAL
+                    body = self._generate_meal_plan(user, plan_request, seed, preferences)
+            plan_cache.put(cache_key, body)
         
         # Create the plan
-        start_date = plan_request.start_date or datetime.utcnow()
-        plan_name = f"{plan_request.plan_type.value.title()} Plan - {start_date.strftime('%Y-%m-%d')}"
+        start_date = plan_request.start_date or date.today()
+        plan_data = self._stamp_dates(body, start_date)
+        plan_name = f"{plan_request.plan_type.title()} Plan - {start_date.strftime('%Y-%m-%d')}"
         
         plan = Plan(
             user_id=user_id,
             name=plan_name,
-            description=f"Generated {plan_request.plan_type.value} plan based on user preferences",
+            description=f"Generated {plan_request.plan_type} plan based on user preferences",
             plan_type=plan_request.plan_type,
             start_date=start_date,
             duration_weeks=plan_request.duration_weeks,
-            plan_data=json.dumps(plan_data)
+            seed=seed,
+            plan_data=plan_data
         )
         
         self.db.add(plan)
         self.db.commit()
         self.db.refresh(plan)
+        count_cache.invalidate(Plan.__tablename__)
         return plan
     
-    def _generate_workout_plan(self, user: User, plan_request: PlanGenerationRequest) -> Dict[str, Any]:
-        """Generate a workout plan using rule-based logic."""
-        # Get user equipment and preferences
-        available_equipment = json.loads(user.available_equipment) if user.available_equipment else ['bodyweight']
+    def regenerate_plan(self, plan_id: int, user_id: int, from_date: date,
+                        expected_version: Optional[int] = None) -> Optional[Plan]:
+        """Rebuild a generated plan's days on or after from_date from the current profile.
+        
+        Earlier days are kept as stored, and so are days already in the past: a
+        from_date before today is treated as today. Each day is regenerated from the
+        plan's seed and its day offset, so rebuilding an unchanged profile reproduces
+        the same days. Raises PlanVersionConflict when expected_version is stale or
+        the plan is written concurrently.
+        """
+        plan = self.get_plan(plan_id, user_id)
+        if not plan:
+            return None
+        if expected_version is not None and plan.version != expected_version:
+            raise PlanVersionConflict()
+        if plan.seed is None or not plan.plan_data or not plan.start_date:
+            raise ValueError("Only generated plans can be regenerated")
+        
+        user = self.user_service.get_user_by_id(user_id)
+        from_offset = max((max(from_date, date.today()) - plan.start_date).days, 0)
+        item_type = 'exercise' if plan.plan_type == PlanTypeEnum.WORKOUT else 'recipe'
+        preferences = self.preference_store.load(user.id, item_type)
+        
+        if plan.plan_type == PlanTypeEnum.WORKOUT:
+            plan_data, rebuilt = self._regenerate_workout_days(plan, user, preferences, from_offset)
+        else:  # MEAL
+            plan_data, rebuilt = self._regenerate_meal_days(plan, user, preferences, from_offset)
+        
+        plan_data['regenerated_from'] = (plan.start_date + timedelta(days=from_offset)).isoformat()
+        plan_data['preference_version'] = preferences.version
+        plan.plan_data = plan_data
+        self._commit_versioned()
+        self.db.refresh(plan)
+        logger.debug(f"🔁 Regenerated {rebuilt} day(s) of plan {plan.id} from {plan_data['regenerated_from']}")
+        return plan
+    
+    def _regenerate_workout_days(self, plan: Plan, user: User, preferences: PreferenceModel,
+                                 from_offset: int):
+        context = self._workout_context(user, preferences)
+        split = context['split']
+        rebuilt = 0
+        weekly_plan = {}
+        for week, (week_key, days) in enumerate(plan.plan_data.get('weekly_plan', {}).items()):
+            week_start = week * 7
+            if week_start + 7 <= from_offset:
+                weekly_plan[week_key] = days
+                continue
+            
+            # Keep this week's sessions before the cut-off, then lay the new split over the rest
+            sessions = [
+                day for session, day in enumerate(days.values())
+                if week_start + self._session_offset(session, len(days)) < from_offset
+            ]
+            for session, focus in enumerate(split):
+                offset = week_start + self._session_offset(session, len(split))
+                if offset < from_offset:
+                    continue
+                day = self._workout_day(context, focus, self._day_rng(plan.seed, offset))
+                day['date'] = (plan.start_date + timedelta(days=offset)).isoformat()
+                sessions.append(day)
+                rebuilt += 1
+            weekly_plan[week_key] = {f"day_{i + 1}": day for i, day in enumerate(sessions)}
+        
+        plan_data = dict(
+            plan.plan_data,
+            weekly_plan=weekly_plan,
+            workout_days_per_week=len(split),
+            equipment_used=context['equipment'],
+            difficulty_level=context['difficulty']
+        )
+        return plan_data, rebuilt
+    
+    def _regenerate_meal_days(self, plan: Plan, user: User, preferences: PreferenceModel,
+                              from_offset: int):
+        context = self._meal_context(user, preferences)
+        rebuilt = 0
+        daily_plans = {}
+        for offset, (day_key, day) in enumerate(plan.plan_data.get('daily_plans', {}).items()):
+            if offset >= from_offset:
+                day = self._meal_day(context, self._day_rng(plan.seed, offset))
+                day['date'] = (plan.start_date + timedelta(days=offset)).isoformat()
+                rebuilt += 1
+            daily_plans[day_key] = day
+        
+        plan_data = dict(
+            plan.plan_data,
+            daily_plans=daily_plans,
+            target_calories_per_day=user.target_calories,
+            dietary_preferences=context['dietary_preferences'],
+            macros=self.user_service.get_user_macros(user)
+        )
+        return plan_data, rebuilt
+    
+    def _profile_signature(self, user: User, plan_type: str) -> Dict[str, Any]:
+        """The user fields the generator reads for this plan type, normalized for hashing."""
+        if plan_type == PlanTypeEnum.WORKOUT:
+            equipment = user.available_equipment or ['bodyweight']
+            if isinstance(equipment, str):
+                equipment = json.loads(equipment)
+            return {
+                'equipment': sorted(equipment),
+                'workout_days_per_week': user.workout_days_per_week or 3,
+                'workout_duration_minutes': user.workout_duration_minutes or 45,
+                'goal': user.goal
+            }
+        return {
+            'is_vegetarian': bool(user.is_vegetarian),
+            'is_vegan': bool(user.is_vegan),
+            'is_gluten_free': bool(user.is_gluten_free),
+            'is_paleo': bool(user.is_paleo),
+            'is_keto': bool(user.is_keto),
+            'allergies': sorted(a.strip() for a in user.allergies.split(',')) if user.allergies else [],
+            'target_calories': user.target_calories,
+            'goal': user.goal
+        }
+    
+    def template_inputs(self, user: User, plan_type: str) -> Dict[str, Any]:
+        """The coarse inputs a plan template is generated from.
+        
+        Anything applied per user at instantiation (dates, workout length,
+        calorie targets, macros) is left out so many users share a template.
+        """
+        if plan_type == PlanTypeEnum.WORKOUT:
+            equipment = user.available_equipment or ['bodyweight']
+            if isinstance(equipment, str):
+                equipment = json.loads(equipment)
+            return {
+                'equipment': sorted(equipment),
+                'workout_days_per_week': user.workout_days_per_week or 3,
+                'difficulty': self._difficulty_for(user.goal)
+            }
+        allergies = [a.strip() for a in user.allergies.split(',')] if user.allergies else []
+        return {
+            'is_vegetarian': bool(user.is_vegetarian),
+            'is_vegan': bool(user.is_vegan),
+            'is_gluten_free': bool(user.is_gluten_free),
+            'is_paleo': bool(user.is_paleo),
+            'is_keto': bool(user.is_keto),
+            # The only allergies recipe matching understands
+            'allergies': sorted({'nuts', 'dairy'}.intersection(allergies)),
+            'target_calories': (
+                int(round(user.target_calories / TEMPLATE_CALORIE_STEP) * TEMPLATE_CALORIE_STEP)
+                if user.target_calories else None
+            )
+        }
+    
+    def generate_template_body(self, plan_type: str, inputs: Dict[str, Any], seed: int, weeks: int) -> Dict[str, Any]:
+        """Generate a shared plan body for template_inputs() output, as for a user without feedback."""
+        request = PlanGenerationRequest(plan_type=plan_type, duration_weeks=weeks, seed=seed)
+        if plan_type == PlanTypeEnum.WORKOUT:
+            # Any goal with the template's difficulty produces the same workouts
+            goal = next(g for g in GoalEnum if self._difficulty_for(g) == inputs['difficulty'])
+            user = User(
+                available_equipment=inputs['equipment'],
+                workout_days_per_week=inputs['workout_days_per_week'],
+                goal=goal
+            )
+            return self._generate_workout_plan(user, request, seed, PreferenceModel.empty())
+        user = User(
+            is_vegetarian=inputs['is_vegetarian'],
+            is_vegan=inputs['is_vegan'],
+            is_gluten_free=inputs['is_gluten_free'],
+            is_paleo=inputs['is_paleo'],
+            is_keto=inputs['is_keto'],
+            allergies=','.join(inputs['allergies']) or None,
+            target_calories=inputs['target_calories']
+        )
+        return self._generate_meal_plan(user, request, seed, PreferenceModel.empty())
+    
+    def _body_from_template(self, user: User, plan_request: PlanGenerationRequest, seed: int,
+                            catalog_version: int) -> Optional[Dict[str, Any]]:
+        """Instantiate a library template for this user, or None when there is no matching one."""
+        plan_type = plan_request.plan_type
+        template = PlanTemplateStore(self.db).get(
+            plan_template_key(plan_type, self.template_inputs(user, plan_type), seed, catalog_version)
+        )
+        weeks = plan_request.duration_weeks
+        if template is None or template['duration_weeks'] < weeks:
+            return None
+        
+        # Days are seeded by offset, so the first N weeks of a longer template are exactly an N-week plan
+        if plan_type == PlanTypeEnum.WORKOUT:
+            duration = user.workout_duration_minutes or 45
+            weekly_plan = {
+                week_key: {day_key: dict(day, duration_minutes=duration) for day_key, day in days.items()}
+                for week_key, days in list(template['weekly_plan'].items())[:weeks]
+            }
+            return dict(template, duration_weeks=weeks, weekly_plan=weekly_plan)
+        
+        daily_calories = user.target_calories or 2000
+        daily_plans = {
+            day_key: dict(day, target_calories=daily_calories)
+            for day_key, day in list(template['daily_plans'].items())[:weeks * 7]
+        }
+        return dict(
+            template,
+            duration_weeks=weeks,
+            daily_plans=daily_plans,
+            target_calories_per_day=user.target_calories,
+            dietary_preferences=self._dietary_preferences(user),
+            macros=self.user_service.get_user_macros(user)
+        )
+    
+    @staticmethod
+    def _day_rng(seed: int, day_offset: int) -> np.random.Generator:
+        """Independent stream per plan day, so any single day can be rebuilt on its own."""
+        return np.random.default_rng([seed, day_offset])
+    
+    @staticmethod
+    def _session_offset(session: int, sessions_per_week: int) -> int:
+        """Day of the week (0-6) a workout session falls on, spread evenly."""
+        return session * 7 // sessions_per_week
+    
+    def _stamp_dates(self, body: Dict[str, Any], start_date: date) -> Dict[str, Any]:
+        """Copy-on-write: add calendar dates to a (possibly shared) cached body."""
+        if 'daily_plans' in body:
+            daily_plans = {}
+            for offset, (day_key, day) in enumerate(body['daily_plans'].items()):
+                daily_plans[day_key] = dict(day, date=(start_date + timedelta(days=offset)).isoformat())
+            return dict(body, daily_plans=daily_plans)
+        
+        weekly_plan = {}
+        for week, (week_key, days) in enumerate(body.get('weekly_plan', {}).items()):
+            weekly_plan[week_key] = {
+                day_key: dict(day, date=(start_date + timedelta(
+                    weeks=week, days=self._session_offset(session, len(days))
+                )).isoformat())
+                for session, (day_key, day) in enumerate(days.items())
+            }
+        return dict(body, weekly_plan=weekly_plan)
+    
+    @staticmethod
+    def _difficulty_for(goal: Optional[str]) -> str:
+        """Determine difficulty based on goal."""
+        if goal == GoalEnum.LOSE_WEIGHT:
+            return 'beginner'
+        elif goal == GoalEnum.GAIN_MUSCLE:
+            return 'intermediate'
+        return 'beginner'
+    
+    def _workout_context(self, user: User, preferences: PreferenceModel) -> Dict[str, Any]:
+        """Everything a workout day needs from the profile and catalog, computed once per plan."""
+        # Get user equipment and preferences (older rows hold a JSON-encoded string)
+        available_equipment = user.available_equipment or ['bodyweight']
+        if isinstance(available_equipment, str):
+            available_equipment = json.loads(available_equipment)
         workout_days = user.workout_days_per_week or 3
-        workout_duration = user.workout_duration_minutes or 45
         
-        # Determine difficulty based on goal and user info
-        if user.goal == GoalEnum.LOSE_WEIGHT:
-            difficulty = 'beginner'
-        elif user.goal == GoalEnum.GAIN_MUSCLE:
-            difficulty = 'intermediate'
-        else:
-            difficulty = 'beginner'
+        difficulty = self._difficulty_for(user.goal)
         
         # Get suitable exercises
         exercises = self.exercise_service.get_exercises_for_user(
-            available_equipment, difficulty, limit=50
+            available_equipment, difficulty, limit=200
         )
         
         if not exercises:
             exercises = self.exercise_service.get_exercises_for_user(
-                ['bodyweight'], difficulty, limit=20
+                ['bodyweight'], difficulty, limit=50
             )
         
-        # Generate weekly workout schedule
-        weekly_plan = {}
-        
         # Define workout split based on days per week
         if workout_days <= 3:
             split = ['full_body'] * workout_days
@@ -152,38 +513,62 @@ class PlanService:
         else:  # 5+ days
             split = ['chest', 'back', 'legs', 'shoulders', 'arms'][:workout_days]
         
+        return {
+            'equipment': available_equipment,
+            'difficulty': difficulty,
+            'duration_minutes': user.workout_duration_minutes or 45,
+            'split': split,
+            'exercises': exercises,
+            'muscle_groups': [e.muscle_group or '' for e in exercises],
+            # Score every candidate once from the user's preference model
+            'weights': preferences.weights(e.id for e in exercises)
+        }
+    
+    def _workout_day(self, context: Dict[str, Any], focus: str, rng: np.random.Generator) -> Dict[str, Any]:
+        if focus == 'full_body':
+            day_exercises = self._select_full_body_exercises(
+                context['exercises'], context['muscle_groups'], context['weights'], rng
+            )
+        else:
+            day_exercises = self._select_exercises_by_muscle_group(
+                context['exercises'], context['muscle_groups'], context['weights'], focus, rng
+            )
+        return {
+            'focus': focus,
+            'duration_minutes': context['duration_minutes'],
+            'exercises': day_exercises
+        }
+    
+    def _generate_workout_plan(self, user: User, plan_request: PlanGenerationRequest,
+                               seed: int, preferences: PreferenceModel) -> Dict[str, Any]:
+        """Generate a workout plan using rule-based logic."""
+        context = self._workout_context(user, preferences)
+        split = context['split']
+        
+        # Generate weekly workout schedule
+        weekly_plan = {}
         for week in range(plan_request.duration_weeks):
-            week_key = f"week_{week + 1}"
-            weekly_plan[week_key] = {}
-            
-            for day, focus in enumerate(split, 1):
-                day_key = f"day_{day}"
-                
-                # Select exercises for this day
-                if focus == 'full_body':
-                    day_exercises = self._select_full_body_exercises(exercises)
-                else:
-                    day_exercises = self._select_exercises_by_muscle_group(exercises, focus)
-                
-                weekly_plan[week_key][day_key] = {
-                    'focus': focus,
-                    'duration_minutes': workout_duration,
-                    'exercises': day_exercises
-                }
+            weekly_plan[f"week_{week + 1}"] = {
+                f"day_{session + 1}": self._workout_day(
+                    context, focus, self._day_rng(seed, week * 7 + self._session_offset(session, len(split)))
+                )
+                for session, focus in enumerate(split)
+            }
         
         return {
             'type': 'workout',
             'duration_weeks': plan_request.duration_weeks,
-            'workout_days_per_week': workout_days,
+            'workout_days_per_week': len(split),
             'weekly_plan': weekly_plan,
-            'equipment_used': available_equipment,
-            'difficulty_level': difficulty
+            'equipment_used': context['equipment'],
+            'difficulty_level': context['difficulty'],
+            'preference_version': preferences.version
         }
     
-    def _generate_meal_plan(self, user: User, plan_request: PlanGenerationRequest) -> Dict[str, Any]:
-        """Generate a meal plan using rule-based logic."""
-        # Get user dietary preferences
-        user_preferences = {
+    @staticmethod
+    def _dietary_preferences(user: User) -> Dict[str, Any]:
+        """Get user dietary preferences."""
+        return {
             'is_vegetarian': user.is_vegetarian,
             'is_vegan': user.is_vegan,
             'is_gluten_free': user.is_gluten_free,
@@ -191,116 +576,132 @@ class PlanService:
             'is_keto': user.is_keto,
             'allergies': user.allergies.split(',') if user.allergies else []
         }
+    
+    def _meal_context(self, user: User, preferences: PreferenceModel) -> Dict[str, Any]:
+        """Candidate recipes per meal with calories and preference weights, computed once per plan."""
+        user_preferences = self._dietary_preferences(user)
         
         # Get suitable recipes
         recipes = self.recipe_service.get_recipes_for_user(
-            user_preferences, user.target_calories, limit=100
+            user_preferences, user.target_calories, limit=400
         )
         
         if not recipes:
             # Fallback to basic recipes if no matches
-            recipes = self.recipe_service.get_recipes(limit=50)
-        
-        # Group recipes by meal type
-        recipes_by_meal = {
-            'breakfast': [r for r in recipes if r.meal_type.value == 'breakfast'],
-            'lunch': [r for r in recipes if r.meal_type.value == 'lunch'],
-            'dinner': [r for r in recipes if r.meal_type.value == 'dinner'],
-            'snack': [r for r in recipes if r.meal_type.value == 'snack']
+            recipes = self.recipe_service.get_recipes(limit=50).items
+        
+        # Group recipes by meal type, scoring each group once
+        recipes_by_meal = {}
+        for meal in ('breakfast', 'lunch', 'dinner', 'snack'):
+            group = [r for r in recipes if r.meal_type == meal]
+            recipes_by_meal[meal] = (
+                group,
+                np.array([r.calories if r.calories is not None else np.nan for r in group], dtype=np.float64),
+                preferences.weights(r.id for r in group)
+            )
+        
+        # Calculate target calories per meal
+        daily_calories = user.target_calories or 2000
+        return {
+            'dietary_preferences': user_preferences,
+            'daily_calories': daily_calories,
+            'recipes_by_meal': recipes_by_meal,
+            'meal_targets': {
+                'breakfast': daily_calories * 0.25,
+                'lunch': daily_calories * 0.35,
+                'dinner': daily_calories * 0.35,
+                'snack': daily_calories * 0.05
+            }
         }
+    
+    def _meal_day(self, context: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+        return {
+            'target_calories': context['daily_calories'],
+            'meals': {
+                meal: self._select_meal(*context['recipes_by_meal'][meal], target, rng)
+                for meal, target in context['meal_targets'].items()
+            }
+        }
+    
+    def _generate_meal_plan(self, user: User, plan_request: PlanGenerationRequest,
+                            seed: int, preferences: PreferenceModel) -> Dict[str, Any]:
+        """Generate a meal plan using rule-based logic."""
+        context = self._meal_context(user, preferences)
         
-        # Generate daily meal plans
+        # Generate daily meal plans; dates are added per plan by _stamp_dates so bodies can be shared
         daily_plans = {}
         days_per_week = 7
-        
         for week in range(plan_request.duration_weeks):
-            for day in range(1, days_per_week + 1):
-                day_key = f"week_{week + 1}_day_{day}"
-                
-                # Calculate target calories per meal
-                daily_calories = user.target_calories or 2000
-                breakfast_cal = daily_calories * 0.25
-                lunch_cal = daily_calories * 0.35
-                dinner_cal = daily_calories * 0.35
-                snack_cal = daily_calories * 0.05
-                
-                daily_plans[day_key] = {
-                    'date': (datetime.utcnow() + timedelta(weeks=week, days=day-1)).strftime('%Y-%m-%d'),
-                    'target_calories': daily_calories,
-                    'meals': {
-                        'breakfast': self._select_meal(recipes_by_meal['breakfast'], breakfast_cal),
-                        'lunch': self._select_meal(recipes_by_meal['lunch'], lunch_cal),
-                        'dinner': self._select_meal(recipes_by_meal['dinner'], dinner_cal),
-                        'snack': self._select_meal(recipes_by_meal['snack'], snack_cal) if recipes_by_meal['snack'] else None
-                    }
-                }
+            for day in range(days_per_week):
+                daily_plans[f"week_{week + 1}_day_{day + 1}"] = self._meal_day(
+                    context, self._day_rng(seed, week * days_per_week + day)
+                )
         
         return {
             'type': 'meal',
             'duration_weeks': plan_request.duration_weeks,
             'target_calories_per_day': user.target_calories,
-            'dietary_preferences': user_preferences,
+            'dietary_preferences': context['dietary_preferences'],
             'daily_plans': daily_plans,
-            'macros': self.user_service.get_user_macros(user)
+            'macros': self.user_service.get_user_macros(user),
+            'preference_version': preferences.version
         }
     
-    def _select_full_body_exercises(self, exercises: List) -> List[Dict]:
-        """Select exercises for a full-body workout."""
-        muscle_groups = ['chest', 'back', 'legs', 'shoulders', 'arms', 'core']
+    @staticmethod
+    def _exercise_entry(exercise) -> Dict[str, Any]:
+        return {
+            'id': exercise.id,
+            'name': exercise.name,
+            'muscle_group': exercise.muscle_group,
+            'sets': exercise.default_sets,
+            'reps': f"{exercise.default_reps_min}-{exercise.default_reps_max}" if exercise.default_reps_min else "As indicated",
+            'rest_seconds': exercise.default_rest_seconds
+        }
+    
+    def _select_full_body_exercises(self, exercises: List, muscle_groups: List[str],
+                                    weights: np.ndarray, rng: np.random.Generator) -> List[Dict]:
+        """Select one exercise per major muscle group, weighted by the user's preferences."""
         selected = []
         
-        for muscle_group in muscle_groups:
-            suitable = [e for e in exercises if muscle_group in e.muscle_group.value]
-            if suitable:
-                exercise = random.choice(suitable)
-                selected.append({
-                    'id': exercise.id,
-                    'name': exercise.name,
-                    'muscle_group': exercise.muscle_group.value,
-                    'sets': exercise.default_sets,
-                    'reps': f"{exercise.default_reps_min}-{exercise.default_reps_max}" if exercise.default_reps_min else "As indicated",
-                    'rest_seconds': exercise.default_rest_seconds
-                })
+        for muscle_group in ['chest', 'back', 'legs', 'shoulders', 'arms', 'core']:
+            suitable = np.array([i for i, group in enumerate(muscle_groups) if muscle_group in group], dtype=np.int64)
+            if len(suitable):
+                choice = suitable[weighted_sample(rng, weights[suitable], 1)[0]]
+                selected.append(self._exercise_entry(exercises[choice]))
         
         return selected
     
-    def _select_exercises_by_muscle_group(self, exercises: List, focus: str) -> List[Dict]:
-        """Select exercises focused on specific muscle group."""
-        suitable = [e for e in exercises if focus in e.muscle_group.value or e.muscle_group.value == focus]
+    def _select_exercises_by_muscle_group(self, exercises: List, muscle_groups: List[str], weights: np.ndarray,
+                                          focus: str, rng: np.random.Generator) -> List[Dict]:
+        """Select exercises focused on specific muscle group, weighted by the user's preferences."""
+        suitable = np.array([i for i, group in enumerate(muscle_groups) if focus in group], dtype=np.int64)
         
-        if not suitable:
-            suitable = exercises[:5]  # Fallback
+        if not len(suitable):
+            suitable = np.arange(min(5, len(exercises)))  # Fallback
         
-        selected = []
-        for exercise in random.sample(suitable, min(4, len(suitable))):
-            selected.append({
-                'id': exercise.id,
-                'name': exercise.name,
-                'muscle_group': exercise.muscle_group.value,
-                'sets': exercise.default_sets,
-                'reps': f"{exercise.default_reps_min}-{exercise.default_reps_max}" if exercise.default_reps_min else "As indicated",
-                'rest_seconds': exercise.default_rest_seconds
-            })
-        
-        return selected
+        chosen = suitable[weighted_sample(rng, weights[suitable], 4)]
+        return [self._exercise_entry(exercises[i]) for i in chosen]
     
-    def _select_meal(self, recipes: List, target_calories: float) -> Optional[Dict]:
-        """Select a recipe that best fits the target calories."""
+    def _select_meal(self, recipes: List, calories: np.ndarray, weights: np.ndarray,
+                     target_calories: float, rng: np.random.Generator) -> Optional[Dict]:
+        """Sample a recipe that fits the target calories, weighted by the user's preferences."""
         if not recipes:
             return None
         
-        # Find recipe closest to target calories
-        best_recipe = min(recipes, key=lambda r: abs(r.calories - target_calories))
+        # Calorie fit decays with distance from the target; recipes without calories rank last
+        fit = np.exp(-np.abs(calories - target_calories) / max(target_calories * 0.15, 1.0))
+        fit = np.nan_to_num(fit, nan=1e-6)
+        recipe = recipes[weighted_sample(rng, fit * weights, 1)[0]]
+        ingredients = recipe.ingredients or []  # Older rows hold a JSON-encoded string
         
         return {
-            'id': best_recipe.id,
-            'name': best_recipe.name,
-            'calories': best_recipe.calories,
-            'protein_g': best_recipe.protein_g,
-            'carbs_g': best_recipe.carbs_g,
-            'fat_g': best_recipe.fat_g,
-            'prep_time_minutes': best_recipe.prep_time_minutes,
-            'servings': best_recipe.servings,
-            'ingredients': json.loads(best_recipe.ingredients) if best_recipe.ingredients else [],
-            'instructions': best_recipe.instructions
-        } 
\ No newline at end of file
+            'id': recipe.id,
+            'name': recipe.name,
+            'calories': recipe.calories,
+            'protein_g': recipe.protein_g,
+            'carbs_g': recipe.carbs_g,
+            'fat_g': recipe.fat_g,
+            'prep_time_minutes': recipe.prep_time_minutes,
+            'ingredients': json.loads(ingredients) if isinstance(ingredients, str) else ingredients,
+            'instructions': recipe.instructions
+        }
@@ -0,0 +1,100 @@
+import json
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from models.plan import PlanTemplate, PlanTypeEnum
+from models.user import User
+from services.catalog_version import get_catalog_versions
+from services.plan_blocks import dehydrate, hydrate, store_blocks
+from services.plan_cache import plan_cache_key
+
+ITEM_TYPES = {PlanTypeEnum.WORKOUT.value: "exercise", PlanTypeEnum.MEAL.value: "recipe"}
+DEFAULT_MIN_USERS = 2
+DEFAULT_MAX_COMBINATIONS = 500
+
+
+def plan_template_key(plan_type: str, inputs: Dict[str, Any], seed: int, catalog_version: int) -> str:
+    return plan_cache_key(template=plan_type, inputs=inputs, seed=seed, catalog=catalog_version)
+
+
+class PlanTemplateStore:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Primary-key read of a template body, reassembled from plan blocks."""
+        plan_data = self.db.execute(
+            select(PlanTemplate.plan_data).where(PlanTemplate.key == key)
+        ).scalar()
+        if plan_data is None:
+            return None
+        return hydrate(self.db, plan_data)
+
+    def common_inputs(self, plan_service, plan_type: str, min_users: int,
+                      max_combinations: int) -> Counter:
+        """Count active users per template input combination, keeping the most common ones."""
+        counts = Counter()
+        for user in self.db.query(User).filter(User.is_active == True).yield_per(1000):
+            inputs = plan_service.template_inputs(user, plan_type)
+            counts[json.dumps(inputs, sort_keys=True)] += 1
+        return Counter({
+            inputs: count for inputs, count in counts.most_common(max_combinations) if count >= min_users
+        })
+
+    def build(self, plan_service, plan_type: str, seeds: int, weeks: int,
+              min_users: int = DEFAULT_MIN_USERS, max_combinations: int = DEFAULT_MAX_COMBINATIONS,
+              only_stale: bool = False) -> Dict[str, Any]:
+        """Generate templates for the common input combinations of one plan type.
+
+        Templates from older catalog versions are deleted once the new set is in.
+        With only_stale, nothing happens while templates for the current catalog exist.
+        """
+        catalog_version = get_catalog_versions(self.db)[ITEM_TYPES[plan_type]]
+        if only_stale and self.db.execute(
+            select(PlanTemplate.key).where(
+                PlanTemplate.plan_type == plan_type, PlanTemplate.catalog_version == catalog_version
+            ).limit(1)
+        ).first():
+            return {"plan_type": plan_type, "catalog_version": catalog_version, "templates": 0, "skipped": True}
+
+        combinations = self.common_inputs(plan_service, plan_type, min_users, max_combinations)
+        insert = upsert_insert(self.db)
+        built = 0
+        for encoded, user_count in combinations.items():
+            inputs = json.loads(encoded)
+            rows = []
+            for seed in range(seeds):
+                compact, blocks = dehydrate(plan_service.generate_template_body(plan_type, inputs, seed, weeks))
+                store_blocks(self.db.connection(), blocks)
+                rows.append({
+                    "key": plan_template_key(plan_type, inputs, seed, catalog_version),
+                    "plan_type": plan_type,
+                    "inputs": inputs,
+                    "seed": seed,
+                    "catalog_version": catalog_version,
+                    "user_count": user_count,
+                    "plan_data": compact,
+                })
+            stmt = insert(PlanTemplate.__table__).values(rows)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"user_count": stmt.excluded.user_count, "plan_data": stmt.excluded.plan_data}
+            ))
+            self.db.commit()
+            built += len(rows)
+
+        self.db.execute(delete(PlanTemplate.__table__).where(
+            PlanTemplate.plan_type == plan_type, PlanTemplate.catalog_version != catalog_version
+        ))
+        self.db.commit()
+        return {
+            "plan_type": plan_type,
+            "catalog_version": catalog_version,
+            "combinations": len(combinations),
+            "users_covered": sum(combinations.values()),
+            "templates": built,
+        }
@@ -0,0 +1,181 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from models.feedback import UserItemFeedbackStats
+from models.preference import UserPreferenceModel
+
+# (alpha, beta) evidence added per feedback event
+FEEDBACK_EVIDENCE = {
+    "completed": (1.0, 0.0),
+    "liked": (2.0, 0.0),
+    "skipped": (0.0, 1.0),
+    "too_hard": (0.0, 1.0),
+}
+# Beta(1, 1): items without feedback score 0.5
+PRIOR = 1.0
+# Models keep the items with the most evidence once they grow past this
+MAX_ITEMS_PER_MODEL = 5000
+
+_ID_DTYPE = np.dtype("<i4")
+_EVIDENCE_DTYPE = np.dtype("<f4")
+
+
+class PreferenceModel:
+    """Beta-Bernoulli bandit over the items one user has rated.
+
+    Parallel arrays sorted by item id; alpha/beta include the prior. Reading a
+    model costs one row fetch regardless of how much feedback produced it.
+    """
+
+    def __init__(self, item_ids: np.ndarray, alpha: np.ndarray, beta: np.ndarray, version: int = 0):
+        self.item_ids = item_ids
+        self.alpha = alpha
+        self.beta = beta
+        self.version = version
+
+    @classmethod
+    def empty(cls) -> "PreferenceModel":
+        return cls(np.empty(0, _ID_DTYPE), np.empty(0, _EVIDENCE_DTYPE), np.empty(0, _EVIDENCE_DTYPE))
+
+    @classmethod
+    def from_row(cls, row: Optional[UserPreferenceModel]) -> "PreferenceModel":
+        if row is None:
+            return cls.empty()
+        return cls(
+            np.frombuffer(row.item_ids, _ID_DTYPE),
+            np.frombuffer(row.alpha, _EVIDENCE_DTYPE),
+            np.frombuffer(row.beta, _EVIDENCE_DTYPE),
+            row.version or 0,
+        )
+
+    def to_columns(self) -> Dict[str, bytes]:
+        return {
+            "item_ids": self.item_ids.astype(_ID_DTYPE).tobytes(),
+            "alpha": self.alpha.astype(_EVIDENCE_DTYPE).tobytes(),
+            "beta": self.beta.astype(_EVIDENCE_DTYPE).tobytes(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def update(self, item_ids: np.ndarray, alpha_delta: np.ndarray, beta_delta: np.ndarray) -> "PreferenceModel":
+        """Return a new model with the evidence added (item ids may repeat)."""
+        new_ids, inverse = np.unique(np.asarray(item_ids, dtype=_ID_DTYPE), return_inverse=True)
+        add_alpha = np.bincount(inverse, weights=alpha_delta, minlength=len(new_ids))
+        add_beta = np.bincount(inverse, weights=beta_delta, minlength=len(new_ids))
+
+        ids = np.union1d(self.item_ids, new_ids).astype(_ID_DTYPE)
+        alpha = np.full(len(ids), PRIOR, dtype=np.float64)
+        beta = np.full(len(ids), PRIOR, dtype=np.float64)
+        existing = np.searchsorted(ids, self.item_ids)
+        alpha[existing] = self.alpha
+        beta[existing] = self.beta
+        touched = np.searchsorted(ids, new_ids)
+        alpha[touched] += add_alpha
+        beta[touched] += add_beta
+
+        if len(ids) > MAX_ITEMS_PER_MODEL:
+            keep = np.sort(np.argpartition(-(alpha + beta), MAX_ITEMS_PER_MODEL)[:MAX_ITEMS_PER_MODEL])
+            ids, alpha, beta = ids[keep], alpha[keep], beta[keep]
+        return PreferenceModel(ids, alpha.astype(_EVIDENCE_DTYPE), beta.astype(_EVIDENCE_DTYPE), self.version + 1)
+
+    def weights(self, candidate_ids: Iterable[int]) -> np.ndarray:
+        """Posterior mean preference for each candidate (0.5 for unrated items)."""
+        candidates = np.asarray(list(candidate_ids), dtype=np.int64)
+        scores = np.full(len(candidates), 0.5)
+        if len(self.item_ids) == 0 or len(candidates) == 0:
+            return scores
+        positions = np.minimum(np.searchsorted(self.item_ids, candidates), len(self.item_ids) - 1)
+        found = self.item_ids[positions] == candidates
+        alpha = self.alpha[positions[found]].astype(np.float64)
+        scores[found] = alpha / (alpha + self.beta[positions[found]])
+        return scores
+
+
+def weighted_sample(rng: np.random.Generator, weights: np.ndarray, size: int) -> np.ndarray:
+    """Indices of `size` distinct items drawn with probability proportional to weights."""
+    size = min(size, len(weights))
+    if size == 0:
+        return np.empty(0, dtype=np.int64)
+    total = weights.sum()
+    probabilities = weights / total if total > 0 else None
+    return rng.choice(len(weights), size=size, replace=False, p=probabilities)
+
+
+class PreferenceStore:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, user_id: int, item_type: str) -> PreferenceModel:
+        """Read a user's model for one item type (empty when they have no feedback yet)."""
+        return PreferenceModel.from_row(self.db.get(UserPreferenceModel, (user_id, item_type)))
+
+    def apply_feedback(self, user_id: int, events: List[Dict[str, Any]]) -> None:
+        """Fold feedback events into the user's models inside the caller's transaction."""
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_type.setdefault(event["item_type"], []).append(event)
+
+        empty = PreferenceModel.empty().to_columns()
+        for item_type in sorted(by_type):
+            typed = by_type[item_type]
+            # Make sure the row exists, then lock it so concurrent batches serialize
+            self.db.execute(
+                upsert_insert(self.db)(UserPreferenceModel.__table__)
+                .values(user_id=user_id, item_type=item_type, version=0, **empty)
+                .on_conflict_do_nothing(index_elements=["user_id", "item_type"])
+            )
+            row = self.db.execute(
+                select(UserPreferenceModel)
+                .where(UserPreferenceModel.user_id == user_id, UserPreferenceModel.item_type == item_type)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            ).scalar_one()
+
+            evidence = np.array([FEEDBACK_EVIDENCE[e["feedback_type"]] for e in typed])
+            model = PreferenceModel.from_row(row).update(
+                np.array([e["item_id"] for e in typed]), evidence[:, 0], evidence[:, 1]
+            )
+            for column, value in model.to_columns().items():
+                setattr(row, column, value)
+            row.version = model.version
+
+    def rebuild_from_stats(self) -> int:
+        """Recreate every model from user_item_feedback_stats; returns the number of models."""
+        self.db.execute(delete(UserPreferenceModel.__table__))
+        stats = UserItemFeedbackStats
+        rows = self.db.execute(
+            select(stats.user_id, stats.item_type, stats.item_id, stats.completed_count,
+                   stats.liked_count, stats.skipped_count, stats.too_hard_count)
+            .order_by(stats.user_id, stats.item_type, stats.item_id)
+        ).all()
+        if not rows:
+            self.db.commit()
+            return 0
+
+        data = np.array([r[2:] for r in rows], dtype=np.float64)
+        item_ids, completed, liked, skipped, too_hard = data.T
+        alpha_delta = (completed * FEEDBACK_EVIDENCE["completed"][0] + liked * FEEDBACK_EVIDENCE["liked"][0])
+        beta_delta = (skipped * FEEDBACK_EVIDENCE["skipped"][1] + too_hard * FEEDBACK_EVIDENCE["too_hard"][1])
+
+        # Rows are sorted, so each (user, item_type) is one contiguous slice
+        keys = [(r[0], r[1]) for r in rows]
+        boundaries = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]] + [len(keys)]
+        models = []
+        for start, end in zip(boundaries, boundaries[1:]):
+            model = PreferenceModel.empty().update(
+                item_ids[start:end], alpha_delta[start:end], beta_delta[start:end]
+            )
+            user_id, item_type = keys[start]
+            models.append(dict(user_id=user_id, item_type=item_type, version=model.version, **model.to_columns()))
+            if len(models) >= 1000:
+                self.db.bulk_insert_mappings(UserPreferenceModel, models)
+                models = []
+        if models:
+            self.db.bulk_insert_mappings(UserPreferenceModel, models)
+        self.db.commit()
+        return len(boundaries) - 1
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.recipe import Recipe
+from services.catalog_version import get_catalog_versions
+
+
+class RecipeFlagIndex:
+    """In-memory columnar copy of the active recipe catalog for vectorized filtering.
+
+    Each recipe occupies one slot in parallel NumPy arrays, so a dietary/calorie/
+    meal-type filter over the whole catalog is a single boolean-mask expression.
+    """
+
+    def __init__(self, ids: np.ndarray, flags: np.ndarray, calories: np.ndarray, meal_types: np.ndarray,
+                 version: int = 0):
+        self.ids = ids
+        self.flags = flags
+        self.calories = calories
+        self.meal_types = meal_types
+        self.version = version  # Recipe catalog version the rows are at least as new as
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db: Session) -> "RecipeFlagIndex":
+        """Load (id, dietary_flags, calories, meal_type) for all active recipes in one query."""
+        # Read before the rows, so a concurrent write can only make the index newer than its version
+        version = get_catalog_versions(db)["recipe"]
+        rows = db.execute(
+            select(Recipe.id, Recipe.dietary_flags, Recipe.calories, Recipe.meal_type)
+            .where(Recipe.is_active == True)
+            .order_by(Recipe.id)
+        ).all()
+        count = len(rows)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+        flags = np.fromiter((r[1] or 0 for r in rows), dtype=np.uint32, count=count)
+        # Recipes without calories never pass a calorie cap, matching SQL NULL semantics
+        calories = np.fromiter(
+            (r[2] if r[2] is not None else np.nan for r in rows), dtype=np.float64, count=count
+        )
+        meal_types = np.array([r[3] or "" for r in rows], dtype=object)
+        return cls(ids, flags, calories, meal_types, version)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def match(
+        self,
+        mask: int = 0,
+        value: int = 0,
+        max_calories: Optional[float] = None,
+        meal_type: Optional[str] = None,
+    ) -> np.ndarray:
+        """Return ids of recipes with (flags & mask) == value and the optional constraints."""
+        selected = (self.flags & np.uint32(mask)) == np.uint32(value)
+        if max_calories is not None:
+            selected &= self.calories <= max_calories
+        if meal_type is not None:
+            selected &= self.meal_types == meal_type
+        return self.ids[selected]
+
+
+_index: Optional[RecipeFlagIndex] = None
+_index_lock = threading.Lock()
+
+
+def _is_current(index: Optional[RecipeFlagIndex], version: int) -> bool:
+    return (
+        index is not None
+        and index.version >= version
+        and time.monotonic() - index.built_at < settings.recipe_index_ttl_seconds
+    )
+
+
+def get_recipe_index(db: Session) -> RecipeFlagIndex:
+    """Return the process-wide recipe index, rebuilding it when stale or invalidated.
+
+    Writes made by other workers bump the recipe catalog version, so an index
+    older than the current version is rebuilt rather than served until its TTL
+    runs out; plans cached under that version then never mix in older rows.
+    """
+    global _index
+    version = get_catalog_versions(db)["recipe"]
+    index = _index
+    if _is_current(index, version):
+        return index
+
+    with _index_lock:
+        index = _index
+        if not _is_current(index, version):
+            index = RecipeFlagIndex.build(db)
+            _index = index
+    return index
+
+
+def invalidate_recipe_index() -> None:
+    """Force the next lookup to rebuild the index (call after catalog writes)."""
+    global _index
+    _index = None
@@ -1,17 +1,22 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from typing import List, Optional
+from typing import Dict, List, Optional
 import json
 
-from models.recipe import Recipe, MealTypeEnum
+from models.recipe import Recipe, MealTypeEnum, DIETARY_FLAGS, dietary_mask
 from schemas.recipe import RecipeCreate, RecipeUpdate, RecipeFilter
+from services.recipe_index import get_recipe_index, invalidate_recipe_index
+from services.catalog_version import bump_catalog_version
+from fieldsets import project
+from services.loaders import BatchLoader
+from pagination import KeysetPage, paginate_keyset, cached_total, count_cache, filter_signature
 
 class RecipeService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_recipes(self, skip: int = 0, limit: int = 100, filters: RecipeFilter = None) -> List[Recipe]:
-        """Get list of recipes with optional filtering."""
+    def _filtered_query(self, filters: RecipeFilter = None):
+        """Build the recipe query for the given filters."""
         query = self.db.query(Recipe)
         
         if filters:
@@ -28,36 +33,32 @@ class RecipeService:
             if filters.max_prep_time:
                 query = query.filter(Recipe.prep_time_minutes <= filters.max_prep_time)
             
-            # Dietary filters
-            if filters.is_vegetarian is not None:
-                query = query.filter(Recipe.is_vegetarian == filters.is_vegetarian)
-            if filters.is_vegan is not None:
-                query = query.filter(Recipe.is_vegan == filters.is_vegan)
-            if filters.is_gluten_free is not None:
-                query = query.filter(Recipe.is_gluten_free == filters.is_gluten_free)
-            if filters.is_dairy_free is not None:
-                query = query.filter(Recipe.is_dairy_free == filters.is_dairy_free)
-            if filters.is_nut_free is not None:
-                query = query.filter(Recipe.is_nut_free == filters.is_nut_free)
-            if filters.is_paleo is not None:
-                query = query.filter(Recipe.is_paleo == filters.is_paleo)
-            if filters.is_keto is not None:
-                query = query.filter(Recipe.is_keto == filters.is_keto)
-            if filters.is_low_carb is not None:
-                query = query.filter(Recipe.is_low_carb == filters.is_low_carb)
-            if filters.is_high_protein is not None:
-                query = query.filter(Recipe.is_high_protein == filters.is_high_protein)
-            if filters.is_meal_prep_friendly is not None:
-                query = query.filter(Recipe.is_meal_prep_friendly == filters.is_meal_prep_friendly)
+            # Dietary filters: one bitwise check on dietary_flags instead of ten columns
+            mask, value = dietary_mask({name: getattr(filters, name) for name in DIETARY_FLAGS})
+            if mask:
+                query = query.filter(Recipe.dietary_flags.op('&')(mask) == value)
+            
             if filters.is_active is not None:
                 query = query.filter(Recipe.is_active == filters.is_active)
         
-        return query.offset(skip).limit(limit).all()
+        return query
+    
+    def get_recipes(self, skip: int = 0, limit: int = 100, filters: RecipeFilter = None,
+                    cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> KeysetPage:
+        """Get a page of recipes ordered by (name, id) with optional filtering."""
+        query = project(self._filtered_query(filters), Recipe, fields, Recipe.name, Recipe.id)
+        total = cached_total(query, Recipe.__tablename__, filter_signature(filters))
+        items, next_cursor = paginate_keyset(query, Recipe.name, Recipe.id, limit, cursor, offset=skip)
+        return KeysetPage(items, next_cursor, total, limit)
     
     def get_recipe(self, recipe_id: int) -> Optional[Recipe]:
         """Get recipe by ID."""
         return self.db.query(Recipe).filter(Recipe.id == recipe_id, Recipe.is_active == True).first()
     
+    def get_recipes_by_ids(self, recipe_ids: List[int]) -> Dict[int, Recipe]:
+        """Get active recipes by ID in one IN query, keyed by id."""
+        return BatchLoader(self.db, Recipe).load_many(recipe_ids)
+    
     def create_recipe(self, recipe_data: RecipeCreate) -> Recipe:
         """Create a new recipe."""
         # Convert ingredients list to JSON string
@@ -69,8 +70,11 @@ class RecipeService:
         
         recipe = Recipe(**recipe_dict)
         self.db.add(recipe)
+        bump_catalog_version(self.db, "recipe")
         self.db.commit()
         self.db.refresh(recipe)
+        count_cache.invalidate(Recipe.__tablename__)
+        invalidate_recipe_index()
         return recipe
     
     def update_recipe(self, recipe_id: int, recipe_data: RecipeUpdate) -> Optional[Recipe]:
@@ -90,8 +94,11 @@ class RecipeService:
         for field, value in update_data.items():
             setattr(recipe, field, value)
         
+        bump_catalog_version(self.db, "recipe")
         self.db.commit()
         self.db.refresh(recipe)
+        count_cache.invalidate(Recipe.__tablename__)
+        invalidate_recipe_index()
         return recipe
     
     def delete_recipe(self, recipe_id: int) -> bool:
@@ -101,7 +108,10 @@ class RecipeService:
             return False
         
         recipe.is_active = False
+        bump_catalog_version(self.db, "recipe")
         self.db.commit()
+        count_cache.invalidate(Recipe.__tablename__)
+        invalidate_recipe_index()
         return True
     
     def search_recipes(self, query: str, limit: int = 50) -> List[Recipe]:
@@ -135,31 +145,31 @@ class RecipeService:
     
     def get_recipes_for_user(self, user_preferences: dict, target_calories: float = None, limit: int = 100) -> List[Recipe]:
         """Get recipes suitable for user's dietary preferences and calorie goals."""
-        query = self.db.query(Recipe).filter(Recipe.is_active == True)
+        required = {
+            name: True for name in ('is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_paleo', 'is_keto')
+            if user_preferences.get(name)
+        }
         
-        # Apply dietary filters
-        if user_preferences.get('is_vegetarian'):
-            query = query.filter(Recipe.is_vegetarian == True)
-        if user_preferences.get('is_vegan'):
-            query = query.filter(Recipe.is_vegan == True)
-        if user_preferences.get('is_gluten_free'):
-            query = query.filter(Recipe.is_gluten_free == True)
-        if user_preferences.get('is_paleo'):
-            query = query.filter(Recipe.is_paleo == True)
-        if user_preferences.get('is_keto'):
-            query = query.filter(Recipe.is_keto == True)
+        # Filter out allergens
+        allergies = [a.strip() for a in user_preferences.get('allergies', [])]
+        if 'nuts' in allergies:
+            required['is_nut_free'] = True
+        if 'dairy' in allergies:
+            required['is_dairy_free'] = True
         
         # Apply calorie constraints
+        max_meal_calories = None
         if target_calories:
             # For meal planning, each meal should be roughly 1/3 of daily calories
             max_meal_calories = target_calories / 3 * 1.5  # Allow some flexibility
-            query = query.filter(Recipe.calories <= max_meal_calories)
         
-        # Filter out allergens
-        allergies = user_preferences.get('allergies', [])
-        if 'nuts' in allergies:
-            query = query.filter(Recipe.is_nut_free == True)
-        if 'dairy' in allergies:
-            query = query.filter(Recipe.is_dairy_free == True)
+        # One vectorized pass over the in-memory catalog index, then a primary-key fetch
+        mask, value = dietary_mask(required)
+        recipe_ids = get_recipe_index(self.db).match(mask, value, max_calories=max_meal_calories)[:limit]
+        if len(recipe_ids) == 0:
+            return []
         
-        return query.limit(limit).all() 
\ No newline at end of file
+        return self.db.query(Recipe).filter(
+            Recipe.id.in_(recipe_ids.tolist()),
+            Recipe.is_active == True
+        ).order_by(Recipe.id).all()
@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, distinct, select
+from sqlalchemy.orm import Session
+
+from models.exercise import Exercise
+from models.feedback import UserItemFeedbackStats
+from models.recipe import Recipe
+from models.recommendation import RecommendationModel, UserRecommendation
+from services.preference_model import FEEDBACK_EVIDENCE
+
+ITEM_MODELS = {"exercise": Exercise, "recipe": Recipe}
+
+DEFAULT_FACTORS = 32
+DEFAULT_REGULARIZATION = 0.1
+DEFAULT_CONFIDENCE_ALPHA = 10.0
+DEFAULT_ITERATIONS = 10
+DEFAULT_TOP_N = 50
+USER_BLOCK_SIZE = 1000
+# Feedback stamped just before a run but committed after its query is picked up by the next run
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class FeedbackMatrix:
+    """Sparse user x item feedback in CSR-like form, built from user_item_feedback_stats.
+
+    Each cell holds a signed signal (positive minus negative evidence); implicit
+    ALS turns it into a 0/1 preference with confidence 1 + alpha * |signal|.
+    """
+
+    def __init__(self, user_ids: np.ndarray, item_ids: np.ndarray,
+                 rows: np.ndarray, cols: np.ndarray, signal: np.ndarray):
+        order = np.lexsort((cols, rows))
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.rows = rows[order]
+        self.cols = cols[order]
+        self.signal = signal[order]
+        self.indptr = np.searchsorted(self.rows, np.arange(len(user_ids) + 1))
+
+    @classmethod
+    def from_stats(cls, stats_rows: Sequence[Tuple], item_ids: Optional[np.ndarray] = None) -> "FeedbackMatrix":
+        """Build from (user_id, item_id, completed, liked, skipped, too_hard) tuples.
+
+        With `item_ids` given, items outside it are dropped (used for fold-in).
+        """
+        data = np.array(stats_rows, dtype=np.float64).reshape(-1, 6)
+        users, items = data[:, 0].astype(np.int64), data[:, 1].astype(np.int64)
+        positive = data[:, 2] * FEEDBACK_EVIDENCE["completed"][0] + data[:, 3] * FEEDBACK_EVIDENCE["liked"][0]
+        negative = data[:, 4] * FEEDBACK_EVIDENCE["skipped"][1] + data[:, 5] * FEEDBACK_EVIDENCE["too_hard"][1]
+        signal = positive - negative
+
+        if item_ids is None:
+            item_ids = np.unique(items)
+        else:
+            known = np.isin(items, item_ids)
+            users, items, signal = users[known], items[known], signal[known]
+        user_ids, rows = np.unique(users, return_inverse=True)
+        cols = np.searchsorted(item_ids, items)
+        return cls(user_ids, item_ids, rows, cols, signal)
+
+    def transpose(self) -> "FeedbackMatrix":
+        return FeedbackMatrix(self.item_ids, self.user_ids, self.cols, self.rows, self.signal)
+
+
+def _solve_rows(matrix: FeedbackMatrix, fixed: np.ndarray, regularization: float, alpha: float) -> np.ndarray:
+    """One implicit-ALS half step: solve every row's factors against the fixed side."""
+    k = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(k)
+    solved = np.zeros((len(matrix.indptr) - 1, k))
+    for row in range(len(solved)):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        if start == end:
+            continue
+        cols = matrix.cols[start:end]
+        signal = matrix.signal[start:end]
+        confidence = 1.0 + alpha * np.abs(signal)
+        preference = (signal > 0).astype(np.float64)
+        observed = fixed[cols]
+        # (YtY + Yt(Cu - I)Y + lambda I) x = Yt Cu p, touching only the observed items
+        a = gram + (observed.T * (confidence - 1.0)) @ observed
+        b = (observed.T * confidence) @ preference
+        solved[row] = np.linalg.solve(a, b)
+    return solved
+
+
+def train_implicit_als(matrix: FeedbackMatrix, factors: int, regularization: float, alpha: float,
+                       iterations: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Alternating least squares for implicit feedback; returns (user factors, item factors)."""
+    transposed = matrix.transpose()
+    item_factors = rng.normal(scale=0.01, size=(len(matrix.item_ids), factors))
+    user_factors = np.zeros((len(matrix.user_ids), factors))
+    for _ in range(iterations):
+        user_factors = _solve_rows(matrix, item_factors, regularization, alpha)
+        item_factors = _solve_rows(transposed, user_factors, regularization, alpha)
+    return user_factors, item_factors
+
+
+def top_n(scores: np.ndarray, exclude: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n best scores, best first, skipping excluded columns."""
+    scores = scores.copy()
+    scores[exclude] = -np.inf
+    n = min(n, int(np.isfinite(scores).sum()))
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, n - 1)[:n]
+    return best[np.argsort(-scores[best])]
+
+
+class RecommendationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_recommendations(self, user_id: int, item_type: str) -> Optional[UserRecommendation]:
+        """Get the user's precomputed list (primary-key read)."""
+        return self.db.get(UserRecommendation, (user_id, item_type))
+
+    def train(self, item_type: str, factors: int = DEFAULT_FACTORS,
+              regularization: float = DEFAULT_REGULARIZATION, alpha: float = DEFAULT_CONFIDENCE_ALPHA,
+              iterations: int = DEFAULT_ITERATIONS, top: int = DEFAULT_TOP_N, seed: int = 0) -> Dict[str, Any]:
+        """Full run: factorize all feedback for one item type and rewrite every user's list."""
+        started_at = datetime.now(timezone.utc)
+        matrix = FeedbackMatrix.from_stats(self._stats_rows(item_type))
+        if len(matrix.user_ids) == 0:
+            return {"item_type": item_type, "users": 0, "items": 0}
+
+        user_factors, item_factors = train_implicit_als(
+            matrix, factors, regularization, alpha, iterations, np.random.default_rng(seed)
+        )
+
+        model = self.db.get(RecommendationModel, item_type)
+        if model is None:
+            model = RecommendationModel(item_type=item_type, version=0)
+            self.db.add(model)
+        model.version += 1
+        model.factors = factors
+        model.regularization = regularization
+        model.confidence_alpha = alpha
+        model.item_ids = matrix.item_ids.astype("<i4").tobytes()
+        model.item_factors = item_factors.astype("<f4").tobytes()
+        model.trained_at = started_at
+        model.refreshed_at = started_at
+
+        self.db.execute(delete(UserRecommendation.__table__).where(UserRecommendation.item_type == item_type))
+        self._write_recommendations(item_type, matrix, user_factors, item_factors, model.version, top)
+        self.db.commit()
+        return {"item_type": item_type, "users": len(matrix.user_ids), "items": len(matrix.item_ids),
+                "version": model.version}
+
+    def refresh(self, item_type: str, top: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+        """Incremental run: fold in users with feedback since the last run against the stored item factors.
+
+        "Since" is judged by the server-side updated_at of the user's stats,
+        never by the client-supplied last_feedback_at.
+        """
+        model = self.db.get(RecommendationModel, item_type)
+        if model is None:
+            return self.train(item_type, top=top)
+
+        started_at = datetime.now(timezone.utc)
+        stats = UserItemFeedbackStats
+        changed = list(self.db.execute(
+            select(distinct(stats.user_id)).where(
+                stats.item_type == item_type, stats.updated_at > model.refreshed_at - REFRESH_OVERLAP
+            )
+        ).scalars())
+
+        item_ids = np.frombuffer(model.item_ids, "<i4").astype(np.int64)
+        item_factors = np.frombuffer(model.item_factors, "<f4").reshape(len(item_ids), model.factors).astype(np.float64)
+        for start in range(0, len(changed), USER_BLOCK_SIZE):
+            block = changed[start:start + USER_BLOCK_SIZE]
+            matrix = FeedbackMatrix.from_stats(self._stats_rows(item_type, block), item_ids)
+            user_factors = _solve_rows(matrix, item_factors, model.regularization, model.confidence_alpha)
+            self.db.execute(delete(UserRecommendation.__table__).where(
+                UserRecommendation.item_type == item_type,
+                UserRecommendation.user_id.in_(matrix.user_ids.tolist())
+            ))
+            self._write_recommendations(item_type, matrix, user_factors, item_factors, model.version, top)
+            self.db.commit()
+
+        model.refreshed_at = started_at
+        self.db.commit()
+        return {"item_type": item_type, "users": len(changed), "version": model.version}
+
+    def _stats_rows(self, item_type: str, user_ids: Optional[List[int]] = None) -> List[Tuple]:
+        stats = UserItemFeedbackStats
+        query = select(
+            stats.user_id, stats.item_id, stats.completed_count, stats.liked_count,
+            stats.skipped_count, stats.too_hard_count,
+        ).where(stats.item_type == item_type)
+        if user_ids is not None:
+            query = query.where(stats.user_id.in_(user_ids))
+        return self.db.execute(query).all()
+
+    def _write_recommendations(self, item_type: str, matrix: FeedbackMatrix, user_factors: np.ndarray,
+                               item_factors: np.ndarray, version: int, top: int) -> None:
+        """Score users in blocks and bulk-insert their top-N lists."""
+        item_model = ITEM_MODELS[item_type]
+        active = set(self.db.execute(select(item_model.id).where(item_model.is_active == True)).scalars())
+        inactive = ~np.isin(matrix.item_ids, list(active))
+        generated_at = datetime.now(timezone.utc)
+
+        for start in range(0, len(matrix.user_ids), USER_BLOCK_SIZE):
+            end = min(start + USER_BLOCK_SIZE, len(matrix.user_ids))
+            scores = user_factors[start:end] @ item_factors.T
+            mappings = []
+            for offset, row in enumerate(range(start, end)):
+                # Never recommend what the user already rated or what left the catalog
+                seen = matrix.cols[matrix.indptr[row]:matrix.indptr[row + 1]]
+                exclude = inactive.copy()
+                exclude[seen] = True
+                best = top_n(scores[offset], exclude, top)
+                mappings.append({
+                    "user_id": int(matrix.user_ids[row]),
+                    "item_type": item_type,
+                    "items": [
+                        {"item_id": int(matrix.item_ids[i]), "score": round(float(scores[offset, i]), 4)}
+                        for i in best
+                    ],
+                    "model_version": version,
+                    "generated_at": generated_at,
+                })
+            self.db.bulk_insert_mappings(UserRecommendation, mappings)
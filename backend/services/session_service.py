@@ -0,0 +1,146 @@
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.session import UserSession, RefreshToken
+from revocation import revocation_list
+
+PURGE_INTERVAL_SECONDS = 3600
+_last_purge = 0.0
+
+
+class InvalidRefreshToken(Exception):
+    """Unknown or expired refresh token, or its session was revoked."""
+
+class RefreshTokenReuse(InvalidRefreshToken):
+    """An already rotated refresh token was presented again; its session has been revoked."""
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_session(self, user_id: int, device: Optional[str] = None, ip_address: Optional[str] = None) -> UserSession:
+        """Start a session for a login; its id goes into every token issued for it."""
+        now = datetime.now(timezone.utc)
+        session = UserSession(
+            id=secrets.token_hex(16),
+            user_id=user_id,
+            device=(device or "")[:255] or None,
+            ip_address=ip_address,
+            created_at=now,
+            last_active_at=now,
+            expires_at=now + timedelta(days=settings.session_ttl_days),
+        )
+        self.db.add(session)
+        self.db.commit()
+        return session
+
+    def get_active_session(self, session_id: str, user_id: int) -> Optional[UserSession]:
+        return self.db.query(UserSession).filter(
+            UserSession.id == session_id,
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > datetime.now(timezone.utc),
+        ).first()
+
+    def touch(self, session: UserSession) -> None:
+        session.last_active_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+    def get_active_sessions(self, user_id: int) -> List[UserSession]:
+        """The user's unrevoked, unexpired sessions, most recently active first."""
+        return self.db.query(UserSession).filter(
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > datetime.now(timezone.utc),
+        ).order_by(UserSession.last_active_at.desc()).all()
+
+    def revoke_session(self, session_id: str, user_id: int) -> bool:
+        """Revoke one of the user's sessions; False if it doesn't exist or is already revoked."""
+        revoked = self.db.query(UserSession).filter(
+            UserSession.id == session_id,
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+        ).update({"revoked_at": datetime.now(timezone.utc)}, synchronize_session=False)
+        self.db.commit()
+        if revoked:
+            revocation_list.add([session_id])
+        return bool(revoked)
+
+    def revoke_all_sessions(self, user_id: int, except_session_id: Optional[str] = None) -> int:
+        """Revoke every active session of the user (but `except_session_id`); returns how many."""
+        query = self.db.query(UserSession.id).filter(
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > datetime.now(timezone.utc),
+        )
+        if except_session_id is not None:
+            query = query.filter(UserSession.id != except_session_id)
+        session_ids = [session_id for session_id, in query.all()]
+        if not session_ids:
+            return 0
+        self.db.query(UserSession).filter(UserSession.id.in_(session_ids)).update(
+            {"revoked_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        self.db.commit()
+        revocation_list.add(session_ids)
+        return len(session_ids)
+
+    def issue_refresh_token(self, session: UserSession) -> str:
+        """New refresh token for the session, valid until the session expires; only its hash is stored."""
+        token = secrets.token_urlsafe(32)
+        self.db.add(RefreshToken(
+            token_hash=hash_refresh_token(token),
+            session_id=session.id,
+            expires_at=session.expires_at,
+        ))
+        self.db.commit()
+        return token
+
+    def rotate_refresh_token(self, token: str) -> Tuple[UserSession, str]:
+        """Spend a refresh token and issue its successor in the same session.
+
+        A token that was already spent means one copy was stolen, so the whole
+        session (every token in the family) is revoked.
+        """
+        self._purge_expired_refresh_tokens()
+        now = datetime.now(timezone.utc)
+        found = self.db.query(RefreshToken, UserSession, RefreshToken.expires_at > now).join(
+            UserSession, UserSession.id == RefreshToken.session_id
+        ).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+        if found is None:
+            raise InvalidRefreshToken("Invalid refresh token")
+        row, session, live = found
+        if session.revoked_at is not None or not live:
+            raise InvalidRefreshToken("Session has expired or been revoked")
+
+        # Conditional update, so of two concurrent uses only one can succeed
+        spent = self.db.query(RefreshToken).filter(
+            RefreshToken.id == row.id, RefreshToken.used_at.is_(None)
+        ).update({"used_at": now}, synchronize_session=False)
+        self.db.commit()
+        if not spent:
+            self.revoke_session(session.id, session.user_id)
+            raise RefreshTokenReuse("Refresh token was already used; the session has been signed out")
+
+        self.touch(session)
+        return session, self.issue_refresh_token(session)
+
+    def _purge_expired_refresh_tokens(self) -> None:
+        global _last_purge
+        if time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = time.monotonic()
+        self.db.query(RefreshToken).filter(
+            RefreshToken.expires_at <= datetime.now(timezone.utc)
+        ).delete(synchronize_session=False)
+        self.db.commit()
@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Float, Integer, bindparam, cast, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from models.job import JobCheckpoint
+from models.user import ActivityLevelEnum, GenderEnum, GoalEnum, User
+
+# Mifflin-St Jeor: 10 * kg + 6.25 * cm - 5 * age + sex offset
+BMR_SEX_OFFSETS = {GenderEnum.MALE.value: 5.0}
+DEFAULT_BMR_SEX_OFFSET = -161.0  # FEMALE or OTHER
+
+ACTIVITY_MULTIPLIERS = {
+    ActivityLevelEnum.SEDENTARY.value: 1.2,
+    ActivityLevelEnum.LIGHT.value: 1.375,
+    ActivityLevelEnum.MODERATE.value: 1.55,
+    ActivityLevelEnum.ACTIVE.value: 1.725,
+    ActivityLevelEnum.VERY_ACTIVE.value: 1.9,
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.2
+
+GOAL_CALORIE_OFFSETS = {
+    GoalEnum.LOSE_WEIGHT.value: -500.0,  # 500 calorie deficit for 1 lb/week loss
+    GoalEnum.GAIN_MUSCLE.value: 300.0,  # 300 calorie surplus for muscle gain
+}
+DEFAULT_GOAL_CALORIE_OFFSET = 0.0  # MAINTAIN
+
+JOB_NAME = "user_metrics"
+DEFAULT_CHUNK_SIZE = 5000
+# Rows per UPDATE ... FROM (VALUES ...) statement (4 parameters each)
+WRITE_BATCH_SIZE = 5000
+
+METRIC_COLUMNS = ("bmr", "tdee", "target_calories")
+
+
+def _lookup(keys: Sequence[Any], table: Dict[str, float], default: float) -> np.ndarray:
+    """Map a column of category strings to numbers, one dict lookup per distinct value."""
+    distinct, inverse = np.unique(np.asarray(keys, dtype=object).astype(str), return_inverse=True)
+    return np.array([table.get(key, default) for key in distinct], dtype=np.float64)[inverse]
+
+
+def compute_metrics(age: Sequence, gender: Sequence, height_cm: Sequence, weight_kg: Sequence,
+                    activity_level: Sequence, goal: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """BMR, TDEE and target calories for many users at once.
+
+    BMR is NaN where age, gender, height or weight is missing; TDEE and target
+    are also NaN where the activity level is missing.
+    """
+    age = np.array(age, dtype=np.float64)
+    height = np.array(height_cm, dtype=np.float64)
+    weight = np.array(weight_kg, dtype=np.float64)
+    has_gender = np.array([bool(g) for g in gender], dtype=bool)
+    has_activity = np.array([bool(a) for a in activity_level], dtype=bool)
+
+    complete = has_gender & (np.nan_to_num(age) != 0) & (np.nan_to_num(height) != 0) & (np.nan_to_num(weight) != 0)
+    bmr = 10 * weight + 6.25 * height - 5 * age + _lookup(gender, BMR_SEX_OFFSETS, DEFAULT_BMR_SEX_OFFSET)
+    bmr = np.where(complete, bmr, np.nan)
+    tdee = np.where(has_activity, bmr * _lookup(activity_level, ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_MULTIPLIER), np.nan)
+    target = tdee + _lookup(goal, GOAL_CALORIE_OFFSETS, DEFAULT_GOAL_CALORIE_OFFSET)
+    return np.round(bmr, 2), np.round(tdee, 2), np.round(target, 2)
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class UserMetricsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recompute_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE, restart: bool = False,
+                      progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Recompute BMR/TDEE/target calories for every user, in id order.
+
+        Each chunk is read, computed and written in one transaction together
+        with the checkpoint, so an interrupted run resumes after the last
+        committed chunk. Only rows whose metrics change are written.
+        """
+        checkpoint = self._checkpoint(restart)
+        users = User.__table__
+        remaining = self.db.execute(
+            select(func.count()).select_from(users).where(users.c.id > checkpoint.last_id)
+        ).scalar()
+        self.db.commit()
+
+        while True:
+            rows = self.db.execute(
+                select(users.c.id, users.c.age, users.c.gender, users.c.height_cm, users.c.weight_kg,
+                       users.c.activity_level, users.c.goal, *(users.c[c] for c in METRIC_COLUMNS))
+                .where(users.c.id > checkpoint.last_id)
+                .order_by(users.c.id)
+                .limit(chunk_size)
+                .with_for_update()  # Profile edits wait for the chunk instead of being overwritten
+            ).all()
+            if not rows:
+                break
+
+            columns = list(zip(*rows))
+            ids = np.array(columns[0], dtype=np.int64)
+            stored = np.array(columns[7:10], dtype=np.float64)
+            computed = np.vstack(compute_metrics(*columns[1:7]))
+            # Keep what's stored where the inputs are incomplete, like a profile edit would
+            computed = np.where(np.isnan(computed), stored, computed)
+            unchanged = (computed == stored) | (np.isnan(computed) & np.isnan(stored))
+            changed = ~unchanged.all(axis=0)
+
+            written = self._write(ids[changed], computed[:, changed])
+            checkpoint.last_id = int(ids[-1])
+            checkpoint.processed += len(rows)
+            checkpoint.updated += written
+            self.db.commit()
+
+            remaining = max(remaining - len(rows), 0)
+            if progress:
+                progress({"processed": checkpoint.processed, "updated": checkpoint.updated,
+                          "last_id": checkpoint.last_id, "remaining": remaining})
+
+        checkpoint.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return {"processed": checkpoint.processed, "updated": checkpoint.updated, "last_id": checkpoint.last_id}
+
+    def _checkpoint(self, restart: bool) -> JobCheckpoint:
+        """Resume the unfinished run, or start a new one."""
+        checkpoint = self.db.get(JobCheckpoint, JOB_NAME)
+        if checkpoint is None:
+            checkpoint = JobCheckpoint(name=JOB_NAME)
+            self.db.add(checkpoint)
+        if restart or checkpoint.completed_at is not None or checkpoint.started_at is None:
+            checkpoint.last_id = 0
+            checkpoint.processed = 0
+            checkpoint.updated = 0
+            checkpoint.started_at = datetime.now(timezone.utc)
+            checkpoint.completed_at = None
+        self.db.commit()
+        return checkpoint
+
+    def _write(self, ids: np.ndarray, metrics: np.ndarray) -> int:
+        """Batched metric updates: UPDATE ... FROM (VALUES ...) on Postgres, executemany elsewhere."""
+        if len(ids) == 0:
+            return 0
+        users = User.__table__
+        rows = [
+            (int(user_id), _nullable(bmr), _nullable(tdee), _nullable(target))
+            for user_id, bmr, tdee, target in zip(ids, *metrics)
+        ]
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            for start in range(0, len(rows), WRITE_BATCH_SIZE):
+                source = values(
+                    column("id", Integer), *(column(c, Float) for c in METRIC_COLUMNS), name="v"
+                ).data(rows[start:start + WRITE_BATCH_SIZE])
+                # Casts keep all-NULL VALUES columns from being typed as text
+                self.db.execute(
+                    update(users).where(users.c.id == source.c.id)
+                    .values({c: cast(source.c[c], Float) for c in METRIC_COLUMNS})
+                )
+        else:
+            # SQLite can't name the columns of a VALUES list
+            self.db.execute(
+                update(users).where(users.c.id == bindparam("user_id"))
+                .values({c: bindparam(f"new_{c}") for c in METRIC_COLUMNS}),
+                [dict(user_id=row[0], **{f"new_{c}": v for c, v in zip(METRIC_COLUMNS, row[1:])}) for row in rows]
+            )
+        return len(rows)
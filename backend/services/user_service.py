@@ -3,8 +3,11 @@ from typing import Optional, Dict, Any
 from datetime import date
 import json
 
-from models.user import User, ActivityLevelEnum, GoalEnum, GenderEnum
+import numpy as np
+
+from models.user import User, GoalEnum
 from schemas.user import UserProfileUpdate
+from services.user_metrics import compute_metrics
 
 class UserService:
     def __init__(self, db: Session):
@@ -56,39 +59,18 @@ class UserService:
     
     def _calculate_user_metrics(self, user: User) -> None:
         """Calculate BMR, TDEE, and target calories using Mifflin-St Jeor equation."""
-        if not all([user.age, user.gender, user.height_cm, user.weight_kg]):
+        bmr, tdee, target_calories = compute_metrics(
+            [user.age], [user.gender], [user.height_cm], [user.weight_kg], [user.activity_level], [user.goal]
+        )
+        if np.isnan(bmr[0]):
             return
         
-        # Mifflin-St Jeor Equation for BMR
-        if user.gender == GenderEnum.MALE:
-            bmr = 10 * user.weight_kg + 6.25 * user.height_cm - 5 * user.age + 5
-        else:  # FEMALE or OTHER
-            bmr = 10 * user.weight_kg + 6.25 * user.height_cm - 5 * user.age - 161
-        
-        user.bmr = round(bmr, 2)
-        
-        # Calculate TDEE based on activity level
-        activity_multipliers = {
-            ActivityLevelEnum.SEDENTARY: 1.2,
-            ActivityLevelEnum.LIGHT: 1.375,
-            ActivityLevelEnum.MODERATE: 1.55,
-            ActivityLevelEnum.ACTIVE: 1.725,
-            ActivityLevelEnum.VERY_ACTIVE: 1.9
-        }
+        user.bmr = float(bmr[0])
         
-        if user.activity_level:
-            tdee = bmr * activity_multipliers.get(user.activity_level, 1.2)
-            user.tdee = round(tdee, 2)
-            
-            # Calculate target calories based on goal
-            if user.goal == GoalEnum.LOSE_WEIGHT:
-                target_calories = tdee - 500  # 500 calorie deficit for 1 lb/week loss
-            elif user.goal == GoalEnum.GAIN_MUSCLE:
-                target_calories = tdee + 300  # 300 calorie surplus for muscle gain
-            else:  # MAINTAIN or IMPROVE_FITNESS
-                target_calories = tdee
-            
-            user.target_calories = round(target_calories, 2)
+        # TDEE and targets need an activity level
+        if not np.isnan(tdee[0]):
+            user.tdee = float(tdee[0])
+            user.target_calories = float(target_calories[0])
     
     def calculate_bmi(self, user: User) -> Optional[float]:
         """Calculate BMI for a user."""
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for performance work.
+
+Bulk-loads users, exercises, recipes, plans and feedback logs with realistic
+distributions so query plans and benchmarks can be measured at production-like
+volumes. PostgreSQL is loaded with COPY; other databases use batched
+executemany inserts.
+
+Usage:
+    python synthetic_data.py --users 1000000 --exercises 5000 --recipes 50000
+    python synthetic_data.py --users 10000 --truncate   # wipe ALL rows first
+
+Every synthetic user can log in as user<N>@synthetic.fitgenius.com with
+SYNTHETIC_PASSWORD (the benchmark suite relies on this).
+"""
+
+import argparse
+import csv
+import io
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+from sqlalchemy import JSON, select, text
+
+from database import Base, SessionLocal, engine
+from models.exercise import Exercise, MuscleGroupEnum
+from models.plan import Plan, UserFeedbackLog
+from models.recipe import Recipe, DIETARY_FLAGS, DIETARY_FLAG_BITS
+from models.user import User
+from auth import get_password_hash
+from services.feedback_service import FeedbackService
+from services.preference_model import PreferenceStore
+from services.user_metrics import compute_metrics
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.fitgenius.com"
+SYNTHETIC_PASSWORD = "Synthetic-Pass-123"
+
+EQUIPMENT = ["bodyweight", "dumbbell", "barbell", "kettlebell", "resistance_band", "machine", "cable", "pull_up_bar"]
+EQUIPMENT_PROFILES = [
+    (["bodyweight"], 0.35),
+    (["bodyweight", "dumbbell"], 0.25),
+    (["bodyweight", "resistance_band"], 0.10),
+    (["bodyweight", "dumbbell", "kettlebell"], 0.08),
+    (["bodyweight", "dumbbell", "barbell", "machine", "cable", "pull_up_bar"], 0.22),
+]
+MOVEMENTS = {
+    "chest": ["Press", "Fly", "Push-up", "Dip"],
+    "back": ["Row", "Pull-down", "Pull-up", "Deadlift"],
+    "legs": ["Squat", "Lunge", "Leg Press", "Hip Thrust", "Calf Raise"],
+    "shoulders": ["Overhead Press", "Lateral Raise", "Face Pull"],
+    "arms": ["Curl", "Extension", "Kickback"],
+    "core": ["Plank", "Crunch", "Leg Raise", "Russian Twist"],
+    "cardio": ["Burpee", "Jumping Jack", "Mountain Climber", "Sprint"],
+    "full_body": ["Clean", "Thruster", "Turkish Get-up"],
+}
+MODIFIERS = ["Incline", "Decline", "Single-arm", "Tempo", "Paused", "Wide", "Close-grip", "Alternating", "Banded", "Standing", "Seated"]
+MEAL_CALORIES = {"breakfast": 450, "lunch": 650, "dinner": 750, "snack": 220}
+CUISINES = ["american", "italian", "mexican", "indian", "japanese", "mediterranean", "thai", "french", "middle_eastern"]
+INGREDIENTS = ["chicken breast", "salmon", "tofu", "eggs", "greek yogurt", "oats", "rice", "quinoa", "sweet potato",
+               "broccoli", "spinach", "avocado", "almonds", "lentils", "chickpeas", "beef", "pasta", "berries", "banana"]
+FEEDBACK_TYPES = ["completed", "skipped", "too_hard", "liked"]
+
+ACTIVITY_LEVELS = ["sedentary", "light", "moderate", "active", "very_active"]
+GOALS = ["weight_loss", "maintenance", "muscle_gain"]
+
+
+class BulkLoader:
+    """Insert row tuples in batches - COPY on PostgreSQL, executemany elsewhere."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.use_copy = engine.dialect.name == "postgresql"
+
+    def load(self, table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        json_columns = {name for name in columns if isinstance(table.c[name].type, JSON)}
+        total = 0
+        batch: List[tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                total += self._flush(table, columns, json_columns, batch)
+                batch = []
+        if batch:
+            total += self._flush(table, columns, json_columns, batch)
+        return total
+
+    def _flush(self, table, columns, json_columns, batch) -> int:
+        if self.use_copy:
+            self._copy(table, columns, json_columns, batch)
+        else:
+            with engine.begin() as conn:
+                conn.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+        return len(batch)
+
+    def _copy(self, table, columns, json_columns, batch) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        json_positions = [i for i, name in enumerate(columns) if name in json_columns]
+        for row in batch:
+            if json_positions:
+                row = list(row)
+                for i in json_positions:
+                    if row[i] is not None:
+                        row[i] = json.dumps(row[i])
+            writer.writerow(row)
+        buffer.seek(0)
+
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+
+def _chunks(total: int, size: int) -> Iterator[tuple]:
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+def _random_datetimes(rng, count: int, days_back: int) -> List[datetime]:
+    now = datetime.utcnow()
+    offsets = rng.uniform(0, days_back * 86400, size=count)
+    return [now - timedelta(seconds=float(s)) for s in offsets]
+
+
+def user_rows(rng, count: int, first_index: int, chunk_size: int) -> Iterator[tuple]:
+    password_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    profile_weights = np.array([p for _, p in EQUIPMENT_PROFILES])
+
+    for start, n in _chunks(count, chunk_size):
+        gender = rng.choice(["male", "female", "other"], size=n, p=[0.48, 0.48, 0.04])
+        male = gender == "male"
+        age = np.clip(rng.normal(36, 12, n), 16, 80).astype(int)
+        height = np.clip(np.where(male, rng.normal(178, 7, n), rng.normal(165, 7, n)), 140, 210).astype(int)
+        bmi = np.clip(rng.normal(25.5, 4.5, n), 16, 45)
+        weight = np.round(bmi * (height / 100) ** 2, 1)
+        activity = rng.choice(len(ACTIVITY_LEVELS), size=n, p=[0.25, 0.30, 0.25, 0.15, 0.05])
+        goal = rng.choice(len(GOALS), size=n, p=[0.45, 0.25, 0.30])
+
+        bmr, tdee, target = compute_metrics(
+            age, gender, height, weight, np.array(ACTIVITY_LEVELS)[activity], np.array(GOALS)[goal]
+        )
+
+        equipment = rng.choice(len(EQUIPMENT_PROFILES), size=n, p=profile_weights / profile_weights.sum())
+        days = rng.choice([2, 3, 4, 5, 6], size=n, p=[0.10, 0.35, 0.30, 0.18, 0.07])
+        duration = rng.choice([30, 45, 60, 75, 90], size=n, p=[0.20, 0.35, 0.30, 0.10, 0.05])
+        vegetarian = rng.random(n) < 0.12
+        vegan = vegetarian & (rng.random(n) < 0.30)
+        gluten_free = rng.random(n) < 0.08
+        paleo = ~vegetarian & (rng.random(n) < 0.04)
+        keto = ~vegan & (rng.random(n) < 0.05)
+        allergies = rng.choice(["", "nuts", "dairy", "nuts,dairy"], size=n, p=[0.85, 0.07, 0.06, 0.02])
+        created_at = _random_datetimes(rng, n, 730)
+
+        for i in range(n):
+            yield (
+                f"user{first_index + start + i}@{SYNTHETIC_EMAIL_DOMAIN}", password_hash, created_at[i], 1,
+                int(age[i]), str(gender[i]), int(height[i]), float(weight[i]),
+                ACTIVITY_LEVELS[activity[i]], GOALS[goal[i]],
+                round(float(bmr[i]), 2), round(float(tdee[i]), 2), round(float(target[i]), 2),
+                EQUIPMENT_PROFILES[equipment[i]][0], int(days[i]), int(duration[i]),
+                bool(vegetarian[i]), bool(vegan[i]), bool(gluten_free[i]), bool(paleo[i]), bool(keto[i]),
+                allergies[i] or None,
+            )
+
+
+USER_COLUMNS = [
+    "email", "hashed_password", "created_at", "is_active",
+    "age", "gender", "height_cm", "weight_kg", "activity_level", "goal",
+    "bmr", "tdee", "target_calories",
+    "available_equipment", "workout_days_per_week", "workout_duration_minutes",
+    "is_vegetarian", "is_vegan", "is_gluten_free", "is_paleo", "is_keto", "allergies",
+]
+
+
+def exercise_rows(rng, count: int, chunk_size: int) -> Iterator[tuple]:
+    groups = [g.value for g in MuscleGroupEnum]
+    # Popular muscle groups get more variations, like a real catalog
+    group_weights = np.array([0.16, 0.16, 0.20, 0.12, 0.12, 0.12, 0.07, 0.05])
+
+    for start, n in _chunks(count, chunk_size):
+        group = rng.choice(len(groups), size=n, p=group_weights)
+        equipment = rng.choice(len(EQUIPMENT), size=n, p=[0.28, 0.22, 0.14, 0.08, 0.08, 0.10, 0.06, 0.04])
+        difficulty = rng.choice(["beginner", "intermediate", "advanced"], size=n, p=[0.45, 0.40, 0.15])
+        modifier = rng.integers(0, len(MODIFIERS), n)
+        sets = rng.integers(2, 6, n)
+        reps_min = rng.choice([5, 6, 8, 10, 12, 15], size=n)
+        rest = rng.choice([30, 45, 60, 90, 120, 180], size=n)
+        compound = rng.random(n) < 0.4
+
+        for i in range(n):
+            muscle = groups[group[i]]
+            movement = MOVEMENTS[muscle][(start + i) % len(MOVEMENTS[muscle])]
+            equip = EQUIPMENT[equipment[i]]
+            name = f"{MODIFIERS[modifier[i]]} {equip.replace('_', ' ').title()} {movement} #{start + i}"
+            yield (
+                name, f"Synthetic {muscle} exercise using {equip}.", muscle, equip, str(difficulty[i]),
+                "cardio" if muscle == "cardio" else "strength", bool(compound[i]),
+                int(sets[i]), int(reps_min[i]), int(reps_min[i] + 4), int(rest[i]),
+                f"Perform {movement.lower()} with controlled form.", [muscle, equip], True,
+            )
+
+
+EXERCISE_COLUMNS = [
+    "name", "description", "muscle_group", "equipment_needed", "difficulty_level",
+    "exercise_type", "is_compound", "default_sets", "default_reps_min", "default_reps_max",
+    "default_rest_seconds", "instructions", "tags", "is_active",
+]
+
+
+def recipe_rows(rng, count: int, chunk_size: int) -> Iterator[tuple]:
+    meal_types = list(MEAL_CALORIES)
+
+    for start, n in _chunks(count, chunk_size):
+        meal = rng.choice(len(meal_types), size=n, p=[0.25, 0.28, 0.32, 0.15])
+        base = np.array([MEAL_CALORIES[meal_types[m]] for m in meal])
+        calories = np.clip(rng.lognormal(np.log(base), 0.3), 60, 2000).astype(int)
+        split = rng.dirichlet([3, 5, 3], size=n)  # protein / carbs / fat share of calories
+        prep = np.clip(rng.gamma(2.0, 12.0, n), 3, 180).astype(int)
+        cuisine = rng.integers(0, len(CUISINES), n)
+        difficulty = rng.choice(["easy", "medium", "hard"], size=n, p=[0.55, 0.35, 0.10])
+
+        vegetarian = rng.random(n) < 0.35
+        flags = {
+            "is_vegetarian": vegetarian,
+            "is_vegan": vegetarian & (rng.random(n) < 0.35),
+            "is_gluten_free": rng.random(n) < 0.30,
+            "is_dairy_free": rng.random(n) < 0.30,
+            "is_nut_free": rng.random(n) < 0.70,
+            "is_paleo": ~vegetarian & (rng.random(n) < 0.10),
+            "is_keto": split[:, 1] < 0.2,
+            "is_low_carb": split[:, 1] < 0.3,
+            "is_high_protein": split[:, 0] > 0.35,
+            "is_meal_prep_friendly": rng.random(n) < 0.40,
+        }
+        flags["is_dairy_free"] |= flags["is_vegan"]
+        packed = np.zeros(n, dtype=np.int64)
+        for name in DIETARY_FLAGS:
+            packed |= np.where(flags[name], DIETARY_FLAG_BITS[name], 0)
+
+        ingredient_picks = rng.integers(0, len(INGREDIENTS), size=(n, 5))
+        for i in range(n):
+            cal = int(calories[i])
+            ingredients = [{"name": INGREDIENTS[k], "amount": "1 portion"} for k in set(ingredient_picks[i])]
+            yield (
+                f"{CUISINES[cuisine[i]].replace('_', ' ').title()} {meal_types[meal[i]].title()} Bowl #{start + i}",
+                "Synthetic recipe.", cal,
+                round(cal * split[i, 0] / 4, 1), round(cal * split[i, 1] / 4, 1), round(cal * split[i, 2] / 9, 1),
+                meal_types[meal[i]], CUISINES[cuisine[i]], str(difficulty[i]), int(prep[i]),
+                ingredients, "Combine ingredients and serve.", [meal_types[meal[i]]],
+                *(bool(flags[name][i]) for name in DIETARY_FLAGS),
+                int(packed[i]), True,
+            )
+
+
+RECIPE_COLUMNS = [
+    "name", "description", "calories", "protein_g", "carbs_g", "fat_g",
+    "meal_type", "cuisine_type", "difficulty", "prep_time_minutes",
+    "ingredients", "instructions", "tags",
+    *DIETARY_FLAGS, "dietary_flags", "is_active",
+]
+
+
+def plan_rows(rng, user_ids: np.ndarray, exercise_ids: np.ndarray, recipe_ids: np.ndarray,
+              plans_per_user: float, chunk_size: int) -> Iterator[tuple]:
+    for start, n in _chunks(len(user_ids), chunk_size):
+        counts = rng.poisson(plans_per_user, n)
+        owners = np.repeat(user_ids[start:start + n], counts)
+        total = len(owners)
+        if total == 0:
+            continue
+        workout = rng.random(total) < 0.6
+        weeks = rng.choice([1, 4, 8, 12], size=total, p=[0.3, 0.4, 0.2, 0.1])
+        status = rng.choice(["draft", "active", "completed", "paused"], size=total, p=[0.1, 0.35, 0.45, 0.1])
+        created_at = _random_datetimes(rng, total, 365)
+
+        for i in range(total):
+            if workout[i]:
+                week = {
+                    f"day_{d}": {"focus": "full_body", "exercises": [
+                        {"id": int(e), "sets": 3, "reps": "8-12"} for e in rng.choice(exercise_ids, 5)
+                    ]} for d in range(1, 4)
+                }
+                plan_data = {"type": "workout", "weekly_plan": {f"week_{w + 1}": week for w in range(weeks[i])}}
+            else:
+                day = {"meals": {m: {"id": int(r)} for m, r in zip(MEAL_CALORIES, rng.choice(recipe_ids, 4))}}
+                plan_data = {"type": "meal", "daily_plans": {
+                    f"week_{w + 1}_day_{d}": day for w in range(weeks[i]) for d in range(1, 8)
+                }}
+            yield (
+                int(owners[i]), f"Synthetic {'Workout' if workout[i] else 'Meal'} Plan",
+                "workout" if workout[i] else "meal", str(status[i]), created_at[i].date(), int(weeks[i]),
+                plan_data, True, created_at[i], created_at[i],
+            )
+
+
+PLAN_COLUMNS = [
+    "user_id", "name", "plan_type", "status", "start_date", "duration_weeks",
+    "plan_data", "is_active", "created_at", "updated_at",
+]
+
+
+def feedback_rows(rng, user_ids: np.ndarray, item_type: str, item_ids: np.ndarray,
+                  events_per_user: float, chunk_size: int) -> Iterator[tuple]:
+    # Zipf-distributed popularity: a few items collect most of the feedback
+    popularity = rng.permutation(item_ids)
+    for start, n in _chunks(len(user_ids), chunk_size):
+        counts = rng.poisson(events_per_user, n)
+        owners = np.repeat(user_ids[start:start + n], counts)
+        total = len(owners)
+        if total == 0:
+            continue
+        ranks = np.minimum(rng.zipf(1.3, total), len(popularity)) - 1
+        kind = rng.choice(len(FEEDBACK_TYPES), size=total, p=[0.55, 0.20, 0.07, 0.18])
+        created_at = _random_datetimes(rng, total, 180)
+        for i in range(total):
+            feedback_type = FEEDBACK_TYPES[kind[i]]
+            yield (
+                int(owners[i]), item_type, int(popularity[ranks[i]]), feedback_type,
+                1 if feedback_type in ("completed", "liked") else -1, created_at[i],
+            )
+
+
+FEEDBACK_COLUMNS = ["user_id", "item_type", "item_id", "feedback_type", "feedback_value", "created_at"]
+
+
+def _ids(query) -> np.ndarray:
+    with engine.connect() as conn:
+        return np.array(conn.execute(query).scalars().all(), dtype=np.int64)
+
+
+def truncate_all() -> None:
+    tables = [t.name for t in reversed(Base.metadata.sorted_tables)]
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+        else:
+            for name in tables:
+                conn.execute(text(f"DELETE FROM {name}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic data for benchmarks")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--exercises", type=int, default=2000)
+    parser.add_argument("--recipes", type=int, default=20000)
+    parser.add_argument("--plans-per-user", type=float, default=1.5)
+    parser.add_argument("--feedback-per-user", type=float, default=40.0)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Delete ALL existing rows first")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    loader = BulkLoader(args.batch_size)
+    stats: Dict[str, Dict[str, float]] = {}
+
+    def timed(name, table, columns, rows):
+        started = time.perf_counter()
+        inserted = loader.load(table, columns, rows)
+        elapsed = time.perf_counter() - started
+        stats[name] = {"rows": inserted, "seconds": round(elapsed, 2)}
+        print(f"✅ {name}: {inserted:,} rows in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    print(f"🌱 Generating synthetic data ({engine.dialect.name}, {'COPY' if loader.use_copy else 'executemany'})")
+    if args.truncate:
+        truncate_all()
+        print("🗑️ Existing rows deleted")
+
+    # Continue numbering after existing users so repeated runs never reuse an email
+    last_user_id = _ids(select(User.id).order_by(User.id.desc()).limit(1))
+    first_index = int(last_user_id[0]) + 1 if len(last_user_id) else 0
+
+    timed("users", User.__table__, USER_COLUMNS, user_rows(rng, args.users, first_index, args.batch_size))
+    timed("exercises", Exercise.__table__, EXERCISE_COLUMNS, exercise_rows(rng, args.exercises, args.batch_size))
+    timed("recipes", Recipe.__table__, RECIPE_COLUMNS, recipe_rows(rng, args.recipes, args.batch_size))
+
+    user_ids = _ids(select(User.id).where(User.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}")))
+    exercise_ids = _ids(select(Exercise.id))
+    recipe_ids = _ids(select(Recipe.id))
+
+    timed("plans", Plan.__table__, PLAN_COLUMNS,
+          plan_rows(rng, user_ids, exercise_ids, recipe_ids, args.plans_per_user, args.batch_size))
+    timed("exercise feedback", UserFeedbackLog.__table__, FEEDBACK_COLUMNS,
+          feedback_rows(rng, user_ids, "exercise", exercise_ids, args.feedback_per_user, args.batch_size))
+    timed("recipe feedback", UserFeedbackLog.__table__, FEEDBACK_COLUMNS,
+          feedback_rows(rng, user_ids, "recipe", recipe_ids, args.feedback_per_user / 2, args.batch_size))
+
+    # COPY bypasses FeedbackService, so aggregates and preference models are rebuilt from the log
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        FeedbackService(db).rebuild_aggregates()
+        models_built = PreferenceStore(db).rebuild_from_stats()
+    finally:
+        db.close()
+    print(f"✅ feedback aggregates and {models_built:,} preference models rebuilt "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+    print("🎉 Synthetic data loaded:", json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
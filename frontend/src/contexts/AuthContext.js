@@ -26,13 +26,45 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh tokens are single use, so concurrent 401s must share one refresh
+let refreshing = null;
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshing = (refreshToken
+      ? axios.post(`${api.defaults.baseURL}/api/auth/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'))
+    ).then(({ data }) => {
+      localStorage.setItem('auth_token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
+      return data.access_token;
+    }).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
 // Response interceptor to handle token expiration
 api.interceptors.response.use(
   (response) => response,
   async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried && !original.url?.includes('/api/auth/login')) {
+      // Access token expired: swap the refresh token for a new one and retry once
+      original._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch (refreshError) {
+        // Refresh token missing, expired or revoked - sign out below
+      }
+    }
     if (error.response?.status === 401) {
       // Token expired or invalid
       localStorage.removeItem('auth_token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -149,6 +181,7 @@ export const AuthProvider = ({ children }) => {
       if (response.data.access_token) {
         // Store token
         localStorage.setItem('auth_token', response.data.access_token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
         
         // Get user info
         const userResponse = await api.get('/api/auth/me');
@@ -169,7 +202,14 @@ export const AuthProvider = ({ children }) => {
 
   // Logout function
   const logout = () => {
+    // Revoke the server-side session too; the local sign-out doesn't wait for it.
+    // The header is set here because the interceptor runs after the token is removed.
+    const token = localStorage.getItem('auth_token');
+    if (token) {
+      api.post('/api/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } }).catch(() => {});
+    }
     localStorage.removeItem('auth_token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     setUser(null);
     toast.success('Logged out successfully! 👋');
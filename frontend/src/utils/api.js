@@ -77,7 +77,8 @@ export const authAPI = {
     headers: { 'Content-Type': 'application/x-www-form-urlencoded' }
   }),
   getMe: () => api.get('/api/auth/me'),
-  refreshToken: () => api.post('/api/auth/refresh'),
+  refreshToken: (refreshToken) => api.post('/api/auth/refresh', { refresh_token: refreshToken }),
+  logout: () => api.post('/api/auth/logout'),
 };
 
 // User API functions
@@ -120,4 +121,9 @@ export const planAPI = {
   getActive: () => api.get('/api/plans/current/active'),
 };
 
+// Batch API: several GETs in one round trip, e.g. [{ id: 'me', path: '/api/auth/me' }]
+export const batchAPI = {
+  get: (requests) => api.post('/api/batch/', { requests }),
+};
+
 export default api; 
\ No newline at end of file
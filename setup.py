@@ -58,8 +58,11 @@ def main():
         print("❌ Failed to install Python dependencies")
         sys.exit(1)
     
-    # Run database seed script
+    # Create the schema, then seed it
     print("Setting up database and seeding with sample data...")
+    if not run_command(f"{python_path} -m alembic upgrade head", cwd="backend"):
+        print("❌ Failed to migrate database")
+        sys.exit(1)
     if not run_command(f"{python_path} seed_data.py", cwd="backend"):
         print("❌ Failed to seed database")
         sys.exit(1)